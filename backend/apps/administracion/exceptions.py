@@ -42,6 +42,15 @@ def _utc_now_iso():
     return f"{datetime.utcnow().isoformat()}Z"
 
 
+def _passthrough_headers(response):
+    # Cabeceras que DRF agrega a la respuesta original (p. ej. Retry-After en 429).
+    return {
+        name: response[name]
+        for name in ("Retry-After", "WWW-Authenticate")
+        if response.has_header(name)
+    }
+
+
 def custom_exception_handler(exc, context):
 
     response = exception_handler(exc, context)
@@ -72,7 +81,11 @@ def custom_exception_handler(exc, context):
             payload["details"] = source["details"]
         if source.get("requestId"):
             payload["requestId"] = source["requestId"]
-        return Response(payload, status=response.status_code)
+        return Response(
+            payload,
+            status=response.status_code,
+            headers=_passthrough_headers(response),
+        )
 
     return Response(
         {
@@ -82,4 +95,5 @@ def custom_exception_handler(exc, context):
             "timestamp": _utc_now_iso(),
         },
         status=response.status_code,
+        headers=_passthrough_headers(response),
     )
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.administracion.services.audit_partitions import (
+    detach_audit_partitions,
+    ensure_audit_partitions,
+    partitioning_supported,
+)
+
+
+class Command(BaseCommand):
+    help = "Crea particiones mensuales de auditoria_eventos y separa las vencidas."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=getattr(settings, "AUDIT_PARTITION_MONTHS_AHEAD", 3),
+            help="Meses futuros con particion creada.",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=getattr(settings, "AUDIT_RETENTION_MONTHS", 0),
+            help="Meses conservados en la tabla; 0 no separa particiones.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Elimina las particiones separadas en lugar de archivarlas.",
+        )
+
+    def handle(self, *args, **options):
+        if not partitioning_supported():
+            self.stdout.write("auditoria_eventos no esta particionada; nada que hacer.")
+            return
+
+        created = ensure_audit_partitions(options["ahead"])
+        for name in created:
+            self.stdout.write(f"Creada {name}")
+
+        detached = detach_audit_partitions(options["retain_months"], drop=options["drop"])
+        for name in detached:
+            action = "Eliminada" if options["drop"] else "Archivada"
+            self.stdout.write(f"{action} {name}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Particiones creadas: {len(created)}, separadas: {len(detached)}"
+            )
+        )
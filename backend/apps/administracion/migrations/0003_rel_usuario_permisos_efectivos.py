@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-17 02:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administracion', '0002_alter_relrolpermiso_options_and_more'),
+        ('authentication', '0003_alter_detusuario_options_alter_syusuario_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelUsuarioPermisosEfectivos',
+            fields=[
+                ('id_usuario', models.OneToOneField(db_column='id_usuario', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='permisos_efectivos', serialize=False, to='authentication.syusuario')),
+                ('permisos', models.JSONField(default=list)),
+                ('fch_revision', models.DateTimeField(blank=True, null=True)),
+                ('fch_expira_min', models.DateTimeField(blank=True, null=True)),
+                ('fch_calculo', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'rel_usuario_permisos_efectivos',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-17 02:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administracion', '0003_rel_usuario_permisos_efectivos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RbacRevision',
+            fields=[
+                ('clave', models.CharField(db_column='clave', max_length=64, primary_key=True, serialize=False)),
+                ('fch_revision', models.DateTimeField(db_column='fch_revision')),
+            ],
+            options={
+                'db_table': 'rbac_revisiones',
+            },
+        ),
+    ]
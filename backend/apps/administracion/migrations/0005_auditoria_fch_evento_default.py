@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administracion', '0004_rbac_revisiones'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditoriaevento',
+            name='fch_evento',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
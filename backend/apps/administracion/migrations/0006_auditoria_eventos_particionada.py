@@ -0,0 +1,192 @@
+# Generated by Django 6.0.1 on 2026-10-17 03:30
+
+from datetime import date
+
+from django.db import migrations
+from django.db.migrations.exceptions import IrreversibleError
+from django.utils import timezone
+
+TABLE = "auditoria_eventos"
+LEGACY = "auditoria_eventos_legacy"
+SEQUENCE = "auditoria_eventos_particion_id_seq"
+MONTHS_AHEAD = 3
+
+# Indices del modelo que se recrean sobre la tabla particionada.
+INDEXES = (
+    ("audit_actor_fch_idx", "(actor_id_usuario, fch_evento)"),
+    ("audit_target_fch_idx", "(target_id_usuario, fch_evento)"),
+    ("audit_action_fch_idx", "(accion, fch_evento)"),
+)
+
+
+def _add_months(value, months):
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_sql(start):
+    end = _add_months(start, 1)
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{TABLE}_p{start:%Y%m}" PARTITION OF "{TABLE}" '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def partition_auditoria(apps, schema_editor):
+    # Particionado por rango mensual de fch_evento; solo aplica en PostgreSQL.
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = %s AND c.relnamespace = to_regnamespace(current_schema())
+            """,
+            [TABLE],
+        )
+        if cursor.fetchone():
+            return
+
+        today = timezone.localdate()
+        current = date(today.year, today.month, 1)
+
+        cursor.execute(f'LOCK TABLE "{TABLE}" IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{LEGACY}"')
+        cursor.execute(
+            f'ALTER TABLE "{LEGACY}" RENAME CONSTRAINT "{TABLE}_pkey" TO "{LEGACY}_pkey"'
+        )
+        for name, _ in INDEXES:
+            cursor.execute(f'ALTER INDEX IF EXISTS "{name}" RENAME TO "{name}_legacy"')
+
+        cursor.execute(f'ALTER TABLE "{LEGACY}" ALTER COLUMN id_evento DROP IDENTITY IF EXISTS')
+        cursor.execute(f'ALTER TABLE "{LEGACY}" ALTER COLUMN id_evento DROP DEFAULT')
+
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{LEGACY}" INCLUDING DEFAULTS '
+            f"INCLUDING CONSTRAINTS INCLUDING STORAGE) PARTITION BY RANGE (fch_evento)"
+        )
+        cursor.execute(f'CREATE SEQUENCE "{SEQUENCE}" OWNED BY "{TABLE}".id_evento')
+        cursor.execute(
+            f"SELECT setval(%s, COALESCE((SELECT MAX(id_evento) FROM \"{LEGACY}\"), 0) + 1, false)",
+            [SEQUENCE],
+        )
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ALTER COLUMN id_evento '
+            f"SET DEFAULT nextval('\"{SEQUENCE}\"')"
+        )
+        # La llave de una tabla particionada debe incluir la columna de particion.
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_pkey" '
+            f"PRIMARY KEY (id_evento, fch_evento)"
+        )
+
+        cursor.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype = 'f'
+            """,
+            [LEGACY],
+        )
+        for conname, definition in cursor.fetchall():
+            cursor.execute(
+                f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{conname[:55]}_part" {definition}'
+            )
+
+        for name, columns in INDEXES:
+            cursor.execute(f'CREATE INDEX "{name}" ON "{TABLE}" {columns}')
+        cursor.execute(f'CREATE INDEX "audit_fch_evento_idx" ON "{TABLE}" (fch_evento)')
+        cursor.execute(f'CREATE INDEX "audit_request_id_idx" ON "{TABLE}" (request_id)')
+        # Filtros por meta (p. ej. {"module": "rbac"}) via @>.
+        cursor.execute(
+            f'CREATE INDEX "audit_meta_gin_idx" ON "{TABLE}" USING GIN (meta jsonb_path_ops)'
+        )
+
+        for offset in range(MONTHS_AHEAD + 1):
+            cursor.execute(_partition_sql(_add_months(current, offset)))
+        cursor.execute(f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+
+        # Lo historico queda como una particion; el mes en curso se mueve a la suya.
+        cursor.execute(
+            f'INSERT INTO "{TABLE}" SELECT * FROM "{LEGACY}" WHERE fch_evento >= %s',
+            [current],
+        )
+        cursor.execute(f'DELETE FROM "{LEGACY}" WHERE fch_evento >= %s', [current])
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{LEGACY}" '
+            f"FOR VALUES FROM (MINVALUE) TO ('{current.isoformat()}')"
+        )
+
+
+def unpartition_auditoria(apps, schema_editor):
+    # Regresa los eventos a la tabla legacy y le devuelve su nombre original.
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = %s AND c.relnamespace = to_regnamespace(current_schema())
+            """,
+            [TABLE],
+        )
+        if not cursor.fetchone():
+            return
+
+        cursor.execute(
+            """
+            SELECT 1
+            FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = %s AND child.relname = %s
+              AND parent.relnamespace = to_regnamespace(current_schema())
+            """,
+            [TABLE, LEGACY],
+        )
+        if not cursor.fetchone():
+            # La retencion ya separo (o elimino) la particion historica.
+            raise IrreversibleError(
+                f'"{LEGACY}" ya no es particion de "{TABLE}"; restaurela manualmente.'
+            )
+
+        cursor.execute(f'LOCK TABLE "{TABLE}" IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{LEGACY}"')
+        cursor.execute(
+            f'INSERT INTO "{LEGACY}" SELECT * FROM "{TABLE}" ORDER BY id_evento'
+        )
+        # Elimina tambien las particiones mensuales y la secuencia propia.
+        cursor.execute(f'DROP TABLE "{TABLE}"')
+
+        cursor.execute(f'ALTER TABLE "{LEGACY}" RENAME TO "{TABLE}"')
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" RENAME CONSTRAINT "{LEGACY}_pkey" TO "{TABLE}_pkey"'
+        )
+        for name, _ in INDEXES:
+            cursor.execute(f'ALTER INDEX IF EXISTS "{name}_legacy" RENAME TO "{name}"')
+
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ALTER COLUMN id_evento ADD GENERATED BY DEFAULT AS IDENTITY'
+        )
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id_evento'), "
+            f"COALESCE((SELECT MAX(id_evento) FROM \"{TABLE}\"), 0) + 1, false)",
+            [TABLE],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("administracion", "0005_auditoria_fch_evento_default"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_auditoria, unpartition_auditoria),
+    ]
@@ -1,6 +1,8 @@
 from .usuario_rol import RelUsuarioRol
 from .rol_permiso import RelRolPermiso
 from .usuario_override import RelUsuarioOverride
+from .usuario_permisos_efectivos import RelUsuarioPermisosEfectivos
+from .rbac_revision import RbacRevision
 from .auditoria_evento import AuditoriaEvento
 
 
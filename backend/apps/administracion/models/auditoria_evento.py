@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 class AuditoriaEvento(models.Model):
     class Resultado(models.TextChoices):
@@ -6,7 +7,8 @@ class AuditoriaEvento(models.Model):
         FAIL = "FAIL", "FAIL"
 
     id_evento = models.BigAutoField(primary_key=True, db_column="id_evento")
-    fch_evento = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Hora del evento (no del flush del buffer de auditoria).
+    fch_evento = models.DateTimeField(default=timezone.now, db_index=True)
     request_id = models.CharField(max_length=36, db_index=True)
     accion = models.CharField(max_length=64, db_index=True)
     recurso_tipo = models.CharField(max_length=64)
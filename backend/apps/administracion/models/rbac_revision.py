@@ -0,0 +1,10 @@
+from django.db import models
+
+
+class RbacRevision(models.Model):
+    # Revision por rol ("role:<id>") y epoca global de RBAC ("epoch").
+    clave = models.CharField(max_length=64, primary_key=True, db_column="clave")
+    fch_revision = models.DateTimeField(db_column="fch_revision")
+
+    class Meta:
+        db_table = "rbac_revisiones"
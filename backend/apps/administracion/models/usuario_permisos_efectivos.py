@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class RelUsuarioPermisosEfectivos(models.Model):
+    id_usuario = models.OneToOneField(
+        "authentication.SyUsuario",
+        db_column="id_usuario",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="permisos_efectivos",
+    )
+    permisos = models.JSONField(default=list)
+    fch_revision = models.DateTimeField(null=True, blank=True)
+    fch_expira_min = models.DateTimeField(null=True, blank=True)
+    fch_calculo = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "rel_usuario_permisos_efectivos"
@@ -0,0 +1,102 @@
+import base64
+import json
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from apps.administracion.models import AuditoriaEvento
+
+AUDIT_EXPORT_CHUNK_SIZE = 1000
+
+
+def encode_cursor(event) -> str:
+    raw = json.dumps([event.fch_evento.isoformat(), event.id_evento])
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(value: str):
+    # Regresa (fch_evento, id_evento) o lanza ValueError si el cursor no es valido.
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        occurred_at, event_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("cursor invalido") from exc
+
+    parsed = parse_datetime(str(occurred_at))
+    if parsed is None or not isinstance(event_id, int):
+        raise ValueError("cursor invalido")
+    return parsed, event_id
+
+
+class AuditRepository:
+
+    @staticmethod
+    def filter_events(
+        *,
+        actor_id=None,
+        target_id=None,
+        action=None,
+        request_id=None,
+        module=None,
+        date_from=None,
+        date_to=None,
+    ):
+        queryset = AuditoriaEvento.objects.all()
+        if actor_id is not None:
+            queryset = queryset.filter(actor_usuario_id=actor_id)
+        if target_id is not None:
+            queryset = queryset.filter(target_usuario_id=target_id)
+        if action:
+            queryset = queryset.filter(accion=action)
+        if request_id:
+            queryset = queryset.filter(request_id=request_id)
+        if module:
+            if connection.vendor == "postgresql":
+                # meta @> {"module": ...} usa el indice GIN (jsonb_path_ops).
+                queryset = queryset.filter(meta__contains={"module": module})
+            else:
+                queryset = queryset.filter(meta__module=module)
+        if date_from is not None:
+            queryset = queryset.filter(fch_evento__gte=date_from)
+        if date_to is not None:
+            # El rango por fecha tambien acota las particiones consultadas.
+            queryset = queryset.filter(fch_evento__lt=date_to)
+        return queryset
+
+    @staticmethod
+    def _after(queryset, position):
+        ordered = queryset.order_by("-fch_evento", "-id_evento")
+        if position is None:
+            return ordered
+        occurred_at, event_id = position
+        return ordered.filter(
+            Q(fch_evento__lt=occurred_at)
+            | Q(fch_evento=occurred_at, id_evento__lt=event_id)
+        )
+
+    @staticmethod
+    def page(queryset, *, cursor=None, limit=50):
+        """Pagina por llave (fch_evento, id_evento) descendente; sin OFFSET ni COUNT."""
+        position = decode_cursor(cursor) if cursor else None
+        rows = list(AuditRepository._after(queryset, position)[: limit + 1])
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    @staticmethod
+    def chunk_after(queryset, position=None, *, chunk_size=AUDIT_EXPORT_CHUNK_SIZE):
+        """Siguiente bloque despues de ``position`` (fch_evento, id_evento) y su posicion final."""
+        rows = list(AuditRepository._after(queryset, position)[:chunk_size])
+        if len(rows) < chunk_size:
+            return rows, None
+        return rows, (rows[-1].fch_evento, rows[-1].id_evento)
+
+    @staticmethod
+    def iterate(queryset, *, chunk_size=AUDIT_EXPORT_CHUNK_SIZE):
+        # Recorre todo el resultado en bloques por llave, con memoria acotada.
+        position = None
+        while True:
+            rows, position = AuditRepository.chunk_after(queryset, position, chunk_size=chunk_size)
+            yield from rows
+            if position is None:
+                return
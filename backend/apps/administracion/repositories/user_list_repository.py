@@ -0,0 +1,141 @@
+import base64
+import json
+import logging
+
+from django.db import connections
+from django.db.models import Exists, OuterRef, Prefetch, Q
+
+from apps.administracion.models import RelUsuarioRol
+from apps.authentication.models import SyUsuario
+
+logger = logging.getLogger(__name__)
+
+# Atributo con las relaciones de rol vigentes precargadas por usuario.
+ACTIVE_ROLE_RELATIONS_ATTR = "active_role_relations"
+
+
+def encode_user_cursor(username, user_id) -> str:
+    raw = json.dumps([username, user_id])
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode("ascii")
+
+
+def decode_user_cursor(value: str):
+    # Regresa (usuario, id_usuario) o lanza ValueError si el cursor no es valido.
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        username, user_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("cursor invalido") from exc
+
+    if not isinstance(username, str) or not isinstance(user_id, int):
+        raise ValueError("cursor invalido")
+    return username, user_id
+
+
+def estimate_count(queryset) -> int:
+    # En PostgreSQL usa la estimacion del planificador (sin recorrer la tabla).
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:
+        logger.warning("No se pudo estimar el total de usuarios", exc_info=True)
+        return queryset.count()
+
+
+def active_role_relations_prefetch():
+    return Prefetch(
+        "relusuariorol_set",
+        queryset=(
+            RelUsuarioRol.objects.select_related("id_rol")
+            .filter(fch_baja__isnull=True, id_rol__is_active=True)
+            .order_by("id_usuario_rol")
+        ),
+        to_attr=ACTIVE_ROLE_RELATIONS_ATTR,
+    )
+
+
+class UserListRepository:
+
+    @staticmethod
+    def filter_users(
+        *,
+        search=None,
+        is_active=None,
+        role_id=None,
+        clinic_id=None,
+        status_filter=None,
+    ):
+        queryset = SyUsuario.objects.all()
+        if search:
+            # icontains -> UPPER(col) LIKE UPPER(%s): usa los indices GIN trigram.
+            queryset = queryset.filter(
+                Q(usuario__icontains=search)
+                | Q(correo__icontains=search)
+                | Q(detalle__nombre_completo__icontains=search)
+            )
+        if is_active is not None:
+            queryset = queryset.filter(est_activo=is_active)
+        if role_id:
+            # EXISTS en lugar de JOIN: no duplica filas ni requiere DISTINCT.
+            queryset = queryset.filter(
+                Exists(
+                    RelUsuarioRol.objects.filter(
+                        id_usuario=OuterRef("pk"),
+                        id_rol_id=role_id,
+                        fch_baja__isnull=True,
+                    )
+                )
+            )
+        if clinic_id:
+            queryset = queryset.filter(detalle__id_centro_atencion_id=clinic_id)
+        if status_filter == "active":
+            queryset = queryset.filter(est_activo=True)
+        elif status_filter == "inactive":
+            queryset = queryset.filter(est_activo=False)
+        elif status_filter == "pending":
+            queryset = queryset.filter(Q(terminos_acept=False) | Q(cambiar_clave=True))
+        return queryset
+
+    @staticmethod
+    def _load(user_ids):
+        if not user_ids:
+            return []
+        users_by_id = {
+            user.id_usuario: user
+            for user in SyUsuario.objects.select_related("detalle", "detalle__id_centro_atencion")
+            .prefetch_related(active_role_relations_prefetch())
+            .filter(id_usuario__in=user_ids)
+        }
+        return [users_by_id[user_id] for user_id in user_ids if user_id in users_by_id]
+
+    @staticmethod
+    def page_by_offset(queryset, *, page, page_size):
+        ordered = queryset.order_by("usuario", "id_usuario").values_list("id_usuario", flat=True)
+        start = (page - 1) * page_size
+        return UserListRepository._load(list(ordered[start:start + page_size]))
+
+    @staticmethod
+    def page_by_cursor(queryset, *, cursor=None, limit=20):
+        """Pagina por llave (usuario, id_usuario); sin OFFSET."""
+        ordered = queryset.order_by("usuario", "id_usuario")
+        if cursor:
+            username, user_id = decode_user_cursor(cursor)
+            ordered = ordered.filter(
+                Q(usuario__gt=username) | Q(usuario=username, id_usuario__gt=user_id)
+            )
+        rows = list(ordered.values_list("id_usuario", "usuario")[: limit + 1])
+        users = UserListRepository._load([user_id for user_id, _ in rows[:limit]])
+        next_cursor = None
+        if len(rows) > limit:
+            user_id, username = rows[limit - 1]
+            next_cursor = encode_user_cursor(username, user_id)
+        return users, next_cursor
@@ -0,0 +1,211 @@
+"""Particionado mensual de auditoria_eventos (solo PostgreSQL)."""
+
+import logging
+import re
+from datetime import date
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+AUDIT_TABLE = "auditoria_eventos"
+AUDIT_DEFAULT_PARTITION = f"{AUDIT_TABLE}_default"
+AUDIT_LEGACY_PARTITION = f"{AUDIT_TABLE}_legacy"
+AUDIT_ARCHIVE_PREFIX = f"{AUDIT_TABLE}_archivo"
+_PARTITION_RE = re.compile(rf"^{AUDIT_TABLE}_p(\d{{4}})(\d{{2}})$")
+# "FOR VALUES FROM (MINVALUE) TO ('2026-10-01 00:00:00-06')"
+_UPPER_BOUND_RE = re.compile(r"TO \('(\d{4})-(\d{2})-(\d{2})")
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(start: date) -> str:
+    return f"{AUDIT_TABLE}_p{start:%Y%m}"
+
+
+def partitioning_supported(using=None) -> bool:
+    db = using or connection
+    if db.vendor != "postgresql":
+        return False
+
+    with db.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 1
+            FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = %s AND c.relnamespace = to_regnamespace(current_schema())
+            """,
+            [AUDIT_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def create_partition_sql(start: date) -> str:
+    end = add_months(start, 1)
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{partition_name(start)}" '
+        f'PARTITION OF "{AUDIT_TABLE}" '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def list_monthly_partitions(using=None) -> list[tuple[str, date]]:
+    db = using or connection
+    with db.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = %s
+              AND parent.relnamespace = to_regnamespace(current_schema())
+            ORDER BY child.relname
+            """,
+            [AUDIT_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = _PARTITION_RE.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return partitions
+
+
+def legacy_partition_end(using=None):
+    """Limite superior (exclusivo) de la particion historica, si sigue adjunta."""
+    db = using or connection
+    with db.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = %s AND child.relname = %s
+              AND parent.relnamespace = to_regnamespace(current_schema())
+            """,
+            [AUDIT_TABLE, AUDIT_LEGACY_PARTITION],
+        )
+        row = cursor.fetchone()
+
+    match = _UPPER_BOUND_RE.search(row[0] or "") if row else None
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+
+def _create_partition(db, start: date) -> None:
+    """Crea la particion del mes; si ya hay filas de ese mes en la particion
+    default (nadie creo la particion a tiempo) las mueve a la nueva."""
+    end = add_months(start, 1)
+    with transaction.atomic(using=db.alias), db.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [f'"{AUDIT_DEFAULT_PARTITION}"'])
+        has_default = cursor.fetchone()[0]
+        moved = False
+        if has_default:
+            cursor.execute(
+                f'SELECT 1 FROM "{AUDIT_DEFAULT_PARTITION}" '
+                "WHERE fch_evento >= %s AND fch_evento < %s LIMIT 1",
+                [start, end],
+            )
+            moved = cursor.fetchone() is not None
+
+        if moved:
+            # Con filas del rango en default, CREATE ... PARTITION OF falla.
+            cursor.execute(f'LOCK TABLE "{AUDIT_DEFAULT_PARTITION}" IN ACCESS EXCLUSIVE MODE')
+            cursor.execute(
+                f'CREATE TEMP TABLE "_audit_mover" ON COMMIT DROP AS '
+                f'SELECT * FROM "{AUDIT_DEFAULT_PARTITION}" '
+                "WHERE fch_evento >= %s AND fch_evento < %s",
+                [start, end],
+            )
+            cursor.execute(
+                f'DELETE FROM "{AUDIT_DEFAULT_PARTITION}" '
+                "WHERE fch_evento >= %s AND fch_evento < %s",
+                [start, end],
+            )
+
+        cursor.execute(create_partition_sql(start))
+
+        if moved:
+            cursor.execute(f'INSERT INTO "{AUDIT_TABLE}" SELECT * FROM "_audit_mover"')
+            logger.warning(
+                "Filas de auditoria de %s movidas de %s a %s",
+                f"{start:%Y-%m}",
+                AUDIT_DEFAULT_PARTITION,
+                partition_name(start),
+            )
+
+
+def ensure_audit_partitions(months_ahead: int = 3, *, today=None, using=None) -> list[str]:
+    """Crea las particiones del mes actual y de los siguientes `months_ahead` meses."""
+    db = using or connection
+    if not partitioning_supported(db):
+        return []
+
+    current = month_start(today or timezone.localdate())
+    existing = {name for name, _ in list_monthly_partitions(db)}
+    created = []
+    for offset in range(months_ahead + 1):
+        start = add_months(current, offset)
+        name = partition_name(start)
+        if name in existing:
+            continue
+        try:
+            _create_partition(db, start)
+        except Exception:
+            logger.exception("No se pudo crear la particion de auditoria %s", name)
+            continue
+        created.append(name)
+    return created
+
+
+def detach_audit_partitions(
+    retain_months: int,
+    *,
+    drop: bool = False,
+    today=None,
+    using=None,
+) -> list[str]:
+    """Separa las particiones anteriores a la ventana de retencion.
+
+    Por defecto se renombran como archivo para respaldo externo; con `drop`
+    se eliminan.
+    """
+    db = using or connection
+    if retain_months < 1 or not partitioning_supported(db):
+        return []
+
+    cutoff = add_months(month_start(today or timezone.localdate()), -retain_months)
+    expired = [
+        (name, f"{AUDIT_ARCHIVE_PREFIX}_{start:%Y%m}")
+        for name, start in list_monthly_partitions(db)
+        if start < cutoff
+    ]
+    # La particion historica de la migracion 0006 va de MINVALUE a su limite superior.
+    legacy_end = legacy_partition_end(db)
+    if legacy_end is not None and legacy_end <= cutoff:
+        expired.insert(0, (AUDIT_LEGACY_PARTITION, f"{AUDIT_ARCHIVE_PREFIX}_legacy"))
+
+    detached = []
+    for name, archive_name in expired:
+        with transaction.atomic(using=db.alias), db.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE "{AUDIT_TABLE}" DETACH PARTITION "{name}"')
+            if drop:
+                cursor.execute(f'DROP TABLE "{name}"')
+            else:
+                cursor.execute(f'ALTER TABLE "{name}" RENAME TO "{archive_name}"')
+        detached.append(name)
+    return detached
@@ -0,0 +1,248 @@
+"""Auditoria agregada de lecturas exitosas.
+
+Cada lectura suma un contador por (actor, accion) en la ventana actual; al
+cerrar la ventana, la primera lectura siguiente (o el beat, si esta
+desplegado) los convierte en un evento resumen con el total en
+``meta.count``. Fallos y mutaciones se siguen registrando uno por uno.
+"""
+
+import atexit
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+
+from infrastructure.cache.redis_manager import CACHE_KEY_PREFIX, get_redis_client
+
+from ..models import AuditoriaEvento
+from .audit_writer import _write_batch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_MINUTES = 5
+READ_COUNTERS_KEY = f"{CACHE_KEY_PREFIX}:audit:reads"
+# Sufijo de una ventana tomada por un flush y aun no escrita.
+FLUSHING_SUFFIX = "flushing"
+# Llaves auxiliares bajo el mismo prefijo; _parse_counters_key las ignora.
+FLUSH_LOCK_KEY = f"{READ_COUNTERS_KEY}:lock"
+FLUSH_CLAIM_KEY = f"{READ_COUNTERS_KEY}:claim"
+# Tiempo maximo que un flush retiene una ventana; despues otro puede retomarla.
+FLUSH_CLAIM_SECONDS = 5 * 60
+# Margen para que una ventana sin flush no se pierda enseguida.
+READ_COUNTERS_TTL_SECONDS = 24 * 60 * 60
+
+_local_counters = {}
+_local_lock = threading.Lock()
+_atexit_registered = False
+# Ultima ventana en la que este proceso intento vaciar Redis.
+_redis_checked_bucket = None
+
+
+def read_aggregation_enabled() -> bool:
+    return bool(getattr(settings, "AUDIT_READ_AGGREGATION", False))
+
+
+def _window_seconds() -> int:
+    minutes = getattr(settings, "AUDIT_READ_FLUSH_MINUTES", DEFAULT_WINDOW_MINUTES)
+    return max(int(minutes), 1) * 60
+
+
+def _window_start(now=None) -> int:
+    now = time.time() if now is None else now
+    window = _window_seconds()
+    return int(now // window) * window
+
+
+def record_read(*, action, resource_type, actor_id=None, actor_name=None, module="rbac", now=None) -> None:
+    """Suma una lectura exitosa al contador de la ventana actual."""
+    bucket = _window_start(now)
+    field = json.dumps([actor_id, actor_name, action, resource_type, module])
+
+    client = get_redis_client()
+    if client is not None:
+        key = f"{READ_COUNTERS_KEY}:{bucket}"
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hincrby(key, field, 1)
+            pipe.expire(key, READ_COUNTERS_TTL_SECONDS)
+            pipe.execute()
+        except Exception:
+            logger.warning("No se pudo sumar la lectura en Redis; se cuenta en proceso", exc_info=True)
+        else:
+            _maybe_flush_redis(client, bucket)
+            return
+
+    _record_local(bucket, field)
+
+
+def _maybe_flush_redis(client, bucket):
+    """Vacia las ventanas cerradas en Redis sin depender de un beat.
+
+    Cada proceso lo intenta una vez por ventana y solo uno por ventana
+    (lock NX) recorre las llaves.
+    """
+    global _redis_checked_bucket
+
+    if _redis_checked_bucket is not None and _redis_checked_bucket >= bucket:
+        return
+    _redis_checked_bucket = bucket
+    try:
+        if not client.set(f"{FLUSH_LOCK_KEY}:{bucket}", 1, nx=True, ex=_window_seconds()):
+            return
+        _flush_redis(client, bucket)
+    except Exception:
+        logger.exception("No se pudieron vaciar los contadores de lectura en Redis")
+
+
+def _record_local(bucket, field):
+    global _atexit_registered
+
+    with _local_lock:
+        _local_counters.setdefault(bucket, Counter())[field] += 1
+        has_closed_windows = any(other < bucket for other in _local_counters)
+        if not _atexit_registered:
+            # Solo lo contado en este proceso; las ventanas en Redis las vacia quien tome el lock.
+            atexit.register(_flush_local, bucket, True)
+            _atexit_registered = True
+
+    # Sin Redis cada proceso vacia sus propias ventanas cerradas.
+    if has_closed_windows:
+        try:
+            _flush_local(bucket)
+        except Exception:
+            logger.exception("No se pudieron escribir los resumenes de lecturas")
+
+
+def _summary_events(bucket, counters):
+    window = _window_seconds()
+    window_start = datetime.fromtimestamp(bucket, tz=dt_timezone.utc)
+    window_end = datetime.fromtimestamp(bucket + window, tz=dt_timezone.utc)
+    events = []
+    for field, count in counters.items():
+        actor_id, actor_name, action, resource_type, module = json.loads(field)
+        events.append(
+            AuditoriaEvento(
+                fch_evento=window_start,
+                request_id=str(uuid.uuid4()),
+                accion=action,
+                recurso_tipo=resource_type,
+                actor_usuario_id=actor_id,
+                actor_nombre=actor_name or "Sistema",
+                resultado=AuditoriaEvento.Resultado.SUCCESS,
+                meta={
+                    "module": module,
+                    "aggregated": True,
+                    "count": int(count),
+                    "windowStart": window_start.isoformat().replace("+00:00", "Z"),
+                    "windowEnd": window_end.isoformat().replace("+00:00", "Z"),
+                },
+            )
+        )
+    return events
+
+
+def _emit(events) -> int:
+    # Pocas filas por ventana: se escriben directo, sin pasar por el buffer.
+    return _write_batch(events)
+
+
+def _flush_local(current_bucket, force=False) -> int:
+    with _local_lock:
+        buckets = [bucket for bucket in _local_counters if force or bucket < current_bucket]
+        closed = [(bucket, _local_counters.pop(bucket)) for bucket in buckets]
+
+    events = []
+    for bucket, counters in closed:
+        events.extend(_summary_events(bucket, counters))
+    if not events:
+        return 0
+    try:
+        return _emit(events)
+    except Exception:
+        # Se devuelven las ventanas para el siguiente flush.
+        with _local_lock:
+            for bucket, counters in closed:
+                _local_counters.setdefault(bucket, Counter()).update(counters)
+        raise
+
+
+def _parse_counters_key(key):
+    # "<prefijo>:<bucket>" o "<prefijo>:<bucket>:flushing"
+    bucket, _, state = key[len(READ_COUNTERS_KEY) + 1:].partition(":")
+    if state not in ("", FLUSHING_SUFFIX):
+        return None, False
+    try:
+        return int(bucket), state == FLUSHING_SUFFIX
+    except ValueError:
+        return None, False
+
+
+def _flush_redis(client, current_bucket, force=False) -> int:
+    written = 0
+    for raw_key in client.scan_iter(match=f"{READ_COUNTERS_KEY}:*", count=100):
+        key = raw_key.decode() if isinstance(raw_key, bytes) else raw_key
+        bucket, flushing = _parse_counters_key(key)
+        if bucket is None or (not flushing and not force and bucket >= current_bucket):
+            continue
+
+        # Reclamo NX por ventana: mientras un flush la escribe nadie mas la toma;
+        # una llave ":flushing" sin reclamo vigente es de un flush que fallo.
+        claim_key = f"{FLUSH_CLAIM_KEY}:{bucket}"
+        if not client.set(claim_key, 1, nx=True, ex=FLUSH_CLAIM_SECONDS):
+            continue
+        try:
+            written += _flush_redis_window(client, key, bucket, flushing)
+        finally:
+            client.delete(claim_key)
+    return written
+
+
+def _flush_redis_window(client, key, bucket, flushing) -> int:
+    if not flushing:
+        # Los contadores siguen en Redis hasta que el evento quede escrito.
+        flushing_key = f"{key}:{FLUSHING_SUFFIX}"
+        try:
+            if not client.renamenx(key, flushing_key):
+                # Queda una toma previa de la ventana; se vacia primero esa.
+                return 0
+        except Exception:
+            # La llave ya la tomo (y borro) otro flush.
+            return 0
+        key = flushing_key
+
+    written = 0
+    counters = client.hgetall(key)
+    if counters:
+        written = _emit(
+            _summary_events(
+                bucket,
+                {
+                    (field.decode() if isinstance(field, bytes) else field): int(count)
+                    for field, count in counters.items()
+                },
+            )
+        )
+    client.delete(key)
+    return written
+
+
+def flush_read_counters(*, force=False, now=None) -> int:
+    """Escribe un evento resumen por contador de las ventanas cerradas.
+
+    Con ``force`` tambien vacia la ventana en curso (apagado del proceso).
+    """
+    current_bucket = _window_start(now)
+    written = _flush_local(current_bucket, force=force)
+
+    client = get_redis_client()
+    if client is not None:
+        try:
+            written += _flush_redis(client, current_bucket, force=force)
+        except Exception:
+            logger.exception("No se pudieron vaciar los contadores de lectura en Redis")
+    return written
@@ -1,4 +1,4 @@
-from ..models import AuditoriaEvento
+from .audit_writer import record_audit_event
 
 class AuditService:
 
@@ -18,7 +18,7 @@ class AuditService:
 
         actor = request.user if request.user.is_authenticated else None
 
-        AuditoriaEvento.objects.create(
+        record_audit_event(
             request_id=request.request_id,
             accion=accion,
             recurso_tipo=recurso_tipo,
@@ -0,0 +1,225 @@
+import atexit
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+
+from ..models import AuditoriaEvento
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_MAX_EVENTS = 10000
+DEFAULT_FLUSH_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL_SECONDS = 1.0
+# Intentos de un evento ante errores de BD distintos de integridad (conexion caida...).
+MAX_WRITE_ATTEMPTS = 5
+
+
+def _async_enabled() -> bool:
+    return bool(getattr(settings, "AUDIT_ASYNC_WRITES", False))
+
+
+def _write_batch(events) -> int:
+    # Un INSERT por lote; si falla (p. ej. FK a un usuario ya inexistente) se
+    # reintenta fila por fila sin perder el resto del lote.
+    if not events:
+        return 0
+
+    try:
+        with transaction.atomic():
+            AuditoriaEvento.objects.bulk_create(events)
+        return len(events)
+    except IntegrityError:
+        logger.warning("Lote de auditoria rechazado; se reintenta por evento", exc_info=True)
+
+    # Otros errores de BD se propagan para reintentar el lote; los eventos ya
+    # resueltos quedan marcados y no se vuelven a insertar.
+    written = 0
+    for event in events:
+        if getattr(event, "_audit_done", False):
+            continue
+        event.pk = None
+        try:
+            with transaction.atomic():
+                event.save(force_insert=True)
+            written += 1
+            event._audit_done = True
+            continue
+        except IntegrityError:
+            pass
+
+        # Se conserva el evento sin las referencias que ya no existen.
+        event.pk = None
+        event.actor_usuario_id = None
+        event.target_usuario_id = None
+        event.id_centro_atencion_id = None
+        try:
+            with transaction.atomic():
+                event.save(force_insert=True)
+            written += 1
+        except IntegrityError:
+            logger.exception("No se pudo registrar evento de auditoria %s", event.accion)
+        event._audit_done = True
+    return written
+
+
+class AuditWriter:
+    """Buffer acotado de eventos de auditoria con flush en segundo plano."""
+
+    def __init__(
+        self,
+        *,
+        max_events=None,
+        batch_size=None,
+        flush_interval=None,
+        background=True,
+    ):
+        self.background = background
+        self.max_events = int(
+            max_events
+            or getattr(settings, "AUDIT_BUFFER_MAX_EVENTS", DEFAULT_BUFFER_MAX_EVENTS)
+        )
+        self.batch_size = int(
+            batch_size
+            or getattr(settings, "AUDIT_FLUSH_BATCH_SIZE", DEFAULT_FLUSH_BATCH_SIZE)
+        )
+        self.flush_interval = float(
+            flush_interval
+            or getattr(
+                settings, "AUDIT_FLUSH_INTERVAL_SECONDS", DEFAULT_FLUSH_INTERVAL_SECONDS
+            )
+        )
+        self._queue = queue.Queue(maxsize=self.max_events)
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def submit(self, event) -> None:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Back-pressure: con el buffer lleno el emisor vacia un lote antes de encolar.
+            self.flush()
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                _write_batch([event])
+            return
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain(self.batch_size)
+                if not batch:
+                    return written
+                try:
+                    written += _write_batch(batch)
+                except Exception:
+                    # El lote vuelve al buffer; se reintenta en el siguiente flush.
+                    logger.exception("No se pudo escribir un lote de auditoria (%s eventos)", len(batch))
+                    self._requeue(batch)
+                    return written
+
+    def close(self) -> None:
+        # Flush final al apagar el proceso.
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=self.flush_interval * 5)
+        self.flush()
+
+    def _requeue(self, batch):
+        for event in batch:
+            if getattr(event, "_audit_done", False):
+                continue
+            event._audit_attempts = getattr(event, "_audit_attempts", 0) + 1
+            if event._audit_attempts < MAX_WRITE_ATTEMPTS:
+                try:
+                    self._queue.put_nowait(event)
+                    continue
+                except queue.Full:
+                    pass
+            # Sin mas reintentos: queda al menos el rastro en el log.
+            logger.error(
+                "Evento de auditoria descartado tras %s intentos: accion=%s request_id=%s recurso=%s:%s",
+                event._audit_attempts,
+                event.accion,
+                event.request_id,
+                event.recurso_tipo,
+                event.recurso_id,
+            )
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _ensure_thread(self):
+        if not self.background:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="audit-writer",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception("Fallo el flush de auditoria")
+        connection.close()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer() -> AuditWriter:
+    global _writer
+
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditWriter()
+                atexit.register(_writer.close)
+    return _writer
+
+
+def record_audit_event(**fields) -> None:
+    # Drop-in de AuditoriaEvento.objects.create: en modo asincrono solo encola.
+    event = AuditoriaEvento(**fields)
+
+    if not _async_enabled():
+        event.save(force_insert=True)
+        return
+
+    get_audit_writer().submit(event)
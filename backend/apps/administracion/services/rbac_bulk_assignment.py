@@ -0,0 +1,246 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from django.utils import timezone
+
+from ..models import RelUsuarioOverride, RelUsuarioRol
+
+BULK_ASSIGNMENT_MAX_USERS = 500
+
+ROLE_UPDATE_FIELDS = ["fch_baja", "usr_baja", "is_primary"]
+OVERRIDE_UPDATE_FIELDS = ["efecto", "fch_expira", "fch_baja", "usr_baja", "usr_asignacion"]
+
+
+@dataclass
+class BulkAssignmentRequest:
+    """Cambios a aplicar por igual a cada usuario del lote."""
+
+    grant_roles: list = field(default_factory=list)
+    revoke_role_ids: List[int] = field(default_factory=list)
+    # (permiso, efecto, expira)
+    grant_overrides: List[Tuple[object, str, Optional[object]]] = field(default_factory=list)
+    revoke_permission_ids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class BulkItemResult:
+    user_id: int
+    status: str = "unchanged"
+    code: Optional[str] = None
+    message: Optional[str] = None
+    roles_granted: int = 0
+    roles_revoked: int = 0
+    overrides_granted: int = 0
+    overrides_revoked: int = 0
+
+    def as_dict(self):
+        payload = {"userId": self.user_id, "status": self.status}
+        if self.code:
+            payload["code"] = self.code
+            payload["message"] = self.message
+        else:
+            payload["changes"] = {
+                "rolesGranted": self.roles_granted,
+                "rolesRevoked": self.roles_revoked,
+                "overridesGranted": self.overrides_granted,
+                "overridesRevoked": self.overrides_revoked,
+            }
+        return payload
+
+    @property
+    def changed(self):
+        return bool(
+            self.roles_granted
+            or self.roles_revoked
+            or self.overrides_granted
+            or self.overrides_revoked
+        )
+
+
+class _Writes:
+    def __init__(self):
+        self.create_roles = []
+        self.update_roles = []
+        self.create_overrides = []
+        self.update_overrides = []
+
+
+def _plan_roles(user, relations, spec, actor, now, result, writes):
+    # relations: {id_rol: RelUsuarioRol} del usuario (vigentes y dadas de baja).
+    planned_updates = []
+    planned_creates = []
+
+    for role in spec.grant_roles:
+        relation = relations.get(role.id_rol)
+        if relation is None:
+            planned_creates.append(
+                RelUsuarioRol(
+                    id_usuario=user,
+                    id_rol=role,
+                    is_primary=False,
+                    usr_asignacion=actor,
+                )
+            )
+            result.roles_granted += 1
+        elif relation.fch_baja is not None:
+            relation.fch_baja = None
+            relation.usr_baja = None
+            planned_updates.append(relation)
+            result.roles_granted += 1
+
+    for role_id in spec.revoke_role_ids:
+        relation = relations.get(role_id)
+        if relation is not None and relation.fch_baja is None:
+            relation.fch_baja = now
+            relation.usr_baja = actor
+            relation.is_primary = False
+            planned_updates.append(relation)
+            result.roles_revoked += 1
+
+    active = sorted(
+        (relation for relation in relations.values() if relation.fch_baja is None),
+        key=lambda relation: relation.id_usuario_rol,
+    ) + planned_creates
+    if result.roles_revoked and not active:
+        return "CANNOT_REMOVE_LAST_ROLE", "El usuario debe conservar al menos un rol"
+
+    if active and not any(relation.is_primary for relation in active):
+        # Mismo criterio que la asignacion individual: el primer rol vigente.
+        active[0].is_primary = True
+        if active[0] not in planned_creates and active[0] not in planned_updates:
+            planned_updates.append(active[0])
+
+    writes.create_roles.extend(planned_creates)
+    writes.update_roles.extend(planned_updates)
+    return None
+
+
+def _plan_overrides(user, overrides, spec, actor, now, result, writes):
+    # overrides: {id_permiso: RelUsuarioOverride} del usuario.
+    for permission, effect, expires_at in spec.grant_overrides:
+        override = overrides.get(permission.id_permiso)
+        if override is None:
+            writes.create_overrides.append(
+                RelUsuarioOverride(
+                    id_usuario=user,
+                    id_permiso=permission,
+                    efecto=effect,
+                    fch_expira=expires_at,
+                    usr_asignacion=actor,
+                )
+            )
+            result.overrides_granted += 1
+            continue
+
+        if (
+            override.efecto == effect
+            and override.fch_expira == expires_at
+            and override.fch_baja is None
+            and override.usr_baja_id is None
+        ):
+            continue
+        override.efecto = effect
+        override.fch_expira = expires_at
+        override.fch_baja = None
+        override.usr_baja = None
+        if not override.usr_asignacion_id:
+            override.usr_asignacion = actor
+        writes.update_overrides.append(override)
+        result.overrides_granted += 1
+
+    for permission_id in spec.revoke_permission_ids:
+        override = overrides.get(permission_id)
+        if override is not None and override.fch_baja is None:
+            override.fch_baja = now
+            override.usr_baja = actor
+            writes.update_overrides.append(override)
+            result.overrides_revoked += 1
+
+
+def apply_bulk_assignment(
+    *,
+    actor,
+    users,
+    spec: BulkAssignmentRequest,
+    rejected: Optional[Dict[int, Tuple[str, str]]] = None,
+) -> List[BulkItemResult]:
+    """Aplica ``spec`` a ``users`` con escrituras en lote.
+
+    Debe llamarse dentro de una transaccion. ``rejected`` trae errores ya
+    detectados por usuario (p. ej. alcance); esos usuarios no se modifican.
+    Regresa un resultado por usuario en el orden recibido.
+    """
+    rejected = rejected or {}
+    now = timezone.now()
+    user_ids = [user.id_usuario for user in users]
+
+    role_relations: Dict[int, Dict[int, RelUsuarioRol]] = {user_id: {} for user_id in user_ids}
+    if spec.grant_roles or spec.revoke_role_ids:
+        for relation in RelUsuarioRol.objects.filter(id_usuario_id__in=user_ids):
+            role_relations[relation.id_usuario_id][relation.id_rol_id] = relation
+
+    user_overrides: Dict[int, Dict[int, RelUsuarioOverride]] = {user_id: {} for user_id in user_ids}
+    if spec.grant_overrides or spec.revoke_permission_ids:
+        for override in RelUsuarioOverride.objects.filter(id_usuario_id__in=user_ids):
+            user_overrides[override.id_usuario_id][override.id_permiso_id] = override
+
+    writes = _Writes()
+    results = []
+    for user in users:
+        result = BulkItemResult(user_id=user.id_usuario)
+        results.append(result)
+
+        if user.id_usuario in rejected:
+            result.status = "error"
+            result.code, result.message = rejected[user.id_usuario]
+            continue
+
+        user_writes = _Writes()
+        error = _plan_roles(
+            user,
+            role_relations[user.id_usuario],
+            spec,
+            actor,
+            now,
+            result,
+            user_writes,
+        )
+        if error:
+            # Las instancias ya modificadas en memoria se descartan con el usuario.
+            result = BulkItemResult(user_id=user.id_usuario, status="error")
+            result.code, result.message = error
+            results[-1] = result
+            continue
+
+        _plan_overrides(
+            user,
+            user_overrides[user.id_usuario],
+            spec,
+            actor,
+            now,
+            result,
+            user_writes,
+        )
+        result.status = "applied" if result.changed else "unchanged"
+        writes.create_roles.extend(user_writes.create_roles)
+        writes.update_roles.extend(user_writes.update_roles)
+        writes.create_overrides.extend(user_writes.create_overrides)
+        writes.update_overrides.extend(user_writes.update_overrides)
+
+    if writes.create_roles:
+        RelUsuarioRol.objects.bulk_create(writes.create_roles)
+    if writes.update_roles:
+        RelUsuarioRol.objects.bulk_update(_unique(writes.update_roles), ROLE_UPDATE_FIELDS)
+    if writes.create_overrides:
+        RelUsuarioOverride.objects.bulk_create(writes.create_overrides)
+    if writes.update_overrides:
+        RelUsuarioOverride.objects.bulk_update(_unique(writes.update_overrides), OVERRIDE_UPDATE_FIELDS)
+
+    return results
+
+
+def _unique(instances):
+    seen = {}
+    for instance in instances:
+        seen[id(instance)] = instance
+    return list(seen.values())
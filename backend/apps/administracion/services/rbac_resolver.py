@@ -1,7 +1,19 @@
 from dataclasses import dataclass
 from typing import List, Optional
+from django.conf import settings
+from django.db.models import BigIntegerField, CharField, DateTimeField, Exists, Value
 from django.utils import timezone
-from ..models import RelUsuarioRol, RelRolPermiso, RelUsuarioOverride
+from ..models import (
+    RelUsuarioRol,
+    RelRolPermiso,
+    RelUsuarioOverride,
+    RelUsuarioPermisosEfectivos,
+)
+from apps.authentication.models import SyUsuario
+from apps.authentication.services.auth_revision import (
+    get_effective_auth_revision,
+    get_effective_auth_revisions,
+)
 from apps.catalogos.models import Permisos, Roles
 
 
@@ -15,57 +27,200 @@ class UserRole:
     is_primary: bool
 
 
-class RBACResolver:
-    @staticmethod
-    def get_effective_permissions(usuario):
+_ADMIN_MARKER = "ADMIN"
+_ADMIN_CATALOG = "ALL"
+_ROLE_PERMISSION = "ROLE"
+_OVERRIDE = "OVERRIDE"
 
-        roles = RelUsuarioRol.objects.filter(
-            id_usuario=usuario, fch_baja__isnull=True
-        ).select_related("id_rol")
 
-        is_admin = any(r.id_rol.is_admin for r in roles)
+def _materialized_enabled() -> bool:
+    return bool(getattr(settings, "RBAC_MATERIALIZED_PERMISSIONS", False))
 
-        permisos = set()
 
-        if is_admin:
-            permisos.update(
-                Permisos.objects.filter(is_active=True).values_list("codigo", flat=True)
-            )
-        else:
-            for rel in roles:
-                permisos_rol = RelRolPermiso.objects.filter(
-                    id_rol=rel.id_rol, fch_baja__isnull=True, id_permiso__is_active=True
-                )
+def _user_pk(usuario) -> int:
+    return int(getattr(usuario, "id_usuario", usuario))
 
-                permisos.update(p.id_permiso.codigo for p in permisos_rol)
 
-        overrides = RelUsuarioOverride.objects.filter(
-            id_usuario=usuario,
-            fch_baja__isnull=True,
-            id_permiso__is_active=True,
-        ).select_related("id_permiso")
+def _permission_rows_query(user_ids):
+    # Roles, permisos de rol y overrides en una sola sentencia (UNION ALL).
+    null_code = Value(None, output_field=CharField())
+    null_effect = Value(None, output_field=CharField())
+    null_expiry = Value(None, output_field=DateTimeField())
 
-        now = timezone.now()
+    active_roles = RelUsuarioRol.objects.filter(
+        id_usuario_id__in=user_ids, fch_baja__isnull=True
+    )
 
-        has_active_deny = any(
-            ov.efecto == "DENY" and (not ov.fch_expira or ov.fch_expira > now)
-            for ov in overrides
+    admin_markers = active_roles.filter(id_rol__is_admin=True).values_list(
+        "id_usuario_id",
+        Value(_ADMIN_MARKER, output_field=CharField()),
+        null_code,
+        null_effect,
+        null_expiry,
+    )
+
+    admin_catalog = (
+        Permisos.objects.filter(is_active=True)
+        .filter(Exists(active_roles.filter(id_rol__is_admin=True)))
+        .values_list(
+            Value(None, output_field=BigIntegerField()),
+            Value(_ADMIN_CATALOG, output_field=CharField()),
+            "codigo",
+            null_effect,
+            null_expiry,
         )
-        if is_admin and not has_active_deny:
-            return ["*"]
+    )
+
+    role_permissions = RelRolPermiso.objects.filter(
+        fch_baja__isnull=True,
+        id_permiso__is_active=True,
+        id_rol__relusuariorol__id_usuario_id__in=user_ids,
+        id_rol__relusuariorol__fch_baja__isnull=True,
+    ).values_list(
+        "id_rol__relusuariorol__id_usuario_id",
+        Value(_ROLE_PERMISSION, output_field=CharField()),
+        "id_permiso__codigo",
+        null_effect,
+        null_expiry,
+    )
+
+    overrides = RelUsuarioOverride.objects.filter(
+        id_usuario_id__in=user_ids,
+        fch_baja__isnull=True,
+        id_permiso__is_active=True,
+    ).values_list(
+        "id_usuario_id",
+        Value(_OVERRIDE, output_field=CharField()),
+        "id_permiso__codigo",
+        "efecto",
+        "fch_expira",
+    )
+
+    return admin_markers.union(admin_catalog, role_permissions, overrides, all=True)
 
-        for ov in overrides:
-            if ov.fch_expira and ov.fch_expira <= now:
-                continue
 
-            code = ov.id_permiso.codigo
+def _resolve_rows(user_ids, rows, now):
+    admins = set()
+    admin_catalog = set()
+    role_permissions = {user_id: set() for user_id in user_ids}
+    overrides = {user_id: [] for user_id in user_ids}
 
-            if ov.efecto == "DENY":
+    for user_id, kind, code, effect, expires_at in rows:
+        if kind == _ADMIN_MARKER:
+            admins.add(user_id)
+        elif kind == _ADMIN_CATALOG:
+            admin_catalog.add(code)
+        elif kind == _ROLE_PERMISSION:
+            role_permissions[user_id].add(code)
+        else:
+            overrides[user_id].append((code, effect, expires_at))
+
+    resolved = {}
+    for user_id in user_ids:
+        is_admin = user_id in admins
+        permisos = set(admin_catalog) if is_admin else role_permissions[user_id]
+        active_overrides = [
+            (code, effect, expires_at)
+            for code, effect, expires_at in overrides[user_id]
+            if not expires_at or expires_at > now
+        ]
+        next_expiry = min(
+            (expires_at for _, _, expires_at in active_overrides if expires_at),
+            default=None,
+        )
+
+        has_active_deny = any(effect == "DENY" for _, effect, _ in active_overrides)
+        if is_admin and not has_active_deny:
+            resolved[user_id] = (["*"], next_expiry)
+            continue
+
+        for code, effect, _ in active_overrides:
+            if effect == "DENY":
                 permisos.discard(code)
             else:
                 permisos.add(code)
 
-        return sorted(permisos)
+        resolved[user_id] = (sorted(permisos), next_expiry)
+
+    return resolved
+
+
+class RBACResolver:
+    @staticmethod
+    def get_effective_permissions(usuario):
+        if _materialized_enabled():
+            materialized = RBACResolver._read_materialized(usuario)
+            if materialized is not None:
+                return materialized
+            user_id = _user_pk(usuario)
+            return RBACResolver.refresh_materialized_permissions([user_id])[user_id]
+
+        user_id = _user_pk(usuario)
+        return RBACResolver.compute_effective_permissions([user_id])[user_id][0]
+
+    @staticmethod
+    def compute_effective_permissions(user_ids):
+        """Resolve effective permissions for several users in one query."""
+        unique_ids = sorted({int(user_id) for user_id in user_ids if user_id is not None})
+        if not unique_ids:
+            return {}
+
+        rows = list(_permission_rows_query(unique_ids))
+        return _resolve_rows(unique_ids, rows, timezone.now())
+
+    @staticmethod
+    def _read_materialized(usuario):
+        row = (
+            RelUsuarioPermisosEfectivos.objects.filter(id_usuario_id=_user_pk(usuario))
+            .only("permisos", "fch_revision", "fch_expira_min")
+            .first()
+        )
+        if row is None:
+            return None
+
+        # La fila es valida mientras no cambie la revision ni expire un override.
+        if isinstance(usuario, SyUsuario):
+            revision = get_effective_auth_revision(usuario)
+        else:
+            revision = get_effective_auth_revisions([_user_pk(usuario)]).get(
+                _user_pk(usuario)
+            )
+        if revision is None or row.fch_revision != revision:
+            return None
+        if row.fch_expira_min and row.fch_expira_min <= timezone.now():
+            return None
+        return list(row.permisos)
+
+    @staticmethod
+    def refresh_materialized_permissions(user_ids):
+        """Recompute and store effective permissions for the given users."""
+        if not _materialized_enabled():
+            return {}
+
+        resolved = RBACResolver.compute_effective_permissions(user_ids)
+        if not resolved:
+            return {}
+
+        revisions = get_effective_auth_revisions(list(resolved))
+
+        # Upsert por id_usuario: dos refrescos concurrentes del mismo usuario no chocan.
+        RelUsuarioPermisosEfectivos.objects.bulk_create(
+            [
+                RelUsuarioPermisosEfectivos(
+                    id_usuario_id=user_id,
+                    permisos=permisos,
+                    fch_revision=revisions.get(user_id),
+                    fch_expira_min=next_expiry,
+                )
+                for user_id, (permisos, next_expiry) in resolved.items()
+                if user_id in revisions
+            ],
+            update_conflicts=True,
+            unique_fields=["id_usuario"],
+            update_fields=["permisos", "fch_revision", "fch_expira_min"],
+        )
+
+        return {user_id: permisos for user_id, (permisos, _) in resolved.items()}
 
     @staticmethod
     def get_user_roles(usuario) -> List[UserRole]:
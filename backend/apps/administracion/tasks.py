@@ -0,0 +1,46 @@
+"""
+apps/administracion/tasks.py
+============================
+Tareas Celery del módulo de administración.
+"""
+
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from .services.audit_partitions import detach_audit_partitions, ensure_audit_partitions
+from .services.audit_read_counters import flush_read_counters
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def mantener_particiones_auditoria():
+    """
+    Diario.
+
+    Crea por adelantado las particiones mensuales de auditoria_eventos y
+    archiva las que salen de la ventana de retención (si está configurada).
+    """
+    created = ensure_audit_partitions(getattr(settings, "AUDIT_PARTITION_MONTHS_AHEAD", 3))
+    detached = detach_audit_partitions(getattr(settings, "AUDIT_RETENTION_MONTHS", 0))
+    logger.info(
+        "Particiones de auditoria: creadas=%s separadas=%s",
+        created,
+        detached,
+    )
+    return {"created": created, "detached": detached}
+
+
+@shared_task
+def vaciar_contadores_lectura():
+    """
+    Cada AUDIT_READ_FLUSH_MINUTES.
+
+    Convierte los contadores de lecturas de las ventanas cerradas en un
+    evento resumen de auditoria por actor y accion.
+    """
+    written = flush_read_counters()
+    logger.info("Resumenes de lecturas de auditoria escritos: %s", written)
+    return {"written": written}
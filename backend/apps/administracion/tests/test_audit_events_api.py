@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.administracion.models import AuditoriaEvento, RelUsuarioRol
+from apps.authentication.models import SyUsuario
+from apps.authentication.services.token_service import (
+    ACCESS_COOKIE,
+    create_access_refresh_tokens,
+)
+from apps.catalogos.models import Roles
+
+
+class AuditEventsApiTests(APITestCase):
+    def setUp(self):
+        self.admin = SyUsuario.objects.create(
+            usuario="audit_admin",
+            correo="audit.admin@example.com",
+            clave_hash=make_password("Admin_123456"),
+            est_activo=True,
+            cambiar_clave=False,
+            terminos_acept=True,
+        )
+        admin_role = Roles.objects.create(
+            rol="ADMIN_AUDIT_TEST",
+            desc_rol="Administrador",
+            landing_route="/admin",
+            is_admin=True,
+            is_active=True,
+        )
+        RelUsuarioRol.objects.create(id_usuario=self.admin, id_rol=admin_role, is_primary=True)
+
+        base = timezone.now() - timedelta(hours=1)
+        for index in range(5):
+            AuditoriaEvento.objects.create(
+                fch_evento=base + timedelta(minutes=index),
+                request_id=f"req-audit-{index}",
+                accion="RBAC_ROLE_LIST" if index % 2 == 0 else "AUTH_LOGIN",
+                recurso_tipo="role",
+                resultado="SUCCESS",
+                actor_usuario=self.admin,
+                meta={"module": "rbac" if index % 2 == 0 else "auth"},
+            )
+
+        access_token, _ = create_access_refresh_tokens(self.admin)
+        self.client.cookies[ACCESS_COOKIE] = access_token
+
+    def test_keyset_pagination_walks_filtered_events_newest_first(self):
+        first = self.client.get("/api/v1/audit/events", {"module": "rbac", "limit": 2})
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["requestId"] for item in first.data["items"]],
+            ["req-audit-4", "req-audit-2"],
+        )
+        self.assertIsNotNone(first.data["nextCursor"])
+
+        second = self.client.get(
+            "/api/v1/audit/events",
+            {"module": "rbac", "limit": 2, "cursor": first.data["nextCursor"]},
+        )
+
+        self.assertEqual(
+            [item["requestId"] for item in second.data["items"]],
+            ["req-audit-0"],
+        )
+        self.assertIsNone(second.data["nextCursor"])
+
+    def test_filters_by_action_actor_and_request_id(self):
+        response = self.client.get(
+            "/api/v1/audit/events",
+            {"action": "AUTH_LOGIN", "actorId": self.admin.id_usuario, "requestId": "req-audit-3"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["items"]), 1)
+        self.assertEqual(response.data["items"][0]["actor"]["id"], self.admin.id_usuario)
+
+    def test_csv_export_streams_all_matching_rows(self):
+        response = self.client.get("/api/v1/audit/events", {"export": "csv", "module": "auth"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        # Iterador asincrono: bajo ASGI se envia por bloques sin cargarse completo.
+        self.assertTrue(response.is_async)
+
+        async def consume():
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        lines = async_to_sync(consume)().decode().strip().splitlines()
+        self.assertTrue(lines[0].startswith("id,fecha,request_id"))
+        self.assertEqual(len(lines), 3)
+
+    def test_rejects_invalid_cursor(self):
+        response = self.client.get("/api/v1/audit/events", {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["code"], "VALIDATION_ERROR")
+
+    def test_requires_audit_permission(self):
+        user = SyUsuario.objects.create(
+            usuario="audit_reader_denied",
+            correo="audit.denied@example.com",
+            clave_hash=make_password("Reader_123456"),
+            est_activo=True,
+            cambiar_clave=False,
+            terminos_acept=True,
+        )
+        access_token, _ = create_access_refresh_tokens(user)
+        self.client.cookies[ACCESS_COOKIE] = access_token
+
+        response = self.client.get("/api/v1/audit/events")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
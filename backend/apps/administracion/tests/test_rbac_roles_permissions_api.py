@@ -1,12 +1,16 @@
 from datetime import timedelta
 
 from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from apps.administracion.models import RelRolPermiso, RelUsuarioRol
 from apps.authentication.models import DetUsuario, SyUsuario
+from apps.authentication.services.auth_revision import serialize_auth_revision
 from apps.authentication.services.token_service import CSRF_COOKIE
 from apps.catalogos.models import CatPermiso, CatRol, Permisos, Roles
 
@@ -107,6 +111,36 @@ class RbacRolesPermissionsApiTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(response.data["total"], 1)
 
+    def test_roles_list_counts_are_annotated_and_query_count_is_constant(self):
+        RelRolPermiso.objects.create(id_rol=self.target_role, id_permiso=self.perm_read)
+        RelRolPermiso.objects.create(id_rol=self.target_role, id_permiso=self.perm_update)
+        RelUsuarioRol.objects.create(id_usuario=self.admin, id_rol=self.target_role)
+        # Calienta caches de sesion/principal para comparar solo el listado.
+        self.client.get("/api/v1/roles?pageSize=50")
+
+        with CaptureQueriesContext(connection) as small_page:
+            response = self.client.get("/api/v1/roles?pageSize=50")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        target = next(item for item in response.data["items"] if item["id"] == self.target_role.id_rol)
+        self.assertEqual(target["permissionsCount"], 2)
+        self.assertEqual(target["usersCount"], 1)
+        self.assertEqual(target["createdBy"], {"id": 0, "name": "Sistema"})
+
+        for index in range(10):
+            Roles.objects.create(
+                rol=f"ROL_EXTRA_{index}",
+                desc_rol="Extra",
+                is_active=True,
+                created_by_id=self.admin.id_usuario,
+                updated_by_id=self.admin.id_usuario,
+            )
+        with CaptureQueriesContext(connection) as large_page:
+            response = self.client.get("/api/v1/roles?pageSize=50")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(large_page.captured_queries), len(small_page.captured_queries) + 1)
+        extra = next(item for item in response.data["items"] if item["name"] == "ROL_EXTRA_0")
+        self.assertEqual(extra["createdBy"], {"id": self.admin.id_usuario, "name": "Admin Roles"})
+
     def test_roles_list_invalid_is_system_returns_validation_error(self):
         response = self.client.get("/api/v1/roles?isSystem=talvez")
 
@@ -371,6 +405,7 @@ class RbacRolesPermissionsApiTests(APITestCase):
         self.assertIsNone(relation.fch_baja)
 
     def test_assign_role_permissions_updates_auth_revision_for_associated_users(self):
+        cache.clear()
         target_user = SyUsuario.objects.create(
             usuario="role_sync_user",
             correo="role.sync.user@example.com",
@@ -394,6 +429,7 @@ class RbacRolesPermissionsApiTests(APITestCase):
         )
 
         self.assertIsNone(target_user.fch_modf)
+        revision_before = serialize_auth_revision(target_user)
 
         response = self.client.post(
             "/api/v1/permissions/assign",
@@ -407,7 +443,9 @@ class RbacRolesPermissionsApiTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         target_user.refresh_from_db()
-        self.assertIsNotNone(target_user.fch_modf)
+        # Solo se publica la revision del rol; el usuario no se modifica.
+        self.assertIsNone(target_user.fch_modf)
+        self.assertNotEqual(serialize_auth_revision(target_user), revision_before)
 
     def test_assign_role_permissions_deactivates_unrequested_relations(self):
         keep_relation = RelRolPermiso.objects.create(
@@ -2,8 +2,11 @@ from datetime import timedelta
 from types import SimpleNamespace
 from unittest.mock import patch
 
+from django.core.cache import cache
+from django.db import IntegrityError, OperationalError, connection
 from django.http import HttpResponse
-from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
@@ -14,16 +17,22 @@ from apps.administracion.constants.rbac_actions import RBACActions
 from apps.administracion.exceptions import custom_exception_handler
 from apps.administracion.middleware.request_id import RequestIDMiddleware
 from apps.administracion.models import (AuditoriaEvento, RelRolPermiso,
-                                        RelUsuarioOverride, RelUsuarioRol)
+                                        RelUsuarioOverride,
+                                        RelUsuarioPermisosEfectivos,
+                                        RelUsuarioRol)
 from apps.administracion.serializers.role_serializers import RoleDetailSerializer
+from apps.administracion.services import audit_read_counters
 from apps.administracion.services.audit_service import AuditService
+from apps.administracion.services.audit_writer import MAX_WRITE_ATTEMPTS, AuditWriter
 from apps.administracion.services.rbac_resolver import RBACResolver
 from apps.administracion.use_cases.roles.create_role import CreateRoleUseCase
 from apps.administracion.use_cases.users.assign_roles import AssignRolesUseCase
 from apps.administracion.views.role_views import RoleCreateView
 from apps.administracion.views import rbac_views
 from apps.authentication.models import DetUsuario, SyUsuario
+from apps.authentication.services.auth_revision import bump_role_revisions
 from apps.catalogos.models import Permisos, Roles
+from apps.catalogos.services.catalog_version_service import get_catalog_version
 
 
 class RequestIDMiddlewareTests(SimpleTestCase):
@@ -186,6 +195,62 @@ class RbacResolverTests(TestCase):
         self.assertIn("farmacia:read", permissions)
 
 
+    @override_settings(RBAC_MATERIALIZED_PERMISSIONS=False)
+    def test_resolves_roles_permissions_and_overrides_in_one_query(self):
+        RelUsuarioOverride.objects.create(
+            id_usuario=self.user,
+            id_permiso=self.perm_write,
+            efecto="DENY",
+        )
+
+        with self.assertNumQueries(1):
+            permissions = RBACResolver.get_effective_permissions(self.user)
+
+        self.assertEqual(permissions, ["expedientes:read"])
+
+    @override_settings(RBAC_MATERIALIZED_PERMISSIONS=True)
+    def test_materialized_permissions_are_read_until_revision_changes(self):
+        RBACResolver.refresh_materialized_permissions([self.user.id_usuario])
+        RelRolPermiso.objects.filter(id_permiso=self.perm_write).delete()
+
+        with self.assertNumQueries(1):
+            permissions = RBACResolver.get_effective_permissions(self.user)
+        self.assertIn("expedientes:update", permissions)
+
+        self.user.fch_modf = timezone.now()
+        self.user.save(update_fields=["fch_modf"])
+
+        permissions = RBACResolver.get_effective_permissions(self.user)
+        self.assertEqual(permissions, ["expedientes:read"])
+        self.assertEqual(
+            RelUsuarioPermisosEfectivos.objects.get(id_usuario=self.user).permisos,
+            ["expedientes:read"],
+        )
+
+    @override_settings(RBAC_MATERIALIZED_PERMISSIONS=True)
+    def test_refresh_upserts_existing_materialized_row(self):
+        RBACResolver.refresh_materialized_permissions([self.user.id_usuario])
+        RelRolPermiso.objects.filter(id_permiso=self.perm_write).delete()
+
+        RBACResolver.refresh_materialized_permissions([self.user.id_usuario])
+
+        rows = RelUsuarioPermisosEfectivos.objects.filter(id_usuario=self.user)
+        self.assertEqual(rows.count(), 1)
+        self.assertEqual(rows.get().permisos, ["expedientes:read"])
+
+    @override_settings(RBAC_MATERIALIZED_PERMISSIONS=True)
+    def test_role_revision_invalidates_materialized_permissions_without_touching_user(self):
+        cache.clear()
+        RBACResolver.refresh_materialized_permissions([self.user.id_usuario])
+        RelRolPermiso.objects.filter(id_permiso=self.perm_write).delete()
+
+        bump_role_revisions([self.role.id_rol])
+
+        permissions = RBACResolver.get_effective_permissions(self.user)
+        self.assertEqual(permissions, ["expedientes:read"])
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.fch_modf)
+
 class AssignRolesUseCaseTests(TestCase):
     def setUp(self):
         self.user = SyUsuario.objects.create(
@@ -262,6 +327,20 @@ class CreateRoleUseCaseAndSerializerTests(TestCase):
             ).exists()
         )
 
+    def test_create_role_bumps_roles_catalog_version_only_after_commit(self):
+        request = self.factory.post("/api/v1/roles")
+        request.user = self.actor
+        request.request_id = "req-role-on-commit"
+        before = get_catalog_version("roles")
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            CreateRoleUseCase.execute(request, {"name": "ROLE_ON_COMMIT"})
+            self.assertEqual(get_catalog_version("roles"), before)
+
+        for callback in callbacks:
+            callback()
+        self.assertGreater(get_catalog_version("roles"), before)
+
     def test_role_detail_serializer_shape(self):
         role = Roles.objects.create(
             rol="SERIALIZER_ROLE",
@@ -329,6 +408,286 @@ class AuditServiceTests(TestCase):
         self.assertEqual(event.ip_origen, "10.0.0.5")
 
 
+class AuditWriterTests(TestCase):
+    def _event(self, request_id, **fields):
+        return AuditoriaEvento(
+            request_id=request_id,
+            accion="AUTH_LOGIN",
+            recurso_tipo="auth",
+            resultado="SUCCESS",
+            **fields,
+        )
+
+    def test_buffers_events_until_flush_and_writes_them_in_bulk(self):
+        writer = AuditWriter(batch_size=10, background=False)
+        writer.submit(self._event("req-buffer-1"))
+        writer.submit(self._event("req-buffer-2"))
+
+        self.assertEqual(writer.pending(), 2)
+        self.assertFalse(AuditoriaEvento.objects.filter(request_id__startswith="req-buffer").exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(writer.flush(), 2)
+        inserts = [query for query in queries if query["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(writer.pending(), 0)
+        self.assertEqual(
+            AuditoriaEvento.objects.filter(request_id__startswith="req-buffer").count(),
+            2,
+        )
+
+    def test_full_buffer_applies_back_pressure_on_submitter(self):
+        writer = AuditWriter(max_events=1, background=False)
+        writer.submit(self._event("req-full-1"))
+        writer.submit(self._event("req-full-2"))
+
+        self.assertEqual(writer.pending(), 1)
+        self.assertTrue(AuditoriaEvento.objects.filter(request_id="req-full-1").exists())
+
+    def test_rejected_batch_is_retried_per_event(self):
+        writer = AuditWriter(background=False)
+        writer.submit(self._event("req-retry-1"))
+        writer.submit(self._event("req-retry-2"))
+
+        with patch.object(
+            AuditoriaEvento.objects,
+            "bulk_create",
+            side_effect=IntegrityError("fk"),
+        ):
+            self.assertEqual(writer.flush(), 2)
+
+        self.assertEqual(
+            AuditoriaEvento.objects.filter(request_id__startswith="req-retry").count(),
+            2,
+        )
+
+    def test_database_error_puts_batch_back_until_it_can_be_written(self):
+        writer = AuditWriter(background=False)
+        writer.submit(self._event("req-down-1"))
+        writer.submit(self._event("req-down-2"))
+
+        with patch.object(
+            AuditoriaEvento.objects,
+            "bulk_create",
+            side_effect=OperationalError("conexion perdida"),
+        ):
+            self.assertEqual(writer.flush(), 0)
+
+        self.assertEqual(writer.pending(), 2)
+        self.assertEqual(writer.flush(), 2)
+        self.assertEqual(
+            AuditoriaEvento.objects.filter(request_id__startswith="req-down").count(),
+            2,
+        )
+
+    def test_database_error_during_per_event_retry_requeues_only_unwritten_events(self):
+        writer = AuditWriter(background=False)
+        for index in range(3):
+            writer.submit(self._event(f"req-partial-{index}"))
+        save = AuditoriaEvento.save
+        calls = []
+
+        def flaky_save(event, *args, **kwargs):
+            calls.append(event.request_id)
+            if len(calls) == 2:
+                raise OperationalError("conexion perdida")
+            return save(event, *args, **kwargs)
+
+        with patch.object(
+            AuditoriaEvento.objects,
+            "bulk_create",
+            side_effect=IntegrityError("fk"),
+        ), patch.object(AuditoriaEvento, "save", flaky_save):
+            self.assertEqual(writer.flush(), 0)
+
+        self.assertEqual(writer.pending(), 2)
+        self.assertEqual(writer.flush(), 2)
+        self.assertEqual(
+            sorted(AuditoriaEvento.objects.filter(request_id__startswith="req-partial").values_list("request_id", flat=True)),
+            ["req-partial-0", "req-partial-1", "req-partial-2"],
+        )
+
+    def test_database_error_retries_are_bounded(self):
+        writer = AuditWriter(background=False)
+        writer.submit(self._event("req-bounded-1"))
+
+        with patch.object(
+            AuditoriaEvento.objects,
+            "bulk_create",
+            side_effect=OperationalError("sin particion"),
+        ), self.assertLogs("apps.administracion.services.audit_writer", level="ERROR"):
+            for _ in range(MAX_WRITE_ATTEMPTS):
+                writer.flush()
+
+        self.assertEqual(writer.pending(), 0)
+
+
+@override_settings(AUDIT_READ_AGGREGATION=True, AUDIT_READ_FLUSH_MINUTES=5)
+class ReadAuditAggregationTests(TestCase):
+    def setUp(self):
+        audit_read_counters._local_counters.clear()
+        audit_read_counters._redis_checked_bucket = None
+        self.actor = SyUsuario.objects.create(
+            usuario="lector_auditoria",
+            correo="lector.auditoria@example.com",
+            clave_hash="x",
+            est_activo=True,
+        )
+
+    def test_reads_in_window_are_flushed_as_one_summary_event(self):
+        for offset in range(3):
+            audit_read_counters.record_read(
+                action="RBAC_USER_LIST",
+                resource_type="user",
+                actor_id=self.actor.id_usuario,
+                actor_name="Lector",
+                now=1000 + offset,
+            )
+
+        self.assertEqual(audit_read_counters.flush_read_counters(now=1000), 0)
+        self.assertEqual(audit_read_counters.flush_read_counters(now=1000 + 300), 1)
+
+        event = AuditoriaEvento.objects.get(accion="RBAC_USER_LIST")
+        self.assertEqual(event.actor_usuario_id, self.actor.id_usuario)
+        self.assertEqual(event.meta["count"], 3)
+        self.assertTrue(event.meta["aggregated"])
+        self.assertEqual(audit_read_counters.flush_read_counters(now=1000 + 300), 0)
+
+    def test_audit_helper_aggregates_successful_list_reads_only(self):
+        request = RequestFactory().get("/api/v1/users")
+        request.user = self.actor
+
+        rbac_views._audit(request, "RBAC_USER_LIST", "user", result="SUCCESS")
+        rbac_views._audit(request, "RBAC_USER_LIST", "user", result="FAIL", error_code="VALIDATION_ERROR")
+        rbac_views._audit(request, "RBAC_USER_DETAIL", "user", resource_id=1, result="SUCCESS")
+
+        self.assertEqual(
+            sorted(AuditoriaEvento.objects.values_list("accion", "resultado")),
+            [("RBAC_USER_DETAIL", "SUCCESS"), ("RBAC_USER_LIST", "FAIL")],
+        )
+        self.assertEqual(audit_read_counters.flush_read_counters(force=True), 1)
+
+
+    def test_local_windows_are_kept_when_the_summary_cannot_be_written(self):
+        audit_read_counters.record_read(
+            action="RBAC_USER_LIST", resource_type="user", actor_id=self.actor.id_usuario, now=1000
+        )
+
+        with patch.object(audit_read_counters, "_emit", side_effect=OperationalError("db caida")):
+            with self.assertRaises(OperationalError):
+                audit_read_counters.flush_read_counters(now=1000 + 300)
+
+        self.assertEqual(audit_read_counters.flush_read_counters(now=1000 + 300), 1)
+        self.assertEqual(AuditoriaEvento.objects.get(accion="RBAC_USER_LIST").meta["count"], 1)
+
+    def test_redis_window_is_deleted_only_after_the_summary_is_written(self):
+        client = _FakeHashRedis()
+        bucket = audit_read_counters._window_start(1000)
+        field = '[%d, "Lector", "RBAC_USER_LIST", "user", "rbac"]' % self.actor.id_usuario
+        client.hashes[f"{audit_read_counters.READ_COUNTERS_KEY}:{bucket}"] = {field: b"2"}
+
+        with patch.object(audit_read_counters, "get_redis_client", return_value=client):
+            with patch.object(audit_read_counters, "_emit", side_effect=OperationalError("db caida")):
+                self.assertEqual(audit_read_counters.flush_read_counters(now=1000 + 300), 0)
+            self.assertEqual(
+                list(client.hashes),
+                [f"{audit_read_counters.READ_COUNTERS_KEY}:{bucket}:flushing"],
+            )
+
+            self.assertEqual(audit_read_counters.flush_read_counters(now=1000 + 300), 1)
+
+        self.assertEqual(client.hashes, {})
+        self.assertEqual(AuditoriaEvento.objects.get(accion="RBAC_USER_LIST").meta["count"], 2)
+
+
+    def test_closed_redis_window_is_flushed_by_the_next_read(self):
+        client = _FakeHashRedis()
+        with patch.object(audit_read_counters, "get_redis_client", return_value=client):
+            for offset in range(2):
+                audit_read_counters.record_read(
+                    action="RBAC_ROLE_LIST", resource_type="role", actor_id=self.actor.id_usuario, now=1000 + offset
+                )
+            self.assertFalse(AuditoriaEvento.objects.filter(accion="RBAC_ROLE_LIST").exists())
+
+            audit_read_counters.record_read(
+                action="RBAC_ROLE_LIST", resource_type="role", actor_id=self.actor.id_usuario, now=1000 + 300
+            )
+
+        self.assertEqual(AuditoriaEvento.objects.get(accion="RBAC_ROLE_LIST").meta["count"], 2)
+        current = audit_read_counters._window_start(1000 + 300)
+        self.assertEqual(list(client.hashes), [f"{audit_read_counters.READ_COUNTERS_KEY}:{current}"])
+
+    def test_flushing_window_claimed_by_another_flush_is_not_written_twice(self):
+        client = _FakeHashRedis()
+        bucket = audit_read_counters._window_start(1000)
+        field = '[%d, "Lector", "RBAC_USER_LIST", "user", "rbac"]' % self.actor.id_usuario
+        flushing_key = f"{audit_read_counters.READ_COUNTERS_KEY}:{bucket}:flushing"
+        client.hashes[flushing_key] = {field: b"4"}
+        # Otro flush la renombro y sigue escribiendo.
+        client.set(f"{audit_read_counters.FLUSH_CLAIM_KEY}:{bucket}", 1)
+
+        with patch.object(audit_read_counters, "get_redis_client", return_value=client):
+            self.assertEqual(audit_read_counters.flush_read_counters(now=1000 + 300), 0)
+            self.assertIn(flushing_key, client.hashes)
+
+            # El reclamo vencio: la ventana quedo huerfana y se retoma.
+            client.delete(f"{audit_read_counters.FLUSH_CLAIM_KEY}:{bucket}")
+            self.assertEqual(audit_read_counters.flush_read_counters(now=1000 + 300), 1)
+
+        self.assertEqual(client.hashes, {})
+        self.assertEqual(AuditoriaEvento.objects.get(accion="RBAC_USER_LIST").meta["count"], 4)
+
+class _FakeHashRedis:
+    def __init__(self):
+        self.hashes = {}
+        self.strings = {}
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+    def hincrby(self, key, field, amount):
+        counters = self.hashes.setdefault(key, {})
+        counters[field] = int(counters.get(field, 0)) + amount
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+    def scan_iter(self, match, count=None):
+        prefix = match.rstrip("*")
+        return [key.encode() for key in [*self.hashes, *self.strings] if key.startswith(prefix)]
+
+    def renamenx(self, key, new_key):
+        if new_key in self.hashes:
+            return False
+        self.hashes[new_key] = self.hashes.pop(key)
+        return True
+
+    def hgetall(self, key):
+        return {field.encode(): count for field, count in self.hashes.get(key, {}).items()}
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+        self.strings.pop(key, None)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def hincrby(self, key, field, amount):
+        self.calls.append(lambda: self.client.hincrby(key, field, amount))
+
+    def expire(self, key, seconds):
+        self.calls.append(lambda: None)
+
+    def execute(self):
+        return [call() for call in self.calls]
+
+
 class RbacViewHelpersTests(TestCase):
     def test_parse_bool_helper(self):
         self.assertTrue(rbac_views._parse_bool("true"))
@@ -423,7 +782,7 @@ class RbacViewHelpersTests(TestCase):
         self.assertEqual(error.status_code, 401)
         self.assertEqual(error.data["code"], "TOKEN_INVALID")
 
-    @patch("apps.administracion.views.rbac_views.AuditoriaEvento.objects.create")
+    @patch("apps.administracion.views.rbac_views.record_audit_event")
     def test_audit_swallows_internal_errors(self, create_mock):
         create_mock.side_effect = RuntimeError("db down")
         request = APIRequestFactory().get("/api/v1/roles")
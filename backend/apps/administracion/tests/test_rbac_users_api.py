@@ -2,6 +2,8 @@ from datetime import datetime, timedelta, timezone as dt_timezone
 from unittest.mock import patch
 
 from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -188,6 +190,47 @@ class RbacUsersApiTests(APITestCase):
         response_inactive = self.client.get("/api/v1/users?status=inactive")
         self.assertEqual(response_inactive.status_code, status.HTTP_200_OK)
 
+    def test_users_list_cursor_pagination_walks_all_users(self):
+        for index in range(3):
+            SyUsuario.objects.create(
+                usuario=f"cursor_user_{index}",
+                correo=f"cursor.user.{index}@example.com",
+                clave_hash="hash",
+                est_activo=True,
+            )
+
+        seen = []
+        cursor = ""
+        while True:
+            response = self.client.get(f"/api/v1/users?pageSize=2&cursor={cursor}&total=exact")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["total"], 5)
+            self.assertFalse(response.data["totalIsEstimate"])
+            seen.extend(item["username"] for item in response.data["items"])
+            cursor = response.data["nextCursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(seen, sorted(seen))
+        self.assertEqual(len(seen), 5)
+        target = self.client.get("/api/v1/users?search=target_user&cursor=").data["items"][0]
+        self.assertEqual(target["primaryRole"], "MEDICO_USERS")
+
+    def test_users_list_invalid_cursor_returns_validation_error(self):
+        response = self.client.get("/api/v1/users?cursor=no-es-un-cursor")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["code"], "VALIDATION_ERROR")
+
+    def test_users_list_role_filter_does_not_duplicate_users(self):
+        RelUsuarioRol.objects.create(id_usuario=self.target_user, id_rol=self.role_recepcion)
+
+        response = self.client.get(f"/api/v1/users?roleId={self.role_medico.id_rol}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total"], 1)
+        self.assertEqual([item["username"] for item in response.data["items"]], ["target_user"])
+
     def test_users_list_invalid_is_active_returns_validation_error(self):
         response = self.client.get("/api/v1/users?isActive=quizas")
 
@@ -332,6 +375,44 @@ class RbacUsersApiTests(APITestCase):
         self.assertIn("fullname", response.data["user"])
         self.assertIn("fullName", response.data["user"])
 
+    def test_user_detail_resolves_all_user_refs_in_one_query(self):
+        creator, modifier, assigner = (
+            SyUsuario.objects.create(
+                usuario=f"ref_user_{index}",
+                correo=f"ref.user.{index}@example.com",
+                clave_hash="x",
+                est_activo=True,
+            )
+            for index in range(3)
+        )
+        SyUsuario.objects.filter(id_usuario=self.target_user.id_usuario).update(
+            usr_alta=creator, usr_modf=modifier
+        )
+        RelUsuarioOverride.objects.create(
+            id_usuario=self.target_user,
+            id_permiso=self.override_permission,
+            efecto="ALLOW",
+            usr_asignacion=assigner,
+        )
+        url = f"/api/v1/users/{self.target_user.id_usuario}"
+        # Calienta caches de sesion/principal para medir solo el detalle.
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["user"]["createdBy"]["id"], creator.id_usuario)
+        self.assertEqual(response.data["user"]["updatedBy"]["id"], modifier.id_usuario)
+        self.assertEqual(response.data["roles"][0]["assignedBy"]["id"], self.admin.id_usuario)
+        self.assertEqual(response.data["overrides"][0]["assignedBy"]["id"], assigner.id_usuario)
+        ref_queries = [
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "sy_usuarios"' in query["sql"] and '"sy_usuarios"."id_usuario" IN (' in query["sql"]
+        ]
+        self.assertEqual(len(ref_queries), 1)
+
     def test_user_detail_not_found(self):
         response = self.client.get("/api/v1/users/999999")
 
@@ -1209,3 +1290,106 @@ class RbacUsersApiTests(APITestCase):
             RelUsuarioOverride.objects.filter(id_usuario=self.target_user, fch_baja__isnull=True).count(),
             0,
         )
+
+    def _create_second_user(self):
+        user = SyUsuario.objects.create(
+            usuario="second_user",
+            correo="second.user@example.com",
+            clave_hash=make_password("Second_123456"),
+            est_activo=True,
+            cambiar_clave=False,
+            terminos_acept=True,
+        )
+        RelUsuarioRol.objects.create(
+            id_usuario=user,
+            id_rol=self.role_recepcion,
+            is_primary=True,
+            usr_asignacion=self.admin,
+        )
+        return user
+
+    def test_bulk_assignment_applies_roles_and_overrides(self):
+        second_user = self._create_second_user()
+
+        response = self.client.post(
+            "/api/v1/users/bulk-assignments",
+            {
+                "userIds": [self.target_user.id_usuario, second_user.id_usuario, 999999],
+                "grantRoleIds": [self.role_recepcion.id_rol],
+                "revokeRoleIds": [self.role_medico.id_rol],
+                "grantOverrides": [
+                    {"permissionCode": self.override_permission.codigo, "effect": "ALLOW"},
+                ],
+            },
+            format="json",
+            HTTP_X_CSRF_TOKEN=self.csrf_token,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statuses = {item["userId"]: item["status"] for item in response.data["results"]}
+        self.assertEqual(statuses[self.target_user.id_usuario], "applied")
+        self.assertEqual(statuses[second_user.id_usuario], "applied")
+        self.assertEqual(statuses[999999], "error")
+        self.assertEqual(response.data["results"][2]["code"], "USER_NOT_FOUND")
+        self.assertEqual(response.data["summary"], {"requested": 3, "applied": 2, "unchanged": 0, "errors": 1})
+
+        target_roles = RelUsuarioRol.objects.filter(id_usuario=self.target_user, fch_baja__isnull=True)
+        self.assertEqual([relation.id_rol_id for relation in target_roles], [self.role_recepcion.id_rol])
+        self.assertTrue(target_roles.get().is_primary)
+        self.assertEqual(
+            RelUsuarioOverride.objects.filter(
+                id_permiso=self.override_permission,
+                efecto="ALLOW",
+                fch_baja__isnull=True,
+            ).count(),
+            2,
+        )
+
+    def test_bulk_assignment_reports_last_role_per_item(self):
+        second_user = self._create_second_user()
+        RelUsuarioRol.objects.create(id_usuario=second_user, id_rol=self.role_medico, usr_asignacion=self.admin)
+
+        response = self.client.post(
+            "/api/v1/users/bulk-assignments",
+            {
+                "userIds": [self.target_user.id_usuario, second_user.id_usuario],
+                "revokeRoleIds": [self.role_medico.id_rol],
+            },
+            format="json",
+            HTTP_X_CSRF_TOKEN=self.csrf_token,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        target_result, second_result = response.data["results"]
+        self.assertEqual(target_result["code"], "CANNOT_REMOVE_LAST_ROLE")
+        self.assertEqual(second_result["status"], "applied")
+        self.assertTrue(
+            RelUsuarioRol.objects.filter(
+                id_usuario=self.target_user,
+                id_rol=self.role_medico,
+                fch_baja__isnull=True,
+            ).exists()
+        )
+        self.assertFalse(
+            RelUsuarioRol.objects.filter(
+                id_usuario=second_user,
+                id_rol=self.role_medico,
+                fch_baja__isnull=True,
+            ).exists()
+        )
+
+    def test_bulk_assignment_validates_payload(self):
+        response = self.client.post(
+            "/api/v1/users/bulk-assignments",
+            {
+                "userIds": [self.target_user.id_usuario],
+                "grantRoleIds": [self.role_medico.id_rol],
+                "revokeRoleIds": [self.role_medico.id_rol],
+            },
+            format="json",
+            HTTP_X_CSRF_TOKEN=self.csrf_token,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["code"], "VALIDATION_ERROR")
+        self.assertIn("revokeRoleIds", response.data["details"])
@@ -7,6 +7,7 @@ from .views.rbac_views import (
     RoleDetailView,
     RolesListCreateView,
     UserActivateView,
+    UserBulkAssignmentView,
     UserDeactivateView,
     UserDetailView,
     UserOverrideRemoveView,
@@ -18,6 +19,7 @@ from .views.rbac_views import (
     
 )
 
+from .views.audit_views import AuditEventsView
 from .views.expediente_view import ExpedienteView, ActualizarExpedienteView
 
 
@@ -32,6 +34,7 @@ urlpatterns = [
         name="rbac-role-permission-revoke",
     ),
     path("users", UsersListCreateView.as_view(), name="rbac-users-list-create"),
+    path("users/bulk-assignments", UserBulkAssignmentView.as_view(), name="rbac-users-bulk-assign"),
     path("users/<int:user_id>", UserDetailView.as_view(), name="rbac-user-detail-update"),
     path("users/<int:user_id>/activate", UserActivateView.as_view(), name="rbac-user-activate"),
     path("users/<int:user_id>/deactivate", UserDeactivateView.as_view(), name="rbac-user-deactivate"),
@@ -40,6 +43,7 @@ urlpatterns = [
     path("users/<int:user_id>/roles/<int:role_id>", UserRoleRevokeView.as_view(), name="rbac-user-role-revoke"),
     path("users/<int:user_id>/overrides", UserOverridesView.as_view(), name="rbac-user-overrides-upsert"),
     path("users/<int:user_id>/overrides/<str:code>", UserOverrideRemoveView.as_view(), name="rbac-user-override-remove"),
+    path("audit/events", AuditEventsView.as_view(), name="audit-events-list"),
     path('expedientes/', ExpedienteView.as_view(), name='buscar'),
     path('expedientes/actualizar/', ActualizarExpedienteView.as_view(), name='actualizar'),
 ]
@@ -1,6 +1,7 @@
 from django.db import transaction
 
 from apps.catalogos.models import Roles
+from apps.catalogos.services.catalog_version_service import bump_catalog_version
 
 from ...services.audit_service import AuditService
 from ...constants.rbac_actions import RBACActions
@@ -19,6 +20,7 @@ class CreateRoleUseCase:
             is_active=True,
             created_by_id=getattr(request.user, "id_usuario", None),
         )
+        transaction.on_commit(lambda: bump_catalog_version("roles"))
 
         AuditService.log_event(
             request=request,
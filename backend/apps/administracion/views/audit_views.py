@@ -0,0 +1,203 @@
+import csv
+from datetime import datetime, time, timedelta
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.administracion.repositories.audit_repository import AuditRepository
+from apps.authentication.services.response_service import error_response
+
+from .rbac_views import _authorize, _request_id, _to_utc_iso
+
+AUDIT_READ_PERMISSION = "admin:auditoria:read"
+AUDIT_DEFAULT_LIMIT = 50
+AUDIT_MAX_LIMIT = 200
+AUDIT_CSV_COLUMNS = (
+    "id",
+    "fecha",
+    "request_id",
+    "accion",
+    "recurso_tipo",
+    "recurso_id",
+    "resultado",
+    "codigo_error",
+    "actor_id",
+    "actor_nombre",
+    "target_id",
+    "target_nombre",
+    "ip_origen",
+    "modulo",
+)
+
+
+class _Echo:
+    # Buffer minimo para csv.writer en respuestas en streaming.
+    def write(self, value):
+        return value
+
+
+def _parse_int(raw_value):
+    if raw_value in (None, ""):
+        return None
+    return int(raw_value)
+
+
+def _parse_bound(raw_value, *, end=False):
+    if not raw_value:
+        return None
+    parsed = parse_datetime(raw_value)
+    if parsed is None:
+        parsed_date = parse_date(raw_value)
+        if parsed_date is None:
+            raise ValueError(raw_value)
+        # "to" con solo fecha incluye el dia completo.
+        if end:
+            parsed_date += timedelta(days=1)
+        parsed = datetime.combine(parsed_date, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, timezone.get_current_timezone())
+    return parsed
+
+
+def _serialize_event(event):
+    meta = event.meta if isinstance(event.meta, dict) else {}
+    return {
+        "id": event.id_evento,
+        "occurredAt": _to_utc_iso(event.fch_evento),
+        "requestId": event.request_id,
+        "action": event.accion,
+        "resourceType": event.recurso_tipo,
+        "resourceId": event.recurso_id,
+        "result": event.resultado,
+        "errorCode": event.codigo_error,
+        "actor": {"id": event.actor_usuario_id, "name": event.actor_nombre},
+        "target": {"id": event.target_usuario_id, "name": event.target_nombre},
+        "ip": event.ip_origen,
+        "userAgent": event.user_agent,
+        "before": event.datos_antes,
+        "after": event.datos_despues,
+        "meta": meta,
+    }
+
+
+def _csv_row(event):
+    meta = event.meta if isinstance(event.meta, dict) else {}
+    return (
+        event.id_evento,
+        _to_utc_iso(event.fch_evento),
+        event.request_id,
+        event.accion,
+        event.recurso_tipo,
+        event.recurso_id,
+        event.resultado,
+        event.codigo_error,
+        event.actor_usuario_id,
+        event.actor_nombre,
+        event.target_usuario_id,
+        event.target_nombre,
+        event.ip_origen,
+        meta.get("module"),
+    )
+
+
+class AuditEventsView(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request):
+        user, auth_error = _authorize(request, AUDIT_READ_PERMISSION)
+        if auth_error:
+            return auth_error
+
+        params = request.query_params
+        try:
+            filters = {
+                "actor_id": _parse_int(params.get("actorId")),
+                "target_id": _parse_int(params.get("targetId")),
+                "date_from": _parse_bound(params.get("from")),
+                "date_to": _parse_bound(params.get("to"), end=True),
+            }
+            limit = _parse_int(params.get("limit")) or AUDIT_DEFAULT_LIMIT
+        except ValueError:
+            return error_response(
+                "VALIDATION_ERROR",
+                "Filtros de auditoria invalidos",
+                status.HTTP_400_BAD_REQUEST,
+                details={
+                    "actorId": ["Debe ser un entero"],
+                    "targetId": ["Debe ser un entero"],
+                    "from": ["Debe ser una fecha ISO"],
+                    "to": ["Debe ser una fecha ISO"],
+                    "limit": ["Debe ser un entero"],
+                },
+                request_id=_request_id(request),
+            )
+
+        if limit < 1 or limit > AUDIT_MAX_LIMIT:
+            return error_response(
+                "VALIDATION_ERROR",
+                "Parametros de paginacion fuera de rango",
+                status.HTTP_400_BAD_REQUEST,
+                details={"limit": [f"Debe estar entre 1 y {AUDIT_MAX_LIMIT}"]},
+                request_id=_request_id(request),
+            )
+
+        queryset = AuditRepository.filter_events(
+            action=(params.get("action") or "").strip() or None,
+            request_id=(params.get("requestId") or "").strip() or None,
+            module=(params.get("module") or "").strip() or None,
+            **filters,
+        )
+
+        if (params.get("export") or "").lower() == "csv":
+            return self._export_csv(queryset)
+
+        try:
+            events, next_cursor = AuditRepository.page(
+                queryset,
+                cursor=params.get("cursor") or None,
+                limit=limit,
+            )
+        except ValueError:
+            return error_response(
+                "VALIDATION_ERROR",
+                "Cursor invalido",
+                status.HTTP_400_BAD_REQUEST,
+                details={"cursor": ["Cursor invalido"]},
+                request_id=_request_id(request),
+            )
+
+        return Response(
+            {
+                "items": [_serialize_event(event) for event in events],
+                "nextCursor": next_cursor,
+                "limit": limit,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @staticmethod
+    def _export_csv(queryset):
+        writer = csv.writer(_Echo())
+        next_chunk = sync_to_async(AuditRepository.chunk_after, thread_sensitive=True)
+
+        # Iterador asincrono: bajo ASGI Django consume uno sincrono completo en
+        # memoria antes de enviarlo. Cada bloque se lee por llave en un hilo.
+        async def rows():
+            yield writer.writerow(AUDIT_CSV_COLUMNS)
+            position = None
+            while True:
+                events, position = await next_chunk(queryset, position)
+                if events:
+                    yield "".join(writer.writerow(_csv_row(event)) for event in events)
+                if position is None:
+                    return
+
+        response = StreamingHttpResponse(rows(), content_type="text/csv; charset=utf-8")
+        response["Content-Disposition"] = 'attachment; filename="auditoria_eventos.csv"'
+        return response
@@ -7,7 +7,8 @@ from datetime import datetime, time, timezone as dt_timezone
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import status
@@ -15,15 +16,29 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.administracion.models import (
-    AuditoriaEvento,
     RelRolPermiso,
     RelUsuarioOverride,
     RelUsuarioRol,
 )
+from apps.administracion.repositories.user_list_repository import (
+    ACTIVE_ROLE_RELATIONS_ATTR,
+    UserListRepository,
+    estimate_count,
+)
+from apps.administracion.services.audit_read_counters import read_aggregation_enabled, record_read
+from apps.administracion.services.audit_writer import record_audit_event
+from apps.administracion.services.rbac_bulk_assignment import (
+    BULK_ASSIGNMENT_MAX_USERS,
+    BulkAssignmentRequest,
+    BulkItemResult,
+    apply_bulk_assignment,
+)
+from apps.administracion.services.rbac_resolver import RBACResolver
 from apps.authentication.models import DetUsuario, SyUsuario
 from apps.authentication.repositories.user_repository import UserRepository
 from apps.authentication.services.auth_revision import (
-    touch_user_auth_revision,
+    bump_role_revisions,
+    publish_auth_revision,
     touch_users_auth_revision,
 )
 from apps.authentication.services.csrf_service import validate_csrf
@@ -32,6 +47,7 @@ from apps.authentication.services.errors import AuthServiceError
 from apps.authentication.services.response_service import error_response, get_request_id
 from apps.authentication.services.session_service import authenticate_request
 from apps.catalogos.models import CatCentroAtencion, Permisos, Roles
+from apps.catalogos.services.catalog_version_service import bump_catalog_version
 
 
 TEMP_PASSWORD_LENGTH = 12
@@ -41,6 +57,8 @@ ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 ISO_DATETIME_RE = re.compile(
     r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?(?:Z|[+-]\d{2}:\d{2})?$"
 )
+# Lecturas de listado que, si tienen exito, se auditan como contadores agregados.
+AGGREGATED_READ_ACTIONS = frozenset({"RBAC_ROLE_LIST", "RBAC_PERMISSION_LIST", "RBAC_USER_LIST"})
 
 
 def _request_id(request):
@@ -168,21 +186,56 @@ def _user_name(user):
     return user.usuario or ""
 
 
-def _user_ref_by_id(user_id, fallback_system=False):
-    if not user_id:
-        if fallback_system:
-            return {"id": 0, "name": "Sistema"}
-        return None
-
-    user = UserRepository.get_by_id(user_id)
+def _user_ref(user, fallback_system=False):
     if not user:
         if fallback_system:
             return {"id": 0, "name": "Sistema"}
         return None
-
     return {"id": user.id_usuario, "name": _user_name(user)}
 
 
+def _user_ref_by_id(user_id, fallback_system=False):
+    if not user_id:
+        return _user_ref(None, fallback_system)
+    return _user_ref(UserRepository.get_by_id(user_id), fallback_system)
+
+
+class SerializationContext:
+    """Referencias compartidas por los _serialize_* de una misma respuesta.
+
+    Los ids de usuario se registran antes de serializar y se resuelven en
+    una sola consulta al pedir la primera referencia.
+    """
+
+    def __init__(self):
+        self._users = {}
+        self._pending = set()
+
+    def want_users(self, *user_ids):
+        self._pending.update(
+            user_id for user_id in user_ids if user_id and user_id not in self._users
+        )
+        return self
+
+    def user_ref(self, user_id, fallback_system=False):
+        if not user_id:
+            return _user_ref(None, fallback_system)
+        if user_id not in self._users:
+            self.want_users(user_id)
+            self._load_users()
+        return _user_ref(self._users.get(user_id), fallback_system)
+
+    def _load_users(self):
+        pending = self._pending
+        self._pending = set()
+        loaded = {
+            user.id_usuario: user
+            for user in SyUsuario.objects.select_related("detalle").filter(id_usuario__in=pending)
+        }
+        for user_id in pending:
+            self._users[user_id] = loaded.get(user_id)
+
+
 def _clinic_ref(detalle):
     if not detalle or not detalle.id_centro_atencion:
         return None
@@ -199,12 +252,14 @@ def _serialize_permission(permission):
     }
 
 
-def _role_permissions(role):
-    relations = (
-        RelRolPermiso.objects.select_related("id_permiso", "usr_asignacion")
+def _role_permissions(role, context=None):
+    context = context or SerializationContext()
+    relations = list(
+        RelRolPermiso.objects.select_related("id_permiso")
         .filter(id_rol=role, fch_baja__isnull=True, id_permiso__is_active=True)
         .order_by("id_permiso__codigo")
     )
+    context.want_users(*(relation.usr_asignacion_id for relation in relations))
     items = []
     for relation in relations:
         items.append(
@@ -213,13 +268,46 @@ def _role_permissions(role):
                 "code": relation.id_permiso.codigo,
                 "description": relation.id_permiso.descripcion,
                 "assignedAt": _to_utc_iso(relation.fch_asignacion),
-                "assignedBy": _user_ref_by_id(relation.usr_asignacion_id, fallback_system=True),
+                "assignedBy": context.user_ref(relation.usr_asignacion_id, fallback_system=True),
             }
         )
     return items
 
 
+def _with_role_counts(queryset):
+    # Conteos como subconsultas correlacionadas: una sola consulta por pagina.
+    permissions = (
+        RelRolPermiso.objects.filter(
+            id_rol=OuterRef("pk"),
+            fch_baja__isnull=True,
+            id_permiso__is_active=True,
+        )
+        .order_by()
+        .values("id_rol")
+        .annotate(total=Count("*"))
+        .values("total")
+    )
+    users = (
+        RelUsuarioRol.objects.filter(
+            id_rol=OuterRef("pk"),
+            fch_baja__isnull=True,
+            id_usuario__est_activo=True,
+        )
+        .order_by()
+        .values("id_rol")
+        .annotate(total=Count("*"))
+        .values("total")
+    )
+    return queryset.annotate(
+        active_permissions_count=Coalesce(Subquery(permissions, output_field=IntegerField()), 0),
+        active_users_count=Coalesce(Subquery(users, output_field=IntegerField()), 0),
+    )
+
+
 def _role_counts(role):
+    if hasattr(role, "active_permissions_count"):
+        return role.active_permissions_count, role.active_users_count
+
     permissions_count = RelRolPermiso.objects.filter(
         id_rol=role,
         fch_baja__isnull=True,
@@ -233,7 +321,9 @@ def _role_counts(role):
     return permissions_count, users_count
 
 
-def _serialize_role(role):
+def _serialize_role(role, context=None):
+    context = context or SerializationContext()
+    context.want_users(role.created_by_id, role.updated_by_id)
     permissions_count, users_count = _role_counts(role)
     return {
         "id": role.id_rol,
@@ -245,31 +335,49 @@ def _serialize_role(role):
         "permissionsCount": permissions_count,
         "usersCount": users_count,
         "createdAt": _to_utc_iso(role.created_at),
-        "createdBy": _user_ref_by_id(role.created_by_id, fallback_system=True),
+        "createdBy": context.user_ref(role.created_by_id, fallback_system=True),
         "updatedAt": _to_utc_iso(role.updated_at),
-        "updatedBy": _user_ref_by_id(role.updated_by_id),
+        "updatedBy": context.user_ref(role.updated_by_id),
     }
 
 
 def _active_user_role_relations(user):
     return (
-        RelUsuarioRol.objects.select_related("id_rol", "usr_asignacion")
+        RelUsuarioRol.objects.select_related("id_rol")
         .filter(id_usuario=user, fch_baja__isnull=True, id_rol__is_active=True)
         .order_by("id_usuario_rol")
     )
 
 
-def _active_user_ids_for_role(role):
+def _sync_role_auth_state(role):
+    # Un cambio de rol solo publica su revision; las sesiones y permisos
+    # materializados de sus usuarios se invalidan por revision efectiva.
+    bump_role_revisions([role.id_rol])
+
+
+def _sync_users_auth_state(user_ids, actor_id=None):
+    # Invalida sesiones y recalcula permisos materializados de los usuarios.
+    user_ids = list(user_ids)
+    touch_users_auth_revision(user_ids, actor_id=actor_id)
+    RBACResolver.refresh_materialized_permissions(user_ids)
+
+
+def _active_user_overrides(user):
     return list(
-        RelUsuarioRol.objects.filter(id_rol=role, fch_baja__isnull=True)
-        .values_list("id_usuario_id", flat=True)
-        .distinct()
+        RelUsuarioOverride.objects.select_related("id_permiso")
+        .filter(id_usuario=user, fch_baja__isnull=True)
+        .order_by("id_override")
     )
 
 
-def _serialize_user_roles(user):
+def _serialize_user_roles(user, context=None):
+    context = context or SerializationContext()
+    relations = getattr(user, ACTIVE_ROLE_RELATIONS_ATTR, None)
+    if relations is None:
+        relations = list(_active_user_role_relations(user))
+    context.want_users(*(relation.usr_asignacion_id for relation in relations))
     roles = []
-    for relation in _active_user_role_relations(user):
+    for relation in relations:
         role = relation.id_rol
         roles.append(
             {
@@ -278,19 +386,18 @@ def _serialize_user_roles(user):
                 "description": role.desc_rol,
                 "isPrimary": bool(relation.is_primary),
                 "assignedAt": _to_utc_iso(relation.fch_asignacion),
-                "assignedBy": _user_ref_by_id(relation.usr_asignacion_id, fallback_system=True),
+                "assignedBy": context.user_ref(relation.usr_asignacion_id, fallback_system=True),
             }
         )
     return roles
 
 
-def _serialize_user_overrides(user):
+def _serialize_user_overrides(user, context=None, overrides=None):
+    context = context or SerializationContext()
     now = timezone.now()
-    overrides = (
-        RelUsuarioOverride.objects.select_related("id_permiso", "usr_asignacion")
-        .filter(id_usuario=user, fch_baja__isnull=True)
-        .order_by("id_override")
-    )
+    if overrides is None:
+        overrides = _active_user_overrides(user)
+    context.want_users(*(override.usr_asignacion_id for override in overrides))
     items = []
     for override in overrides:
         is_expired = bool(override.fch_expira and override.fch_expira <= now)
@@ -303,7 +410,7 @@ def _serialize_user_overrides(user):
                 "expiresAt": _to_utc_iso(override.fch_expira),
                 "isExpired": is_expired,
                 "assignedAt": _to_utc_iso(override.fch_asignacion),
-                "assignedBy": _user_ref_by_id(override.usr_asignacion_id, fallback_system=True),
+                "assignedBy": context.user_ref(override.usr_asignacion_id, fallback_system=True),
             }
         )
     return items
@@ -311,7 +418,9 @@ def _serialize_user_overrides(user):
 
 def _serialize_user_list_item(user):
     detail = getattr(user, "detalle", None)
-    roles = _active_user_role_relations(user)
+    roles = getattr(user, ACTIVE_ROLE_RELATIONS_ATTR, None)
+    if roles is None:
+        roles = _active_user_role_relations(user)
     primary = next((relation for relation in roles if relation.is_primary), None)
     if not primary:
         primary = roles[0] if roles else None
@@ -334,7 +443,9 @@ def _serialize_user_list_item(user):
     }
 
 
-def _serialize_user_detail(user):
+def _serialize_user_detail(user, context=None):
+    context = context or SerializationContext()
+    context.want_users(user.usr_alta_id, user.usr_modf_id)
     detail = getattr(user, "detalle", None)
     base = _serialize_user_list_item(user)
     return {
@@ -347,9 +458,9 @@ def _serialize_user_detail(user):
         "lastLoginAt": _to_utc_iso(user.last_conexion),
         "lastIp": user.ip_ultima,
         "createdAt": _to_utc_iso(user.fch_alta),
-        "createdBy": _user_ref_by_id(user.usr_alta_id, fallback_system=True),
+        "createdBy": context.user_ref(user.usr_alta_id, fallback_system=True),
         "updatedAt": _to_utc_iso(user.fch_modf),
-        "updatedBy": _user_ref_by_id(user.usr_modf_id),
+        "updatedBy": context.user_ref(user.usr_modf_id),
     }
 
 
@@ -476,7 +587,7 @@ def _authorize(request, permission_code=None, require_csrf=False):
     request.user = user
 
     if permission_code:
-        permissions = UserRepository.build_auth_user(user).get("permissions", [])
+        permissions = UserRepository.get_authorization(user).get("permissions", [])
         if "*" not in permissions and permission_code not in permissions:
             return user, error_response(
                 "PERMISSION_DENIED",
@@ -509,7 +620,15 @@ def _audit(
 ):
     actor = request.user if getattr(request, "user", None) and request.user.is_authenticated else None
     try:
-        AuditoriaEvento.objects.create(
+        if result == "SUCCESS" and action in AGGREGATED_READ_ACTIONS and read_aggregation_enabled():
+            record_read(
+                action=action,
+                resource_type=resource_type,
+                actor_id=actor.id_usuario if actor else None,
+                actor_name=_user_name(actor) if actor else "Sistema",
+            )
+            return
+        record_audit_event(
             request_id=_request_id(request),
             accion=action,
             recurso_tipo=resource_type,
@@ -613,7 +732,11 @@ class RolesListCreateView(APIView):
         start = (page - 1) * page_size
         end = start + page_size
 
-        items = [_serialize_role(role) for role in queryset[start:end]]
+        roles = list(_with_role_counts(queryset)[start:end])
+        context = SerializationContext()
+        for role in roles:
+            context.want_users(role.created_by_id, role.updated_by_id)
+        items = [_serialize_role(role, context) for role in roles]
         payload = {
             "items": items,
             "page": page,
@@ -668,6 +791,7 @@ class RolesListCreateView(APIView):
             is_active=True,
             created_by_id=user.id_usuario,
         )
+        transaction.on_commit(lambda: bump_catalog_version("roles"))
 
         _audit(
             request,
@@ -693,7 +817,7 @@ class RoleDetailView(APIView):
             _audit(request, "RBAC_ROLE_DETAIL", "role", resource_id=role_id, result="FAIL", error_code=auth_error.data.get("code"))
             return auth_error
 
-        role = self._get_role(role_id)
+        role = _with_role_counts(Roles.objects.filter(id_rol=role_id)).first()
         if not role:
             _audit(request, "RBAC_ROLE_DETAIL", "role", resource_id=role_id, result="FAIL", error_code="ROLE_NOT_FOUND")
             return error_response(
@@ -703,9 +827,10 @@ class RoleDetailView(APIView):
                 request_id=_request_id(request),
             )
 
+        context = SerializationContext()
         payload = {
-            "role": _serialize_role(role),
-            "permissions": _role_permissions(role),
+            "role": _serialize_role(role, context),
+            "permissions": _role_permissions(role, context),
         }
         _audit(request, "RBAC_ROLE_DETAIL", "role", resource_id=role.id_rol, result="SUCCESS")
         return Response(payload, status=status.HTTP_200_OK)
@@ -767,10 +892,8 @@ class RoleDetailView(APIView):
         after = _serialize_role(role)
 
         if after != before:
-            touch_users_auth_revision(
-                _active_user_ids_for_role(role),
-                actor_id=user.id_usuario,
-            )
+            _sync_role_auth_state(role)
+            transaction.on_commit(lambda: bump_catalog_version("roles"))
 
         _audit(
             request,
@@ -828,10 +951,8 @@ class RoleDetailView(APIView):
         role.deleted_by_id = user.id_usuario
         role.save(update_fields=["is_active", "deleted_at", "deleted_by_id"])
 
-        touch_users_auth_revision(
-            _active_user_ids_for_role(role),
-            actor_id=user.id_usuario,
-        )
+        _sync_role_auth_state(role)
+        transaction.on_commit(lambda: bump_catalog_version("roles"))
 
         _audit(
             request,
@@ -907,7 +1028,7 @@ class AssignRolePermissionsView(APIView):
                 request_id=_request_id(request),
             )
 
-        actor_permissions = set(UserRepository.build_auth_user(user).get("permissions", []))
+        actor_permissions = set(UserRepository.get_authorization(user).get("permissions", []))
         scope_error = _validate_role_permission_scope(request, user, role, actor_permissions)
         if scope_error:
             _audit(
@@ -991,10 +1112,7 @@ class AssignRolePermissionsView(APIView):
                 has_permission_changes = True
 
         if has_permission_changes:
-            touch_users_auth_revision(
-                _active_user_ids_for_role(role),
-                actor_id=user.id_usuario,
-            )
+            _sync_role_auth_state(role)
 
         payload = {"roleId": role.id_rol, "permissions": _role_permissions(role)}
         _audit(
@@ -1034,7 +1152,7 @@ class RevokeRolePermissionView(APIView):
                 request_id=_request_id(request),
             )
 
-        actor_permissions = set(UserRepository.build_auth_user(user).get("permissions", []))
+        actor_permissions = set(UserRepository.get_authorization(user).get("permissions", []))
         scope_error = _validate_role_permission_scope(request, user, role, actor_permissions)
         if scope_error:
             _audit(
@@ -1087,10 +1205,7 @@ class RevokeRolePermissionView(APIView):
         relation.usr_baja = user
         relation.save(update_fields=["fch_baja", "usr_baja"])
 
-        touch_users_auth_revision(
-            _active_user_ids_for_role(role),
-            actor_id=user.id_usuario,
-        )
+        _sync_role_auth_state(role)
 
         payload = {"roleId": role.id_rol, "permissions": _role_permissions(role)}
 
@@ -1121,16 +1236,6 @@ class UsersListCreateView(APIView):
             _audit(request, "RBAC_USER_LIST", "user", result="FAIL", error_code="VALIDATION_ERROR")
             return pagination_error
 
-        queryset = SyUsuario.objects.select_related("detalle", "detalle__id_centro_atencion").all()
-
-        search = request.query_params.get("search")
-        if search:
-            queryset = queryset.filter(
-                Q(usuario__icontains=search)
-                | Q(correo__icontains=search)
-                | Q(detalle__nombre_completo__icontains=search)
-            )
-
         is_active_raw = _parse_bool(request.query_params.get("isActive"))
         if is_active_raw == "invalid":
             _audit(request, "RBAC_USER_LIST", "user", result="FAIL", error_code="VALIDATION_ERROR")
@@ -1141,46 +1246,65 @@ class UsersListCreateView(APIView):
                 details={"isActive": ["Debe ser true o false"]},
                 request_id=_request_id(request),
             )
-        if is_active_raw is not None:
-            queryset = queryset.filter(est_activo=is_active_raw)
-
-        role_id = request.query_params.get("roleId")
-        if role_id:
-            queryset = queryset.filter(relusuariorol__id_rol_id=role_id, relusuariorol__fch_baja__isnull=True)
 
-        clinic_id = request.query_params.get("clinicId")
-        if clinic_id:
-            queryset = queryset.filter(detalle__id_centro_atencion_id=clinic_id)
+        total_mode = request.query_params.get("total")
+        if total_mode not in {None, "exact", "estimated", "none"}:
+            _audit(request, "RBAC_USER_LIST", "user", result="FAIL", error_code="VALIDATION_ERROR")
+            return error_response(
+                "VALIDATION_ERROR",
+                "Parametro total invalido",
+                status.HTTP_400_BAD_REQUEST,
+                details={"total": ["Debe ser exact, estimated o none"]},
+                request_id=_request_id(request),
+            )
 
-        status_filter = request.query_params.get("status")
-        if status_filter == "active":
-            queryset = queryset.filter(est_activo=True)
-        elif status_filter == "inactive":
-            queryset = queryset.filter(est_activo=False)
-        elif status_filter == "pending":
-            queryset = queryset.filter(Q(terminos_acept=False) | Q(cambiar_clave=True))
+        queryset = UserListRepository.filter_users(
+            search=request.query_params.get("search"),
+            is_active=is_active_raw,
+            role_id=request.query_params.get("roleId"),
+            clinic_id=request.query_params.get("clinicId"),
+            status_filter=request.query_params.get("status"),
+        )
 
-        user_ids_queryset = queryset.order_by("usuario", "id_usuario").values_list("id_usuario", flat=True).distinct()
+        if "cursor" in request.query_params:
+            # Modo cursor: sin OFFSET; el total es opcional y por defecto estimado.
+            try:
+                users, next_cursor = UserListRepository.page_by_cursor(
+                    queryset,
+                    cursor=request.query_params.get("cursor") or None,
+                    limit=page_size,
+                )
+            except ValueError:
+                _audit(request, "RBAC_USER_LIST", "user", result="FAIL", error_code="VALIDATION_ERROR")
+                return error_response(
+                    "VALIDATION_ERROR",
+                    "Cursor invalido",
+                    status.HTTP_400_BAD_REQUEST,
+                    details={"cursor": ["Cursor invalido"]},
+                    request_id=_request_id(request),
+                )
 
-        total = user_ids_queryset.count()
-        start = (page - 1) * page_size
-        end = start + page_size
-        page_user_ids = list(user_ids_queryset[start:end])
-        users_by_id = {
-            user.id_usuario: user
-            for user in SyUsuario.objects.select_related("detalle", "detalle__id_centro_atencion").filter(
-                id_usuario__in=page_user_ids
-            )
-        }
-        ordered_users = [users_by_id[user_id] for user_id in page_user_ids if user_id in users_by_id]
-        items = [_serialize_user_list_item(user) for user in ordered_users]
-        payload = {
-            "items": items,
-            "page": page,
-            "pageSize": page_size,
-            "total": total,
-            "totalPages": (total + page_size - 1) // page_size,
-        }
+            total_mode = total_mode or "estimated"
+            payload = {
+                "items": [_serialize_user_list_item(user) for user in users],
+                "pageSize": page_size,
+                "nextCursor": next_cursor,
+            }
+            if total_mode != "none":
+                payload["total"] = (
+                    estimate_count(queryset) if total_mode == "estimated" else queryset.count()
+                )
+                payload["totalIsEstimate"] = total_mode == "estimated"
+        else:
+            users = UserListRepository.page_by_offset(queryset, page=page, page_size=page_size)
+            total = estimate_count(queryset) if total_mode == "estimated" else queryset.count()
+            payload = {
+                "items": [_serialize_user_list_item(user) for user in users],
+                "page": page,
+                "pageSize": page_size,
+                "total": total,
+                "totalPages": (total + page_size - 1) // page_size,
+            }
         _audit(request, "RBAC_USER_LIST", "user", result="SUCCESS")
         return Response(payload, status=status.HTTP_200_OK)
 
@@ -1343,10 +1467,20 @@ class UserDetailView(APIView):
                 request_id=_request_id(request),
             )
 
+        # Roles y overrides primero: todos los ids de usuario se resuelven en una consulta.
+        relations = list(_active_user_role_relations(user))
+        setattr(user, ACTIVE_ROLE_RELATIONS_ATTR, relations)
+        overrides = _active_user_overrides(user)
+        context = SerializationContext().want_users(
+            user.usr_alta_id,
+            user.usr_modf_id,
+            *(relation.usr_asignacion_id for relation in relations),
+            *(override.usr_asignacion_id for override in overrides),
+        )
         payload = {
-            "user": _serialize_user_detail(user),
-            "roles": _serialize_user_roles(user),
-            "overrides": _serialize_user_overrides(user),
+            "user": _serialize_user_detail(user, context),
+            "roles": _serialize_user_roles(user, context),
+            "overrides": _serialize_user_overrides(user, context, overrides),
         }
         _audit(request, "RBAC_USER_DETAIL", "user", resource_id=user.id_usuario, result="SUCCESS", target_user=user)
         return Response(payload, status=status.HTTP_200_OK)
@@ -1427,6 +1561,7 @@ class UserDetailView(APIView):
         user.fch_modf = timezone.now()
         user.usr_modf = actor
         user.save(update_fields=["correo", "fch_modf", "usr_modf"])
+        publish_auth_revision(user)
 
         payload = {"user": _serialize_user_detail(user)}
         _audit(
@@ -1490,6 +1625,7 @@ class UserStatusView(APIView):
         user.fch_modf = timezone.now()
         user.usr_modf = actor
         user.save(update_fields=["est_activo", "fch_modf", "usr_modf"])
+        publish_auth_revision(user)
 
         payload = {"id": user.id_usuario, "isActive": bool(user.est_activo)}
         _audit(request, action, "user", resource_id=user.id_usuario, result="SUCCESS", after=payload, target_user=user)
@@ -1586,7 +1722,7 @@ class UserRolesView(APIView):
                 has_role_changes = True
 
         if has_role_changes:
-            touch_user_auth_revision(user, actor_id=actor.id_usuario)
+            _sync_users_auth_state([user.id_usuario], actor_id=actor.id_usuario)
 
         payload = {"userId": user.id_usuario, "roles": _serialize_user_roles(user)}
         _audit(
@@ -1661,6 +1797,7 @@ class UserPrimaryRoleView(APIView):
         user.fch_modf = timezone.now()
         user.usr_modf = actor
         user.save(update_fields=["fch_modf", "usr_modf"])
+        publish_auth_revision(user)
 
         payload = {"userId": user.id_usuario, "roles": _serialize_user_roles(user)}
         _audit(
@@ -1738,7 +1875,7 @@ class UserRoleRevokeView(APIView):
                 replacement.is_primary = True
                 replacement.save(update_fields=["is_primary"])
 
-        touch_user_auth_revision(user, actor_id=actor.id_usuario)
+        _sync_users_auth_state([user.id_usuario], actor_id=actor.id_usuario)
 
         payload = {"userId": user.id_usuario, "roles": _serialize_user_roles(user)}
         _audit(
@@ -1806,7 +1943,7 @@ class UserOverridesView(APIView):
                 request_id=_request_id(request),
             )
 
-        actor_permissions = set(UserRepository.build_auth_user(actor).get("permissions", []))
+        actor_permissions = set(UserRepository.get_authorization(actor).get("permissions", []))
         scope_error = _validate_user_override_scope(request, actor, user, permission, actor_permissions)
         if scope_error:
             _audit(
@@ -1862,7 +1999,7 @@ class UserOverridesView(APIView):
             has_override_changes = True
 
         if has_override_changes:
-            touch_user_auth_revision(user, actor_id=actor.id_usuario)
+            _sync_users_auth_state([user.id_usuario], actor_id=actor.id_usuario)
 
         payload = {"userId": user.id_usuario, "overrides": _serialize_user_overrides(user)}
         _audit(
@@ -1911,7 +2048,7 @@ class UserOverrideRemoveView(APIView):
             .first()
         )
         if override:
-            actor_permissions = set(UserRepository.build_auth_user(actor).get("permissions", []))
+            actor_permissions = set(UserRepository.get_authorization(actor).get("permissions", []))
             scope_error = _validate_user_override_scope(
                 request,
                 actor,
@@ -1937,7 +2074,7 @@ class UserOverrideRemoveView(APIView):
             removed_override = True
 
         if removed_override:
-            touch_user_auth_revision(user, actor_id=actor.id_usuario)
+            _sync_users_auth_state([user.id_usuario], actor_id=actor.id_usuario)
 
         payload = {"userId": user.id_usuario, "overrides": _serialize_user_overrides(user)}
         _audit(
@@ -1951,3 +2088,194 @@ class UserOverrideRemoveView(APIView):
             target_user=user,
         )
         return Response(payload, status=status.HTTP_200_OK)
+
+
+def _int_list(raw_value):
+    # None si no es una lista de enteros; bool no cuenta como entero.
+    if raw_value is None:
+        return []
+    if not isinstance(raw_value, list):
+        return None
+    if any(isinstance(value, bool) or not isinstance(value, int) for value in raw_value):
+        return None
+    return list(dict.fromkeys(raw_value))
+
+
+class UserBulkAssignmentView(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    @transaction.atomic
+    def post(self, request):
+        action = "RBAC_USER_BULK_ASSIGN"
+        actor, auth_error = _authorize(
+            request,
+            "admin:gestion:usuarios:update",
+            require_csrf=True,
+        )
+        if auth_error:
+            _audit(request, action, "user_role", result="FAIL", error_code=auth_error.data.get("code"))
+            return auth_error
+
+        user_ids = _int_list(request.data.get("userIds"))
+        grant_role_ids = _int_list(request.data.get("grantRoleIds"))
+        revoke_role_ids = _int_list(request.data.get("revokeRoleIds"))
+        grant_overrides_raw = request.data.get("grantOverrides") or []
+        revoke_codes_raw = request.data.get("revokeOverrideCodes") or []
+
+        errors = {}
+        if not user_ids:
+            errors["userIds"] = ["Debe ser un arreglo no vacio de enteros"]
+        elif len(user_ids) > BULK_ASSIGNMENT_MAX_USERS:
+            errors["userIds"] = [f"Maximo {BULK_ASSIGNMENT_MAX_USERS} usuarios por solicitud"]
+        if grant_role_ids is None:
+            errors["grantRoleIds"] = ["Debe ser un arreglo de enteros"]
+        if revoke_role_ids is None:
+            errors["revokeRoleIds"] = ["Debe ser un arreglo de enteros"]
+        if grant_role_ids and revoke_role_ids and set(grant_role_ids) & set(revoke_role_ids):
+            errors["revokeRoleIds"] = ["Un rol no puede otorgarse y revocarse a la vez"]
+        if not isinstance(revoke_codes_raw, list) or not all(
+            isinstance(code, str) and code for code in revoke_codes_raw
+        ):
+            errors["revokeOverrideCodes"] = ["Debe ser un arreglo de codigos"]
+
+        grant_override_items = []
+        if not isinstance(grant_overrides_raw, list):
+            errors["grantOverrides"] = ["Debe ser un arreglo"]
+        else:
+            for index, item in enumerate(grant_overrides_raw):
+                code = item.get("permissionCode") if isinstance(item, dict) else None
+                effect = item.get("effect") if isinstance(item, dict) else None
+                expires_at = _parse_expires_at_end_of_day(item.get("expiresAt")) if isinstance(item, dict) else None
+                if not code or effect not in {"ALLOW", "DENY"} or expires_at == "invalid":
+                    errors.setdefault("grantOverrides", []).append(
+                        f"Elemento {index}: requiere permissionCode, effect ALLOW/DENY y expiresAt ISO 8601"
+                    )
+                    continue
+                grant_override_items.append((code, effect, expires_at))
+
+        if not errors:
+            grant_codes = [code for code, _, _ in grant_override_items]
+            if len(set(grant_codes)) != len(grant_codes):
+                errors["grantOverrides"] = ["Permisos repetidos"]
+            elif set(grant_codes) & set(revoke_codes_raw):
+                errors["revokeOverrideCodes"] = ["Un permiso no puede otorgarse y revocarse a la vez"]
+            elif not (grant_role_ids or revoke_role_ids or grant_override_items or revoke_codes_raw):
+                errors["userIds"] = ["No hay cambios que aplicar"]
+
+        if errors:
+            _audit(request, action, "user_role", result="FAIL", error_code="VALIDATION_ERROR")
+            return error_response(
+                "VALIDATION_ERROR",
+                "Datos de entrada invalidos",
+                status.HTTP_400_BAD_REQUEST,
+                details=errors,
+                request_id=_request_id(request),
+            )
+
+        requested_role_ids = set(grant_role_ids) | set(revoke_role_ids)
+        roles = {role.id_rol: role for role in Roles.objects.filter(id_rol__in=requested_role_ids, is_active=True)}
+        missing_roles = sorted(set(grant_role_ids) - set(roles))
+        if missing_roles:
+            _audit(request, action, "user_role", result="FAIL", error_code="ROLE_NOT_FOUND")
+            return error_response(
+                "ROLE_NOT_FOUND",
+                "Rol no encontrado",
+                status.HTTP_404_NOT_FOUND,
+                details={"roleIds": [f"No existen: {', '.join(str(value) for value in missing_roles)}"]},
+                request_id=_request_id(request),
+            )
+
+        grant_codes = {code for code, _, _ in grant_override_items}
+        requested_codes = grant_codes | set(revoke_codes_raw)
+        permissions = {
+            permission.codigo: permission
+            for permission in Permisos.objects.filter(codigo__in=requested_codes)
+        }
+        missing_codes = sorted(
+            code
+            for code in requested_codes
+            if code not in permissions or (code in grant_codes and not permissions[code].is_active)
+        )
+        if missing_codes:
+            _audit(request, action, "user_override", result="FAIL", error_code="PERMISSION_NOT_FOUND")
+            return error_response(
+                "PERMISSION_NOT_FOUND",
+                "Permiso no encontrado",
+                status.HTTP_404_NOT_FOUND,
+                details={"permissionCodes": missing_codes},
+                request_id=_request_id(request),
+            )
+
+        users_by_id = {user.id_usuario: user for user in SyUsuario.objects.filter(id_usuario__in=user_ids)}
+        users = [users_by_id[user_id] for user_id in user_ids if user_id in users_by_id]
+
+        # El alcance de overrides se valida por usuario; un rechazo no detiene al resto.
+        rejected = {}
+        if requested_codes:
+            actor_permissions = set(UserRepository.get_authorization(actor).get("permissions", []))
+            for user in users:
+                for code in sorted(requested_codes):
+                    scope_error = _validate_user_override_scope(
+                        request,
+                        actor,
+                        user,
+                        permissions[code],
+                        actor_permissions,
+                    )
+                    if scope_error:
+                        rejected[user.id_usuario] = (scope_error.data.get("code"), scope_error.data.get("message"))
+                        break
+
+        spec = BulkAssignmentRequest(
+            grant_roles=[roles[role_id] for role_id in grant_role_ids],
+            revoke_role_ids=revoke_role_ids,
+            grant_overrides=[(permissions[code], effect, expires_at) for code, effect, expires_at in grant_override_items],
+            revoke_permission_ids=[permissions[code].id_permiso for code in revoke_codes_raw],
+        )
+        applied = {
+            result.user_id: result
+            for result in apply_bulk_assignment(actor=actor, users=users, spec=spec, rejected=rejected)
+        }
+
+        results = []
+        for user_id in user_ids:
+            result = applied.get(user_id)
+            if result is None:
+                result = BulkItemResult(
+                    user_id=user_id,
+                    status="error",
+                    code="USER_NOT_FOUND",
+                    message="Usuario no encontrado",
+                )
+            results.append(result)
+
+        changed_ids = [result.user_id for result in results if result.status == "applied"]
+        if changed_ids:
+            # Una sola actualizacion de revision y de permisos materializados para todo el lote.
+            _sync_users_auth_state(changed_ids, actor_id=actor.id_usuario)
+
+        summary = {
+            "requested": len(results),
+            "applied": len(changed_ids),
+            "unchanged": sum(1 for result in results if result.status == "unchanged"),
+            "errors": sum(1 for result in results if result.status == "error"),
+        }
+        payload = {"results": [result.as_dict() for result in results], "summary": summary}
+        _audit(
+            request,
+            action,
+            "user_role",
+            result="SUCCESS",
+            after={
+                "grantRoleIds": grant_role_ids,
+                "revokeRoleIds": revoke_role_ids,
+                "grantOverrides": [
+                    {"permissionCode": code, "effect": effect, "expiresAt": _to_utc_iso(expires_at)}
+                    for code, effect, expires_at in grant_override_items
+                ],
+                "revokeOverrideCodes": revoke_codes_raw,
+                **payload,
+            },
+        )
+        return Response(payload, status=status.HTTP_200_OK)
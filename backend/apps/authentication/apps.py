@@ -4,3 +4,27 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.authentication"
+
+    def ready(self):
+        from apps.authentication.services.permission_dependencies import (
+            get_permission_graph,
+            reset_permission_graph,
+        )
+        from apps.authentication.services.permission_index import (
+            get_permission_index,
+            reset_permission_index,
+        )
+        from apps.catalogos.services.catalog_version_service import catalog_namespace
+        from infrastructure.cache.invalidation import register_invalidation_handler
+        from infrastructure.cache.warmup import register_warmup
+
+        def _reset_permission_structures(version):
+            reset_permission_index()
+            reset_permission_graph()
+
+        def _warm_permission_structures():
+            get_permission_index()
+            get_permission_graph()
+
+        register_invalidation_handler(catalog_namespace("permisos"), _reset_permission_structures)
+        register_warmup("permisos", _warm_permission_structures)
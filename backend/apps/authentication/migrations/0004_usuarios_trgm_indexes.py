@@ -0,0 +1,49 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:10
+
+from django.db import migrations
+
+# icontains en PostgreSQL se traduce a UPPER(col::text) LIKE UPPER(%s);
+# los indices trigram se crean sobre esa misma expresion.
+INDEXES = (
+    ("sy_usuarios_usuario_trgm_idx", "sy_usuarios", "usuario"),
+    ("sy_usuarios_correo_trgm_idx", "sy_usuarios", "correo"),
+    ("det_usuarios_nombre_completo_trgm_idx", "det_usuarios", "nombre_completo"),
+)
+
+
+def create_trgm_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, column in INDEXES:
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" '
+                f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+            )
+
+
+def drop_trgm_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        for name, _, _ in INDEXES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transaccion.
+    atomic = False
+
+    dependencies = [
+        ('authentication', '0003_alter_detusuario_options_alter_syusuario_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_indexes, drop_trgm_indexes),
+    ]
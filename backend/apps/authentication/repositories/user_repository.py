@@ -1,13 +1,22 @@
 from django.contrib.auth.hashers import check_password, make_password
 from django.db import transaction
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from apps.administracion.services.rbac_resolver import RBACResolver
 from apps.authentication.models import SyUsuario
-from apps.authentication.services.auth_revision import serialize_auth_revision
+from apps.authentication.services.auth_revision import (
+    AUTH_REVISION_ATTR,
+    publish_auth_revision,
+    serialize_auth_revision,
+)
 from apps.authentication.services.authorization_service import (
     get_permission_context,
 )
+from apps.authentication.services.principal_cache import resolve_principal
+
+
+_TOKEN_CLAIMS_ATTR = "_token_claims"
 
 
 class UserRepository:
@@ -31,6 +40,14 @@ class UserRepository:
             .first()
         )
 
+    @staticmethod
+    def get_by_ids(user_ids):
+        # Un solo query para varias referencias (serializadores de catalogos).
+        return {
+            user.id_usuario: user
+            for user in SyUsuario.objects.select_related("detalle").filter(id_usuario__in=user_ids)
+        }
+
     @staticmethod
     def verify_password(user, raw_password):
         # Valida el hash de la clave.
@@ -43,6 +60,7 @@ class UserRepository:
         user.fch_modf = timezone.now()
         user.usr_modf = user
         user.save(update_fields=["clave_hash", "fch_modf", "usr_modf"])
+        publish_auth_revision(user)
 
     @staticmethod
     def mark_onboarding_completed(user):
@@ -61,6 +79,7 @@ class UserRepository:
                 "usr_modf",
             ]
         )
+        publish_auth_revision(user)
 
     @staticmethod
     def mark_password_reset(user):
@@ -69,6 +88,7 @@ class UserRepository:
         user.fch_modf = timezone.now()
         user.usr_modf = user
         user.save(update_fields=["cambiar_clave", "fch_modf", "usr_modf"])
+        publish_auth_revision(user)
 
     @staticmethod
     def reset_failed_attempts(user):
@@ -78,6 +98,7 @@ class UserRepository:
             user.fch_modf = timezone.now()
             user.usr_modf = user
             user.save(update_fields=["est_bloqueado", "fch_modf", "usr_modf"])
+            publish_auth_revision(user)
 
     @staticmethod
     @transaction.atomic
@@ -88,50 +109,99 @@ class UserRepository:
         user.fch_modf = timezone.now()
         user.usr_modf = user
         user.save(update_fields=["last_conexion", "ip_ultima", "fch_modf", "usr_modf"])
+        publish_auth_revision(user)
+
+    @staticmethod
+    def from_token_claims(user_id, *, username, revision, roles, permissions):
+        # Usuario sin consulta a BD respaldado por los claims firmados del token.
+        user = SyUsuario(
+            id_usuario=int(user_id),
+            usuario=username or "",
+            est_activo=True,
+            est_bloqueado=False,
+            fch_modf=parse_datetime(revision),
+        )
+        user._state.adding = False
+        user._state.db = SyUsuario.objects.db
+        # La revision firmada ya es la efectiva (usuario, roles y epoca).
+        setattr(user, AUTH_REVISION_ATTR, revision)
+        setattr(
+            user,
+            _TOKEN_CLAIMS_ATTR,
+            {"roles": list(roles), "permissions": list(permissions)},
+        )
+        return user
+
+    @staticmethod
+    def is_claims_user(user):
+        return getattr(user, _TOKEN_CLAIMS_ATTR, None) is not None
+
+    @staticmethod
+    def get_authorization(user):
+        # Roles y permisos para autorizar: claims del token o principal resuelto.
+        claims = getattr(user, _TOKEN_CLAIMS_ATTR, None)
+        if claims is not None:
+            return claims
+        return UserRepository.build_auth_user(user)
 
     @staticmethod
     def build_auth_user(user):
-        # Mapea modelo a contrato AuthUser.
-        profile = getattr(user, "detalle", None)
-        roles, primary_role, landing_route, is_admin = _get_roles(user)
-        permissions = _get_permissions(user, roles, is_admin)
-        permission_context = get_permission_context(permissions)
-
-        full_name = ""
-        if profile and profile.nombre_completo:
-            full_name = profile.nombre_completo
-        else:
-            full_name = " ".join(
-                [
-                    part
-                    for part in [
-                        profile.nombre if profile else "",
-                        profile.paterno if profile else "",
-                        profile.materno if profile else "",
-                    ]
-                    if part
+        # Reutiliza el principal resuelto mientras la revision no cambie.
+        revision = serialize_auth_revision(user)
+        if UserRepository.is_claims_user(user):
+            # El contrato completo requiere el usuario real de BD.
+            return resolve_principal(
+                user,
+                revision,
+                lambda _: _build_auth_user(
+                    UserRepository.get_by_id(user.id_usuario) or user
+                ),
+            )
+        return resolve_principal(user, revision, _build_auth_user)
+
+
+def _build_auth_user(user):
+    # Mapea modelo a contrato AuthUser.
+    profile = getattr(user, "detalle", None)
+    roles, primary_role, landing_route, is_admin = _get_roles(user)
+    permissions = _get_permissions(user, roles, is_admin)
+    permission_context = get_permission_context(permissions)
+
+    full_name = ""
+    if profile and profile.nombre_completo:
+        full_name = profile.nombre_completo
+    else:
+        full_name = " ".join(
+            [
+                part
+                for part in [
+                    profile.nombre if profile else "",
+                    profile.paterno if profile else "",
+                    profile.materno if profile else "",
                 ]
-            ).strip()
-
-        return {
-            "id": user.id_usuario,
-            "username": user.usuario,
-            "fullName": full_name,
-            "email": user.correo,
-            "primaryRole": primary_role,
-            "landingRoute": landing_route,
-            "roles": roles,
-            "permissions": permissions,
-            "effectivePermissions": permission_context["effectivePermissions"],
-            "capabilities": permission_context["capabilities"],
-            "permissionDependenciesVersion": permission_context[
-                "permissionDependenciesVersion"
-            ],
-            "strictCapabilityPrefixes": permission_context["strictCapabilityPrefixes"],
-            "authRevision": serialize_auth_revision(user),
-            "mustChangePassword": user.cambiar_clave,
-            "requiresOnboarding": user.cambiar_clave or not user.terminos_acept,
-        }
+                if part
+            ]
+        ).strip()
+
+    return {
+        "id": user.id_usuario,
+        "username": user.usuario,
+        "fullName": full_name,
+        "email": user.correo,
+        "primaryRole": primary_role,
+        "landingRoute": landing_route,
+        "roles": roles,
+        "permissions": permissions,
+        "effectivePermissions": permission_context["effectivePermissions"],
+        "capabilities": permission_context["capabilities"],
+        "permissionDependenciesVersion": permission_context[
+            "permissionDependenciesVersion"
+        ],
+        "strictCapabilityPrefixes": permission_context["strictCapabilityPrefixes"],
+        "authRevision": serialize_auth_revision(user),
+        "mustChangePassword": user.cambiar_clave,
+        "requiresOnboarding": user.cambiar_clave or not user.terminos_acept,
+    }
 
 
 def _get_roles(user):
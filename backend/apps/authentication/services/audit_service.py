@@ -1,6 +1,6 @@
 from django.utils import timezone
 
-from apps.administracion.models import AuditoriaEvento
+from apps.administracion.services.audit_writer import record_audit_event
 from apps.authentication.services.response_service import get_request_id
 
 
@@ -23,7 +23,7 @@ def log_event(
         payload_meta.update(meta)
 
     try:
-        AuditoriaEvento.objects.create(
+        record_audit_event(
             fch_evento=timezone.now(),
             request_id=request_id or "",
             accion=action,
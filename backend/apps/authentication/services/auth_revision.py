@@ -1,21 +1,256 @@
 from __future__ import annotations
 
+import logging
 from typing import Iterable
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
+from apps.administracion.models import RbacRevision, RelUsuarioRol
 from apps.authentication.models import SyUsuario
+from apps.authentication.services.principal_cache import invalidate_principals
+from infrastructure.cache.invalidation import publish_invalidation
+
+logger = logging.getLogger(__name__)
 
 AUTH_REVISION_HEADER = "X-Auth-Revision"
+AUTH_REVISION_CACHE_PREFIX = "auth:revision"
+AUTH_REVOKED_CACHE_PREFIX = "auth:revoked"
+AUTH_USER_ROLES_CACHE_PREFIX = "auth:user_roles"
+RBAC_REVISIONS_CACHE_KEY = "auth:rbac_revisions"
+RBAC_EPOCH = "epoch"
+# Espacio de nombres del bus de invalidacion para copias locales de RBAC.
+RBAC_CACHE_NAMESPACE = "rbac"
+AUTH_REVISION_CACHE_DEFAULT_TTL = 60 * 60
+# Revision ya resuelta (p. ej. la firmada en el token) fijada sobre la instancia.
+AUTH_REVISION_ATTR = "_auth_revision"
+
+
+def _format_revision(value) -> str:
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, timezone.get_current_timezone())
+
+    return timezone.localtime(value).isoformat()
+
+
+def _aware(value):
+    if value is not None and timezone.is_naive(value):
+        return timezone.make_aware(value, timezone.get_current_timezone())
+    return value
+
+
+def _role_revision_key(role_id) -> str:
+    return f"role:{role_id}"
+
+
+def _revision_key(user_id) -> str:
+    return f"{AUTH_REVISION_CACHE_PREFIX}:{user_id}"
+
+
+def _revoked_key(user_id) -> str:
+    return f"{AUTH_REVOKED_CACHE_PREFIX}:{user_id}"
+
+
+def _user_roles_key(user_id) -> str:
+    return f"{AUTH_USER_ROLES_CACHE_PREFIX}:{user_id}"
+
+
+def _revision_ttl() -> int:
+    return int(
+        getattr(settings, "AUTH_REVISION_CACHE_TTL", AUTH_REVISION_CACHE_DEFAULT_TTL)
+    )
+
+
+def _base_revision(user: SyUsuario):
+    return user.fch_modf or user.fch_alta or timezone.now()
+
+
+def _delete_keys(keys) -> None:
+    # Se borra ya y otra vez al confirmar, para no cachear lecturas previas al commit.
+    def _delete():
+        try:
+            cache.delete_many(keys)
+        except Exception:
+            logger.warning("No se pudo invalidar la revision de sesion", exc_info=True)
+
+    _delete()
+    transaction.on_commit(_delete)
+
+
+def get_rbac_revisions() -> dict:
+    # Mapa {"role:<id>" | "epoch": datetime}; una fila por rol modificado.
+    try:
+        revisions = cache.get(RBAC_REVISIONS_CACHE_KEY)
+    except Exception:
+        logger.warning("No se pudo leer las revisiones RBAC", exc_info=True)
+        revisions = None
+
+    if revisions is None:
+        revisions = dict(RbacRevision.objects.values_list("clave", "fch_revision"))
+        try:
+            cache.set(RBAC_REVISIONS_CACHE_KEY, revisions, _revision_ttl())
+        except Exception:
+            logger.warning("No se pudo guardar las revisiones RBAC", exc_info=True)
+
+    return revisions
+
+
+def get_user_role_ids(user_ids) -> dict[int, list[int]]:
+    # Roles vigentes por usuario; se cachean para no consultar en cada peticion.
+    unique_ids = sorted({int(user_id) for user_id in user_ids if user_id is not None})
+    if not unique_ids:
+        return {}
+
+    try:
+        cached = cache.get_many([_user_roles_key(user_id) for user_id in unique_ids])
+    except Exception:
+        logger.warning("No se pudo leer los roles en cache", exc_info=True)
+        cached = {}
+
+    role_ids = {}
+    missing = []
+    for user_id in unique_ids:
+        value = cached.get(_user_roles_key(user_id))
+        if value is None:
+            missing.append(user_id)
+        else:
+            role_ids[user_id] = value
+
+    if missing:
+        loaded = {user_id: [] for user_id in missing}
+        for user_id, role_id in RelUsuarioRol.objects.filter(
+            id_usuario_id__in=missing,
+            fch_baja__isnull=True,
+        ).values_list("id_usuario_id", "id_rol_id"):
+            loaded[user_id].append(role_id)
+
+        try:
+            cache.set_many(
+                {_user_roles_key(user_id): value for user_id, value in loaded.items()},
+                _revision_ttl(),
+            )
+        except Exception:
+            logger.warning("No se pudo guardar los roles en cache", exc_info=True)
+        role_ids.update(loaded)
+
+    return role_ids
+
+
+def _effective_revision(base_revision, role_ids, revisions):
+    # Revision efectiva = max(usuario, roles, epoca global).
+    candidates = [_aware(base_revision), _aware(revisions.get(RBAC_EPOCH))]
+    candidates.extend(
+        _aware(revisions.get(_role_revision_key(role_id))) for role_id in role_ids
+    )
+    return max(value for value in candidates if value is not None)
+
+
+def get_effective_auth_revision(user: SyUsuario):
+    role_ids = get_user_role_ids([user.id_usuario]).get(user.id_usuario, [])
+    return _effective_revision(_base_revision(user), role_ids, get_rbac_revisions())
+
+
+def get_effective_auth_revisions(user_ids: Iterable[int]) -> dict:
+    # Revision efectiva por usuario en lote (bases desde BD).
+    unique_ids = sorted({int(user_id) for user_id in user_ids if user_id is not None})
+    if not unique_ids:
+        return {}
+
+    bases = {
+        user_id: fch_modf or fch_alta
+        for user_id, fch_modf, fch_alta in SyUsuario.objects.filter(
+            id_usuario__in=unique_ids
+        ).values_list("id_usuario", "fch_modf", "fch_alta")
+    }
+    role_ids = get_user_role_ids(list(bases))
+    revisions = get_rbac_revisions()
+    return {
+        user_id: _effective_revision(base, role_ids.get(user_id, []), revisions)
+        for user_id, base in bases.items()
+        if base is not None
+    }
 
 
 def serialize_auth_revision(user: SyUsuario) -> str:
-    base_revision = user.fch_modf or user.fch_alta or timezone.now()
+    resolved = getattr(user, AUTH_REVISION_ATTR, None)
+    if resolved:
+        return resolved
+    return _format_revision(get_effective_auth_revision(user))
+
+
+def publish_auth_revision(user: SyUsuario) -> None:
+    # Write-through de la revision base y revocados usados por el fast path.
+    revision = _format_revision(_base_revision(user))
+    revoked = not user.est_activo or user.est_bloqueado or bool(user.fch_baja)
+
+    try:
+        cache.set(_revision_key(user.id_usuario), revision, _revision_ttl())
+        if revoked:
+            cache.set(_revoked_key(user.id_usuario), True, _revision_ttl())
+        else:
+            cache.delete(_revoked_key(user.id_usuario))
+    except Exception:
+        logger.warning("No se pudo publicar la revision de sesion", exc_info=True)
 
-    if timezone.is_naive(base_revision):
-        base_revision = timezone.make_aware(base_revision, timezone.get_current_timezone())
 
-    return timezone.localtime(base_revision).isoformat()
+def get_published_auth_revision(user_id) -> tuple[str | None, bool]:
+    # Regresa (revision efectiva, revocado); revision None si no hay entrada.
+    try:
+        values = cache.get_many([_revision_key(user_id), _revoked_key(user_id)])
+    except Exception:
+        logger.warning("No se pudo leer la revision de sesion", exc_info=True)
+        return None, False
+
+    revoked = bool(values.get(_revoked_key(user_id)))
+    base_revision = parse_datetime(values.get(_revision_key(user_id)) or "")
+    if base_revision is None:
+        return None, revoked
+
+    role_ids = get_user_role_ids([user_id]).get(int(user_id), [])
+    revision = _effective_revision(base_revision, role_ids, get_rbac_revisions())
+    return _format_revision(revision), revoked
+
+
+def _notify_revision_changed(revision, **targets) -> None:
+    # Aviso realtime a los clientes afectados, solo si la transaccion confirma.
+    def _publish():
+        from apps.realtime.events import publish_auth_revision_changed
+
+        try:
+            publish_auth_revision_changed(revision=revision, **targets)
+        except Exception:
+            logger.exception("No se pudo publicar evento realtime de revision de sesion")
+
+    transaction.on_commit(_publish)
+    publish_invalidation(RBAC_CACHE_NAMESPACE, revision)
+
+
+def _bump_rbac_revisions(keys):
+    now = timezone.now()
+    for key in keys:
+        RbacRevision.objects.update_or_create(
+            clave=key,
+            defaults={"fch_revision": now},
+        )
+    _delete_keys([RBAC_REVISIONS_CACHE_KEY])
+    return now
+
+
+def bump_role_revisions(role_ids: Iterable[int]) -> None:
+    # Cambio en un rol: una fila, sin tocar a los usuarios que lo tienen.
+    unique_ids = sorted({int(role_id) for role_id in role_ids if role_id is not None})
+    if unique_ids:
+        now = _bump_rbac_revisions([_role_revision_key(role_id) for role_id in unique_ids])
+        _notify_revision_changed(_format_revision(now), role_ids=unique_ids)
+
+
+def bump_rbac_epoch() -> None:
+    # Cambio global (catalogo de permisos): invalida todas las sesiones.
+    now = _bump_rbac_revisions([RBAC_EPOCH])
+    _notify_revision_changed(_format_revision(now), epoch=True)
 
 
 def touch_users_auth_revision(
@@ -33,6 +268,20 @@ def touch_users_auth_revision(
         update_fields["usr_modf_id"] = actor_id
 
     SyUsuario.objects.filter(id_usuario__in=unique_ids).update(**update_fields)
+    invalidate_principals(unique_ids)
+    # Sus roles pudieron cambiar.
+    _delete_keys([_user_roles_key(user_id) for user_id in unique_ids])
+
+    revision = _format_revision(now)
+    try:
+        cache.set_many(
+            {_revision_key(user_id): revision for user_id in unique_ids},
+            _revision_ttl(),
+        )
+    except Exception:
+        logger.warning("No se pudo publicar la revision de sesion", exc_info=True)
+
+    _notify_revision_changed(revision, user_ids=unique_ids)
 
 
 def touch_user_auth_revision(user: SyUsuario, actor_id: int | None = None) -> None:
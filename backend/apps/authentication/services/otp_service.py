@@ -1,11 +1,16 @@
 import secrets
 
-from django.core.cache import cache
+from infrastructure.cache.redis_manager import get_namespace
+from infrastructure.security.rate_limiter import hit, reset
 
 OTP_TTL_SECONDS = 60 * 10
 OTP_ATTEMPT_LIMIT = 5
 OTP_REQUEST_TTL_SECONDS = 60 * 10
 OTP_REQUEST_LIMIT = 5
+OTP_ATTEMPTS_SCOPE = "otp:attempts"
+OTP_REQUEST_SCOPE = "otp:request"
+# Sin L1: el codigo se valida desde cualquier proceso.
+OTP_CACHE = get_namespace("otp", ttl=OTP_TTL_SECONDS)
 
 
 def generate_code():
@@ -15,40 +20,56 @@ def generate_code():
 
 def store_code(email, code):
     # Guarda codigo en cache con TTL.
-    cache.set(_otp_key(email), {"code": code, "attempts": 0}, OTP_TTL_SECONDS)
+    OTP_CACHE.set(_otp_key(email), {"code": code, "attempts": 0}, OTP_TTL_SECONDS)
+    reset(OTP_ATTEMPTS_SCOPE, email)
 
 
 def get_code(email):
-    # Obtiene codigo desde cache.
-    return cache.get(_otp_key(email))
+    # Obtiene codigo desde cache; los intentos vienen del contador atomico.
+    data = OTP_CACHE.get(_otp_key(email))
+    if not data:
+        return data
+    attempts = hit(
+        OTP_ATTEMPTS_SCOPE,
+        email,
+        limit=OTP_ATTEMPT_LIMIT,
+        window=OTP_TTL_SECONDS,
+        cost=0,
+    ).count
+    data["attempts"] = max(data.get("attempts", 0), attempts)
+    return data
 
 
 def increment_attempts(email):
-    # Incrementa intentos de validacion.
-    data = cache.get(_otp_key(email))
+    # Incrementa intentos de validacion sin leer-modificar-escribir el codigo.
+    data = OTP_CACHE.get(_otp_key(email))
     if not data:
         return None
-    data["attempts"] = data.get("attempts", 0) + 1
-    cache.set(_otp_key(email), data, OTP_TTL_SECONDS)
+    attempts = hit(
+        OTP_ATTEMPTS_SCOPE,
+        email,
+        limit=OTP_ATTEMPT_LIMIT,
+        window=OTP_TTL_SECONDS,
+    ).count
+    data["attempts"] = max(data.get("attempts", 0), attempts)
     return data
 
 
 def clear_code(email):
     # Elimina el codigo de cache.
-    cache.delete(_otp_key(email))
+    OTP_CACHE.delete(_otp_key(email))
+    reset(OTP_ATTEMPTS_SCOPE, email)
 
 
 def rate_limit_request(email):
     # Limite de solicitudes por correo.
-    key = _otp_request_key(email)
-    count = cache.get(key, 0) + 1
-    cache.set(key, count, OTP_REQUEST_TTL_SECONDS)
-    return count > OTP_REQUEST_LIMIT
+    return not hit(
+        OTP_REQUEST_SCOPE,
+        email,
+        limit=OTP_REQUEST_LIMIT,
+        window=OTP_REQUEST_TTL_SECONDS,
+    ).allowed
 
 
 def _otp_key(email):
-    return f"otp:{email.lower()}"
-
-
-def _otp_request_key(email):
-    return f"otp:req:{email.lower()}"
+    return email.lower()
@@ -1,4 +1,6 @@
-from typing import Dict, List, TypedDict
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple, TypedDict
 
 
 class PermissionDependencyState(TypedDict):
@@ -168,26 +170,167 @@ def get_permission_direct_dependencies(permission_code: str) -> List[str]:
     return sorted(dependencies)
 
 
-def get_permission_dependency_closure(permission_code: str) -> List[str]:
-    normalized_permission = _normalize_permission(permission_code)
-    if not normalized_permission:
-        return []
+class PermissionDependencyGraph:
+    """DAG indexado de dependencias con cierres memoizados como bitsets."""
+
+    def __init__(self, version: int = 0):
+        self.version = version
+        self._index: Dict[str, int] = {}
+        self._codes: List[str] = []
+        self._closures: Dict[int, int] = {}
+        self._capabilities: Dict[str, Tuple[int, List[int], int]] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def compile(cls, version: int = 0) -> "PermissionDependencyGraph":
+        graph = cls(version=version)
+        seeds = set(EXPLICIT_PERMISSION_DEPENDENCIES)
+        for dependencies in EXPLICIT_PERMISSION_DEPENDENCIES.values():
+            seeds.update(dependencies)
+        for requirement in CAPABILITY_REQUIREMENTS.values():
+            seeds.update(requirement.get("allOf", []))
+            seeds.update(requirement.get("anyOf", []))
+
+        for code in sorted(seeds):
+            graph.closure_mask(code)
+
+        for key, requirement in CAPABILITY_REQUIREMENTS.items():
+            graph._capabilities[key] = graph._compile_requirement(requirement)
+        return graph
+
+    def _bit_index(self, code: str) -> int:
+        index = self._index.get(code)
+        if index is not None:
+            return index
+        with self._lock:
+            index = self._index.get(code)
+            if index is None:
+                index = len(self._codes)
+                self._codes.append(code)
+                self._index[code] = index
+            return index
+
+    def mask_of(self, codes: Iterable[str]) -> int:
+        mask = 0
+        for code in codes:
+            mask |= 1 << self._bit_index(code)
+        return mask
+
+    def decode(self, mask: int) -> List[str]:
+        codes = []
+        while mask:
+            lowest = mask & -mask
+            codes.append(self._codes[lowest.bit_length() - 1])
+            mask ^= lowest
+        return sorted(codes)
+
+    def closure_mask(self, permission_code: str) -> int:
+        normalized_permission = _normalize_permission(permission_code)
+        if not normalized_permission:
+            return 0
+
+        index = self._bit_index(normalized_permission)
+        cached = self._closures.get(index)
+        if cached is not None:
+            return cached
+
+        visited = set()
+        stack = [normalized_permission]
+        while stack:
+            current = stack.pop()
+            if not current or current in visited:
+                continue
+            visited.add(current)
+            for dependency in get_permission_direct_dependencies(current):
+                if dependency not in visited:
+                    stack.append(dependency)
+
+        closure = self.mask_of(visited)
+        self._closures[index] = closure
+        return closure
+
+    def _compile_requirement(
+        self, requirement: PermissionRequirement
+    ) -> Tuple[int, List[int], int]:
+        all_of_mask = 0
+        for permission in requirement.get("allOf", []):
+            all_of_mask |= self.closure_mask(permission)
+
+        any_of_masks = [
+            self.closure_mask(permission) for permission in requirement.get("anyOf", [])
+        ]
+        any_of_union = 0
+        for mask in any_of_masks:
+            any_of_union |= mask
+        return all_of_mask, any_of_masks, any_of_union
+
+    def evaluate_requirement(
+        self,
+        requirement: Tuple[int, List[int], int],
+        granted_mask: int,
+    ) -> PermissionRequirementState:
+        all_of_mask, any_of_masks, any_of_union = requirement
+        missing_all_of = all_of_mask & ~granted_mask
+        # Un anyOf se cumple si alguno tiene su cierre completo otorgado.
+        has_any = len(any_of_masks) == 0 or any(
+            mask and not (mask & ~granted_mask) for mask in any_of_masks
+        )
+
+        return {
+            "granted": missing_all_of == 0 and has_any,
+            "missingAllOf": self.decode(missing_all_of),
+            "missingAnyOf": [] if has_any else self.decode(any_of_union),
+        }
+
+    def requirement_for(self, requirement: PermissionRequirement):
+        return self._compile_requirement(requirement)
+
+    def capability_requirements(self) -> Dict[str, Tuple[int, List[int], int]]:
+        return self._capabilities
+
+
+_graph: PermissionDependencyGraph | None = None
+_graph_checked_at = 0.0
+_graph_lock = threading.Lock()
+
+# Cada cuanto se relee la version del catalogo; los cambios publicados llegan
+# antes por el bus de invalidacion (reset_permission_graph).
+GRAPH_VERSION_CHECK_SECONDS = 5.0
 
-    visited = set()
-    stack = [normalized_permission]
 
-    while stack:
-        current = stack.pop()
-        if not current or current in visited:
-            continue
+def _get_permissions_catalog_version() -> int:
+    # El grafo se recompila solo cuando cambia el catalogo de permisos.
+    from apps.catalogos.services.catalog_version_service import get_catalog_version
 
-        visited.add(current)
+    return get_catalog_version("permisos")
 
-        for dependency in get_permission_direct_dependencies(current):
-            if dependency not in visited:
-                stack.append(dependency)
 
-    return sorted(visited)
+def get_permission_graph() -> PermissionDependencyGraph:
+    global _graph, _graph_checked_at
+
+    graph = _graph
+    now = time.monotonic()
+    if graph is not None and now - _graph_checked_at < GRAPH_VERSION_CHECK_SECONDS:
+        return graph
+
+    version = _get_permissions_catalog_version()
+    with _graph_lock:
+        if _graph is None or _graph.version != version:
+            _graph = PermissionDependencyGraph.compile(version=version)
+        _graph_checked_at = now
+        return _graph
+
+
+def reset_permission_graph() -> None:
+    global _graph
+
+    with _graph_lock:
+        _graph = None
+
+
+def get_permission_dependency_closure(permission_code: str) -> List[str]:
+    graph = get_permission_graph()
+    return graph.decode(graph.closure_mask(permission_code))
 
 
 def evaluate_permission_dependencies(
@@ -209,16 +352,14 @@ def evaluate_permission_dependencies(
             "missingPermissions": [],
         }
 
-    granted = set(granted_permissions)
-    required_permissions = get_permission_dependency_closure(normalized_permission)
-    missing_permissions = [
-        permission for permission in required_permissions if permission not in granted
-    ]
+    graph = get_permission_graph()
+    required_mask = graph.closure_mask(normalized_permission)
+    missing_mask = required_mask & ~graph.mask_of(granted_permissions)
 
     return {
-        "granted": len(missing_permissions) == 0,
-        "requiredPermissions": required_permissions,
-        "missingPermissions": missing_permissions,
+        "granted": missing_mask == 0,
+        "requiredPermissions": graph.decode(required_mask),
+        "missingPermissions": graph.decode(missing_mask),
     }
 
 
@@ -226,56 +367,26 @@ def evaluate_permission_requirement(
     requirement: PermissionRequirement,
     granted_permissions: List[str],
 ) -> PermissionRequirementState:
-    all_of = requirement.get("allOf", [])
-    any_of = requirement.get("anyOf", [])
-
-    all_states = [
-        evaluate_permission_dependencies(permission, granted_permissions)
-        for permission in all_of
-    ]
-    missing_all_of = _merge_unique(
-        [
-            missing
-            for state in all_states
-            for missing in state["missingPermissions"]
-        ]
-    )
-
-    any_states = [
-        evaluate_permission_dependencies(permission, granted_permissions)
-        for permission in any_of
-    ]
-    has_any = len(any_states) == 0 or any(state["granted"] for state in any_states)
-    missing_any_of = (
-        []
-        if has_any
-        else _merge_unique(
-            [
-                required
-                for state in any_states
-                for required in state["requiredPermissions"]
-            ]
-        )
-    )
-
-    return {
-        "granted": len(missing_all_of) == 0 and has_any,
-        "missingAllOf": missing_all_of,
-        "missingAnyOf": missing_any_of,
-    }
+    graph = get_permission_graph()
+    # El comodin equivale a un bitset con todos los bits encendidos.
+    granted_mask = -1 if "*" in granted_permissions else graph.mask_of(granted_permissions)
+    return graph.evaluate_requirement(graph.requirement_for(requirement), granted_mask)
 
 
 def project_effective_permissions(granted_permissions: List[str]) -> List[str]:
     if "*" in granted_permissions:
         return ["*"]
 
-    effective = []
+    graph = get_permission_graph()
+    granted_mask = graph.mask_of(granted_permissions)
+
+    effective = set()
     for permission in granted_permissions:
-        state = evaluate_permission_dependencies(permission, granted_permissions)
-        if state["granted"]:
-            effective.append(permission)
+        closure = graph.closure_mask(permission)
+        if closure and not (closure & ~granted_mask):
+            effective.add(permission)
 
-    return sorted(set(effective))
+    return sorted(effective)
 
 
 def resolve_capabilities(granted_permissions: List[str]) -> Dict[str, PermissionRequirementState]:
@@ -289,9 +400,11 @@ def resolve_capabilities(granted_permissions: List[str]) -> Dict[str, Permission
             for key in CAPABILITY_REQUIREMENTS
         }
 
+    graph = get_permission_graph()
+    granted_mask = graph.mask_of(granted_permissions)
     return {
-        key: evaluate_permission_requirement(requirement, granted_permissions)
-        for key, requirement in CAPABILITY_REQUIREMENTS.items()
+        key: graph.evaluate_requirement(requirement, granted_mask)
+        for key, requirement in graph.capability_requirements().items()
     }
 
 
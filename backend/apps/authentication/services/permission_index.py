@@ -0,0 +1,128 @@
+import base64
+import threading
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+from apps.catalogos.models import Permisos
+from apps.catalogos.services.catalog_version_service import get_catalog_version
+
+PERMISSIONS_CLAIM = "permissions"
+PERMISSION_BITMAP_CLAIM = "perm_bitmap"
+PERMISSION_VERSION_CLAIM = "perm_version"
+
+
+@dataclass(frozen=True)
+class PermissionIndex:
+    """Id entero estable (id_permiso) por codigo, ligado a una version del catalogo."""
+
+    version: int
+    code_to_id: Dict[str, int] = field(default_factory=dict)
+    id_to_code: Dict[int, str] = field(default_factory=dict)
+
+
+_index: Optional[PermissionIndex] = None
+_index_lock = threading.Lock()
+
+
+def _compact_claims_enabled() -> bool:
+    return bool(getattr(settings, "AUTH_COMPACT_PERMISSION_CLAIMS", True))
+
+
+def _load_index(version: int) -> PermissionIndex:
+    rows = Permisos.objects.values_list("id_permiso", "codigo")
+    code_to_id = {codigo: int(id_permiso) for id_permiso, codigo in rows}
+    return PermissionIndex(
+        version=version,
+        code_to_id=code_to_id,
+        id_to_code={id_permiso: codigo for codigo, id_permiso in code_to_id.items()},
+    )
+
+
+def get_permission_index(*, reload: bool = False) -> PermissionIndex:
+    global _index
+
+    version = get_catalog_version("permisos")
+    index = _index
+    if not reload and index is not None and index.version == version:
+        return index
+
+    with _index_lock:
+        if reload or _index is None or _index.version != version:
+            _index = _load_index(version)
+        return _index
+
+
+def reset_permission_index() -> None:
+    global _index
+
+    with _index_lock:
+        _index = None
+
+
+def _encode_ids(ids: Iterable[int]) -> str:
+    bitmap = 0
+    for permission_id in ids:
+        bitmap |= 1 << permission_id
+    raw = bitmap.to_bytes((bitmap.bit_length() + 7) // 8 or 1, "little")
+    return base64.urlsafe_b64encode(zlib.compress(raw, 9)).rstrip(b"=").decode("ascii")
+
+
+def _decode_ids(encoded: str) -> List[int]:
+    padded = encoded + "=" * (-len(encoded) % 4)
+    bitmap = int.from_bytes(zlib.decompress(base64.urlsafe_b64decode(padded)), "little")
+    ids = []
+    while bitmap:
+        lowest = bitmap & -bitmap
+        ids.append(lowest.bit_length() - 1)
+        bitmap ^= lowest
+    return ids
+
+
+def encode_permission_claims(permissions: List[str]) -> dict:
+    # Claims de permisos para el token: bitmap comprimido o lista legible.
+    if not _compact_claims_enabled() or not permissions or "*" in permissions:
+        return {PERMISSIONS_CLAIM: list(permissions)}
+
+    index = get_permission_index()
+    if any(code not in index.code_to_id for code in permissions):
+        # Catalogo modificado sin publicar version: se recarga una vez.
+        index = get_permission_index(reload=True)
+
+    ids = [index.code_to_id.get(code) for code in permissions]
+    if any(permission_id is None for permission_id in ids):
+        # Codigo fuera del indice publicado: se conserva la lista completa.
+        return {PERMISSIONS_CLAIM: list(permissions)}
+
+    return {
+        PERMISSION_BITMAP_CLAIM: _encode_ids(ids),
+        PERMISSION_VERSION_CLAIM: index.version,
+    }
+
+
+def expand_permission_claims(payload) -> Optional[List[str]]:
+    # Regresa la lista de permisos del token, o None si no puede expandirse.
+    permissions = payload.get(PERMISSIONS_CLAIM)
+    if permissions is not None:
+        return list(permissions)
+
+    encoded = payload.get(PERMISSION_BITMAP_CLAIM)
+    if not encoded:
+        return None
+
+    try:
+        ids = _decode_ids(str(encoded))
+    except (ValueError, zlib.error):
+        return None
+
+    # Los ids son llaves primarias estables; cualquier version vigente los resuelve.
+    index = get_permission_index()
+    if any(permission_id not in index.id_to_code for permission_id in ids):
+        index = get_permission_index(reload=True)
+
+    codes = [index.id_to_code.get(permission_id) for permission_id in ids]
+    if any(code is None for code in codes):
+        return None
+    return sorted(codes)
@@ -0,0 +1,90 @@
+import logging
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CACHE_PREFIX = "auth:principal"
+PRINCIPAL_CACHE_DEFAULT_TTL = 300
+_PRINCIPAL_MEMO_ATTR = "_auth_principal_memo"
+
+
+def _principal_key(user_id) -> str:
+    return f"{PRINCIPAL_CACHE_PREFIX}:{user_id}"
+
+
+def _principal_ttl() -> int:
+    return int(
+        getattr(settings, "AUTH_PRINCIPAL_CACHE_TTL", PRINCIPAL_CACHE_DEFAULT_TTL)
+    )
+
+
+def get_cached_principal(user, revision: str) -> dict[str, Any] | None:
+    # Primero la memoria de la peticion (instancia del usuario), luego cache compartida.
+    memo = getattr(user, _PRINCIPAL_MEMO_ATTR, None)
+    if memo and memo[0] == revision:
+        return memo[1]
+
+    if _principal_ttl() <= 0:
+        return None
+
+    try:
+        entry = cache.get(_principal_key(user.id_usuario))
+    except Exception:
+        logger.warning("No se pudo leer el principal en cache", exc_info=True)
+        return None
+
+    if not isinstance(entry, dict) or entry.get("revision") != revision:
+        return None
+
+    principal = entry.get("principal")
+    if not isinstance(principal, dict):
+        return None
+
+    setattr(user, _PRINCIPAL_MEMO_ATTR, (revision, principal))
+    return principal
+
+
+def store_principal(user, revision: str, principal: dict[str, Any]) -> None:
+    setattr(user, _PRINCIPAL_MEMO_ATTR, (revision, principal))
+
+    ttl = _principal_ttl()
+    if ttl <= 0:
+        return
+
+    try:
+        cache.set(
+            _principal_key(user.id_usuario),
+            {"revision": revision, "principal": principal},
+            ttl,
+        )
+    except Exception:
+        logger.warning("No se pudo guardar el principal en cache", exc_info=True)
+
+
+def resolve_principal(
+    user,
+    revision: str,
+    builder: Callable[[Any], dict[str, Any]],
+) -> dict[str, Any]:
+    # El principal es de solo lectura para los consumidores.
+    principal = get_cached_principal(user, revision)
+    if principal is not None:
+        return principal
+
+    principal = builder(user)
+    store_principal(user, revision, principal)
+    return principal
+
+
+def invalidate_principals(user_ids: Iterable[int]) -> None:
+    keys = [_principal_key(user_id) for user_id in user_ids if user_id is not None]
+    if not keys:
+        return
+
+    try:
+        cache.delete_many(keys)
+    except Exception:
+        logger.warning("No se pudo invalidar el principal en cache", exc_info=True)
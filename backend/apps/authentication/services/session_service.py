@@ -1,13 +1,53 @@
+from django.conf import settings
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.settings import api_settings
 
 from apps.authentication.repositories.user_repository import UserRepository
 
+from .auth_revision import get_published_auth_revision, publish_auth_revision
 from .errors import AuthServiceError
-from .token_service import ACCESS_COOKIE, decode_access_token
+from .permission_index import expand_permission_claims
+from .token_service import (
+    ACCESS_COOKIE,
+    AUTH_REVISION_CLAIM,
+    USERNAME_CLAIM,
+    decode_access_token,
+)
 
+_REQUEST_AUTH_MEMO_ATTR = "_sires_auth_memo"
 
-def authenticate_request(request):
+
+def _base_request(request):
+    # DRF envuelve el HttpRequest; la memoria vive en el request de Django.
+    return getattr(request, "_request", request)
+
+
+def _stateless_fast_path_enabled():
+    return bool(getattr(settings, "AUTH_STATELESS_FAST_PATH", False))
+
+
+def _authenticate_from_claims(payload, user_id):
+    # Confia en los claims firmados si la revision publicada coincide.
+    token_revision = payload.get(AUTH_REVISION_CLAIM)
+    roles = payload.get("roles")
+    permissions = expand_permission_claims(payload)
+    if not token_revision or roles is None or permissions is None:
+        return None
+
+    published_revision, revoked = get_published_auth_revision(user_id)
+    if revoked or published_revision != token_revision:
+        return None
+
+    return UserRepository.from_token_claims(
+        user_id,
+        username=payload.get(USERNAME_CLAIM, ""),
+        revision=token_revision,
+        roles=roles,
+        permissions=permissions,
+    )
+
+
+def authenticate_request(request, *, trust_claims=True):
     # Valida access token desde cookie.
     raw_token = request.COOKIES.get(ACCESS_COOKIE)
     if not raw_token:
@@ -17,6 +57,16 @@ def authenticate_request(request):
             401,
         )
 
+    memo = getattr(_base_request(request), _REQUEST_AUTH_MEMO_ATTR, None)
+    if (
+        isinstance(memo, tuple)
+        and memo[0] == raw_token
+        and (trust_claims or not UserRepository.is_claims_user(memo[1]))
+    ):
+        # Misma peticion y mismo token: reutiliza el usuario ya validado.
+        request.user = memo[1]
+        return memo[1]
+
     try:
         payload = decode_access_token(raw_token)
     except TokenError as exc:
@@ -30,6 +80,14 @@ def authenticate_request(request):
         raise AuthServiceError("TOKEN_INVALID", "Token inválido", 401)
     user_id = str(user_id_claim)
 
+    fast_path = trust_claims and _stateless_fast_path_enabled()
+    if fast_path:
+        user = _authenticate_from_claims(payload, user_id)
+        if user is not None:
+            request.user = user
+            setattr(_base_request(request), _REQUEST_AUTH_MEMO_ATTR, (raw_token, user))
+            return user
+
     user = UserRepository.get_by_id(user_id)
     if not user:
         raise AuthServiceError("SESSION_EXPIRED", "Tu sesión ha expirado", 401)
@@ -41,5 +99,10 @@ def authenticate_request(request):
     if user.est_bloqueado or user.fch_baja:
         raise AuthServiceError("SESSION_EXPIRED", "Tu sesión ha expirado", 401)
 
+    if fast_path:
+        # Repuebla el mapa de revisiones para las siguientes peticiones.
+        publish_auth_revision(user)
+
     request.user = user
+    setattr(_base_request(request), _REQUEST_AUTH_MEMO_ATTR, (raw_token, user))
     return user
@@ -8,6 +8,8 @@ from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
 from apps.authentication.repositories.user_repository import UserRepository
+from apps.authentication.services.auth_revision import publish_auth_revision
+from apps.authentication.services.permission_index import encode_permission_claims
 
 ACCESS_COOKIE = "access_token_cookie"
 REFRESH_COOKIE = "refresh_token_cookie"
@@ -21,6 +23,9 @@ REFRESH_MAX_AGE = 60 * 60 * 24 * 7
 CSRF_MAX_AGE = REFRESH_MAX_AGE
 RESET_MAX_AGE = 60 * 10
 
+AUTH_REVISION_CLAIM = "auth_revision"
+USERNAME_CLAIM = "username"
+
 
 def _cookie_secure() -> bool:
     # En local (http) los navegadores ignoran cookies `Secure`.
@@ -39,13 +44,22 @@ def create_access_refresh_tokens(user):
     roles = auth_user.get("roles", [])
     permissions = auth_user.get("permissions", [])
 
+    # Bitmap comprimido sobre el indice de permisos en lugar de la lista de codigos.
+    permission_claims = encode_permission_claims(permissions)
+
     refresh = RefreshToken.for_user(user)
     refresh["roles"] = roles
-    refresh["permissions"] = permissions
+    for claim, value in permission_claims.items():
+        refresh[claim] = value
 
     access = refresh.access_token
     access["roles"] = roles
-    access["permissions"] = permissions
+    for claim, value in permission_claims.items():
+        access[claim] = value
+    access[USERNAME_CLAIM] = user.usuario
+    access[AUTH_REVISION_CLAIM] = auth_user.get("authRevision")
+    # El fast path compara este claim contra la revision publicada.
+    publish_auth_revision(user)
     return str(access), str(refresh)
 
 
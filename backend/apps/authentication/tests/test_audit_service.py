@@ -41,7 +41,7 @@ class AuditServiceTests(TestCase):
         request = factory.get("/api/v1/auth/me", HTTP_X_REQUEST_ID="req-456")
 
         with patch(
-            "apps.authentication.services.audit_service.AuditoriaEvento.objects.create"
+            "apps.authentication.services.audit_service.record_audit_event"
         ) as create_mock:
             create_mock.side_effect = RuntimeError("db down")
             log_event(request, "SESSION_VALIDATE", "SUCCESS")
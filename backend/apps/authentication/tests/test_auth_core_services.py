@@ -3,16 +3,24 @@ from unittest.mock import patch
 
 from django.contrib.auth.hashers import make_password
 from django.http import HttpResponse
-from django.test import RequestFactory, TestCase
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
 from django.utils import timezone
 from rest_framework_simplejwt.exceptions import TokenBackendError, TokenError
 from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken
 
+from apps.administracion.models import RelRolPermiso, RelUsuarioRol
 from apps.authentication.models import DetUsuario, SyUsuario
+from apps.authentication.repositories.user_repository import UserRepository
 from apps.authentication.services.csrf_service import validate_csrf
 from apps.authentication.services.errors import AuthServiceError
-from apps.authentication.services.auth_revision import serialize_auth_revision
+from apps.authentication.services.permission_index import (
+    PERMISSION_BITMAP_CLAIM, expand_permission_claims)
+from apps.authentication.services.auth_revision import (bump_role_revisions,
+                                                        publish_auth_revision,
+                                                        serialize_auth_revision,
+                                                        touch_user_auth_revision)
 from apps.authentication.services.response_service import (error_response,
                                                            get_request_id)
 from apps.authentication.services.session_service import authenticate_request
@@ -28,6 +36,7 @@ from apps.authentication.services.token_service import (ACCESS_COOKIE,
                                                         set_auth_cookies,
                                                         set_reset_cookie,
                                                         validate_refresh_token)
+from apps.catalogos.models import Permisos, Roles
 from middlewares.auth import JWTAuthenticationMiddleware
 
 
@@ -214,6 +223,84 @@ class AuthCoreServicesTests(TestCase):
 
         self.assertEqual(ctx.exception.code, "SESSION_EXPIRED")
 
+    def test_access_token_carries_compact_permission_bitmap(self):
+        role = Roles.objects.create(rol="CORE_ROLE", desc_rol="Core", is_active=True)
+        RelUsuarioRol.objects.create(id_usuario=self.user, id_rol=role, is_primary=True)
+        codes = [f"core:modulo_{index}:read" for index in range(20)]
+        for code in codes:
+            permission = Permisos.objects.create(codigo=code, descripcion=code, is_active=True)
+            RelRolPermiso.objects.create(id_rol=role, id_permiso=permission)
+
+        access_token, _ = create_access_refresh_tokens(self.user)
+        payload = decode_access_token(access_token)
+
+        self.assertNotIn("permissions", payload)
+        self.assertIn(PERMISSION_BITMAP_CLAIM, payload)
+        self.assertEqual(expand_permission_claims(payload), sorted(codes))
+
+    @override_settings(AUTH_STATELESS_FAST_PATH=True)
+    def test_authenticate_request_fast_path_trusts_claims_without_db(self):
+        cache.clear()
+        access_token, _ = create_access_refresh_tokens(self.user)
+
+        request = self.factory.get("/api/test")
+        request.COOKIES[ACCESS_COOKIE] = access_token
+        with self.assertNumQueries(0):
+            user = authenticate_request(request)
+            authorization = UserRepository.get_authorization(user)
+
+        self.assertEqual(user.id_usuario, self.user.id_usuario)
+        self.assertEqual(user.usuario, "core_user")
+        self.assertEqual(serialize_auth_revision(user), serialize_auth_revision(self.user))
+        self.assertIn("roles", authorization)
+
+    @override_settings(AUTH_STATELESS_FAST_PATH=True)
+    def test_authenticate_request_fast_path_falls_back_after_revision_change(self):
+        cache.clear()
+        access_token, _ = create_access_refresh_tokens(self.user)
+
+        self.user.est_activo = False
+        self.user.save(update_fields=["est_activo"])
+        touch_user_auth_revision(self.user)
+
+        request = self.factory.get("/api/test")
+        request.COOKIES[ACCESS_COOKIE] = access_token
+        with self.assertRaises(AuthServiceError) as ctx:
+            authenticate_request(request)
+        self.assertEqual(ctx.exception.code, "PERMISSION_DENIED")
+
+    @override_settings(AUTH_STATELESS_FAST_PATH=True)
+    def test_authenticate_request_fast_path_falls_back_after_role_revision(self):
+        cache.clear()
+        role = Roles.objects.create(rol="CORE_ROLE", is_admin=False, is_active=True)
+        RelUsuarioRol.objects.create(id_usuario=self.user, id_rol=role, is_primary=True)
+        access_token, _ = create_access_refresh_tokens(self.user)
+
+        bump_role_revisions([role.id_rol])
+
+        request = self.factory.get("/api/test")
+        request.COOKIES[ACCESS_COOKIE] = access_token
+        user = authenticate_request(request)
+
+        self.assertFalse(UserRepository.is_claims_user(user))
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.fch_modf)
+
+    @override_settings(AUTH_STATELESS_FAST_PATH=True)
+    def test_authenticate_request_fast_path_rejects_revoked_user(self):
+        cache.clear()
+        access_token, _ = create_access_refresh_tokens(self.user)
+
+        self.user.est_bloqueado = True
+        self.user.save(update_fields=["est_bloqueado"])
+        publish_auth_revision(self.user)
+
+        request = self.factory.get("/api/test")
+        request.COOKIES[ACCESS_COOKIE] = access_token
+        with self.assertRaises(AuthServiceError) as ctx:
+            authenticate_request(request)
+        self.assertEqual(ctx.exception.code, "SESSION_EXPIRED")
+
     def test_jwt_auth_middleware_adds_auth_revision_header(self):
         request = self.factory.get("/api/test")
         request.user = self.user
@@ -237,13 +324,12 @@ class AuthCoreServicesTests(TestCase):
         self.assertNotIn("X-Auth-Revision", response)
 
     def test_jwt_auth_middleware_refreshes_revision_on_mutating_requests(self):
+        cache.clear()
         request = self.factory.patch("/api/test")
         request.user = self.user
 
         def get_response(_request):
-            SyUsuario.objects.filter(id_usuario=self.user.id_usuario).update(
-                fch_modf=timezone.now() + timedelta(minutes=2)
-            )
+            touch_user_auth_revision(self.user)
             return HttpResponse("ok")
 
         middleware = JWTAuthenticationMiddleware(get_response)
@@ -254,3 +340,16 @@ class AuthCoreServicesTests(TestCase):
             response["X-Auth-Revision"],
             serialize_auth_revision(self.user),
         )
+
+    def test_jwt_auth_middleware_serves_published_revision_without_db(self):
+        cache.clear()
+        publish_auth_revision(self.user)
+        serialize_auth_revision(self.user)
+        request = self.factory.post("/api/test")
+        request.user = self.user
+
+        middleware = JWTAuthenticationMiddleware(lambda _request: HttpResponse("ok"))
+        with self.assertNumQueries(0):
+            response = middleware(request)
+
+        self.assertEqual(response["X-Auth-Revision"], serialize_auth_revision(self.user))
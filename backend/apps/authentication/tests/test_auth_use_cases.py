@@ -2,7 +2,6 @@ from unittest.mock import patch
 
 from django.contrib.auth.hashers import make_password
 from django.core.exceptions import ValidationError
-from django.core.cache import cache
 from django.test import TestCase
 from rest_framework_simplejwt.exceptions import TokenError
 
@@ -136,14 +135,17 @@ class AuthUseCasesTests(TestCase):
         self.assertEqual(ctx.exception.code, "CODE_EXPIRED")
 
     def test_verify_reset_code_when_attempt_limit_already_reached(self):
-        from apps.authentication.services.otp_service import OTP_ATTEMPT_LIMIT, store_code
+        from apps.authentication.services.otp_service import (
+            OTP_ATTEMPT_LIMIT,
+            OTP_CACHE,
+            store_code,
+        )
 
         email = "usecase.user@example.com"
         store_code(email, "123456")
-        cache_key = f"otp:{email}"
-        otp_data = cache.get(cache_key)
+        otp_data = OTP_CACHE.get(email)
         otp_data["attempts"] = OTP_ATTEMPT_LIMIT
-        cache.set(cache_key, otp_data, 300)
+        OTP_CACHE.set(email, otp_data, 300)
 
         with self.assertRaises(AuthServiceError) as ctx:
             verify_reset_code(email, "123456")
@@ -1,13 +1,21 @@
+from unittest.mock import patch
+
 from django.test import SimpleTestCase
 
 from apps.authentication.services.permission_dependencies import (
     build_permission_context,
     evaluate_permission_dependencies,
+    evaluate_permission_requirement,
     get_permission_dependency_closure,
+    get_permission_graph,
 )
+from apps.catalogos.services.catalog_version_service import bump_catalog_version
 
 
 class PermissionDependenciesServiceTests(SimpleTestCase):
+    # bump_catalog_version publica la invalidacion con on_commit.
+    databases = {"default"}
+
     def test_users_update_dependency_closure(self):
         closure = get_permission_dependency_closure("admin:gestion:usuarios:update")
 
@@ -116,3 +124,48 @@ class PermissionDependenciesServiceTests(SimpleTestCase):
         self.assertTrue(
             complete_context["capabilities"]["flow.recepcion.queue.write"]["granted"]
         )
+
+    def test_permission_graph_is_reused_until_permissions_catalog_changes(self):
+        graph = get_permission_graph()
+        self.assertIs(get_permission_graph(), graph)
+
+        bump_catalog_version("permisos")
+
+        rebuilt = get_permission_graph()
+        self.assertIsNot(rebuilt, graph)
+        self.assertEqual(
+            rebuilt.decode(rebuilt.closure_mask("admin:gestion:roles:update")),
+            [
+                "admin:gestion:permisos:read",
+                "admin:gestion:roles:read",
+                "admin:gestion:roles:update",
+            ],
+        )
+
+    def test_permission_graph_does_not_read_version_on_every_call(self):
+        get_permission_graph()
+
+        with patch(
+            "apps.authentication.services.permission_dependencies._get_permissions_catalog_version"
+        ) as read_version:
+            for _ in range(5):
+                get_permission_graph()
+
+        read_version.assert_not_called()
+
+    def test_requirement_any_of_reports_union_when_no_branch_is_complete(self):
+        state = evaluate_permission_requirement(
+            {"anyOf": ["clinico:consultas:create", "clinico:somatometria:update"]},
+            ["clinico:consultas:create"],
+        )
+
+        self.assertFalse(state["granted"])
+        self.assertEqual(
+            state["missingAnyOf"],
+            [
+                "clinico:consultas:create",
+                "clinico:consultas:read",
+                "clinico:somatometria:read",
+                "clinico:somatometria:update",
+            ],
+        )
@@ -0,0 +1,129 @@
+from unittest.mock import patch
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.authentication.models import SyUsuario
+from apps.authentication.services.errors import AuthServiceError
+from apps.authentication.uses_case.login_usecase import login_user
+from infrastructure.security import rate_limiter
+from infrastructure.security.rate_limiter import hit, parse_rate, reset
+
+
+class RateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("30/min"), (30, 60))
+        self.assertEqual(parse_rate("50/hour"), (50, 3600))
+        self.assertEqual(parse_rate("5/s"), (5, 1))
+
+    def test_hit_counts_until_limit_and_peek_does_not_count(self):
+        for expected in range(1, 4):
+            result = hit("test", "abc", limit=3, window=60)
+            self.assertTrue(result.allowed)
+            self.assertEqual(result.count, expected)
+
+        peek = hit("test", "abc", limit=3, window=60, cost=0)
+        self.assertFalse(peek.allowed)
+        self.assertEqual(peek.count, 3)
+
+        blocked = hit("test", "ABC", limit=3, window=60)
+        self.assertFalse(blocked.allowed)
+        self.assertGreater(blocked.retry_after, 0)
+
+        reset("test", "abc")
+        self.assertTrue(hit("test", "abc", limit=3, window=60).allowed)
+
+    @override_settings(RATE_LIMIT_REDIS_URL="redis://localhost:1/0")
+    def test_falls_back_to_cache_when_redis_fails(self):
+        with patch(
+            "infrastructure.security.rate_limiter._redis_script",
+            side_effect=ConnectionError("down"),
+        ):
+            first = hit("test", "fallback", limit=1, window=60)
+            second = hit("test", "fallback", limit=1, window=60)
+
+        self.assertTrue(first.allowed)
+        self.assertFalse(second.allowed)
+
+
+    def test_redis_and_cache_backends_count_the_same_sequence(self):
+        # limite 2: dos permitidos, dos rechazados (sin contar), una consulta.
+        sequence = [1, 1, 1, 1, 0]
+
+        def run():
+            return [
+                (result.allowed, result.count)
+                for result in (hit("test", "same", limit=2, window=60, cost=cost) for cost in sequence)
+            ]
+
+        cache_results = run()
+        with patch.object(rate_limiter, "_redis_script", return_value=_FakeSlidingWindowScript()):
+            redis_results = run()
+
+        self.assertEqual(cache_results, [(True, 1), (True, 2), (False, 2), (False, 2), (False, 2)])
+        self.assertEqual(redis_results, cache_results)
+
+
+class _FakeSlidingWindowScript:
+    """Misma semantica que _SLIDING_WINDOW_LUA sobre un ZSET en memoria."""
+
+    def __init__(self):
+        self.members = {}
+
+    def __call__(self, keys, args):
+        now, window, limit, cost, member = args
+        entries = [score for score in self.members.get(keys[0], []) if score > now - window]
+        count = len(entries)
+        allowed = count < limit if cost == 0 else count + cost <= limit
+        if not allowed:
+            return [0, count, entries[0] + window - now if entries else window]
+        self.members[keys[0]] = entries + [now] * cost
+        return [1, count + cost, 0]
+
+
+@override_settings(RATE_LIMITS={"login_ip": "2/min"})
+class LoginIpRateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        SyUsuario.objects.create(
+            usuario="ratelimit_user",
+            correo="ratelimit.user@example.com",
+            clave_hash=make_password("Ratelimit_123456"),
+            est_activo=True,
+        )
+
+    def test_failed_logins_from_same_ip_are_limited(self):
+        for username in ("ratelimit_user", "nobody"):
+            with self.assertRaises(AuthServiceError):
+                login_user(username, "Incorrecta_1", "10.0.0.9")
+
+        with self.assertRaises(AuthServiceError) as ctx:
+            login_user("ratelimit_user", "Ratelimit_123456", "10.0.0.9")
+        self.assertEqual(ctx.exception.code, "RATE_LIMIT_EXCEEDED")
+        self.assertEqual(ctx.exception.status_code, 429)
+
+        result = login_user("ratelimit_user", "Ratelimit_123456", "10.0.0.10")
+        self.assertTrue(result["access_token"])
+
+
+@override_settings(RATE_LIMITS={"public": "2/min"})
+class PublicRateThrottleTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_public_endpoint_returns_429_with_retry_after(self):
+        url = "/api/v1/citas/buscar-empleados/?q=a"
+        for _ in range(2):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response.data["code"], "RATE_LIMIT_EXCEEDED")
+        self.assertIn("Retry-After", response)
@@ -1,12 +1,14 @@
 from datetime import timedelta
 
 from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
 from django.test import TestCase
 from django.utils import timezone
 
 from apps.administracion.models import RelRolPermiso, RelUsuarioOverride, RelUsuarioRol
 from apps.authentication.models import DetUsuario, SyUsuario
 from apps.authentication.repositories.user_repository import UserRepository
+from apps.authentication.services.auth_revision import touch_user_auth_revision
 from apps.catalogos.models import Permisos, Roles
 
 
@@ -90,5 +92,28 @@ class UserRepositoryTests(TestCase):
 
         self.assertNotIn("repo:inactive", payload["permissions"])
 
+    def test_build_auth_user_reuses_cached_principal_for_same_revision(self):
+        cache.clear()
+        first = UserRepository.build_auth_user(self.user)
+
+        fresh_user = UserRepository.get_by_id(self.user.id_usuario)
+        with self.assertNumQueries(0):
+            second = UserRepository.build_auth_user(fresh_user)
+
+        self.assertEqual(second, first)
+
+    def test_touch_auth_revision_invalidates_cached_principal(self):
+        cache.clear()
+        payload = UserRepository.build_auth_user(self.user)
+        self.assertIn("repo:read", payload["permissions"])
+
+        RelRolPermiso.objects.filter(id_rol=self.role).delete()
+        touch_user_auth_revision(self.user)
+
+        fresh_user = UserRepository.get_by_id(self.user.id_usuario)
+        payload = UserRepository.build_auth_user(fresh_user)
+
+        self.assertNotIn("repo:read", payload["permissions"])
+
     def test_det_usuario_str(self):
         self.assertEqual(str(self.detail), "Repo User")
@@ -1,23 +1,30 @@
 from apps.authentication.repositories.user_repository import UserRepository
+from apps.authentication.services.auth_revision import publish_auth_revision
 from apps.authentication.services.errors import AuthServiceError
 from apps.authentication.services.token_service import \
     create_access_refresh_tokens
-from django.core.cache import cache
+from django.conf import settings
 from django.utils import timezone
+from infrastructure.security.rate_limiter import hit, parse_rate, reset
 
 LOGIN_ATTEMPT_TTL = 600
 LOGIN_ATTEMPT_LIMIT = 5
+LOGIN_ATTEMPTS_SCOPE = "login:user"
+LOGIN_IP_SCOPE = "login:ip"
 
 
 def login_user(username, password, ip_address):
     # Autentica usuario y genera tokens.
+    _check_ip_failures(ip_address)
     user = UserRepository.get_by_username(username)
 
     if not user:
+        _register_ip_failure(ip_address)
         raise AuthServiceError("USER_NOT_FOUND", "Usuario no encontrado", 404)
 
     if not UserRepository.verify_password(user, password):
         # Suma intentos fallidos y retorna error.
+        _register_ip_failure(ip_address)
         _increment_attempts(user)
         raise AuthServiceError(
             "INVALID_CREDENTIALS",
@@ -65,15 +72,19 @@ def _increment_attempts(user):
     # Aumenta intentos y aplica rate limit.
     if not user:
         return
-    key = f"login:attempts:{user.usuario}"
-    attempts = cache.get(key, 0) + 1
-    cache.set(key, attempts, LOGIN_ATTEMPT_TTL)
+    attempts = hit(
+        LOGIN_ATTEMPTS_SCOPE,
+        user.usuario,
+        limit=LOGIN_ATTEMPT_LIMIT,
+        window=LOGIN_ATTEMPT_TTL,
+    ).count
 
     if attempts >= LOGIN_ATTEMPT_LIMIT:
         user.est_bloqueado = True
         user.fch_modf = timezone.now()
         user.usr_modf = user
         user.save(update_fields=["est_bloqueado", "fch_modf", "usr_modf"])
+        publish_auth_revision(user)
         raise AuthServiceError(
             "RATE_LIMIT_EXCEEDED",
             "Demasiadas solicitudes, espera un momento",
@@ -82,5 +93,31 @@ def _increment_attempts(user):
 
 
 def _clear_attempts(user):
-    key = f"login:attempts:{user.usuario}"
-    cache.delete(key)
+    reset(LOGIN_ATTEMPTS_SCOPE, user.usuario)
+
+
+def _ip_failure_rate():
+    rate = getattr(settings, "RATE_LIMITS", {}).get("login_ip")
+    return parse_rate(rate) if rate else None
+
+
+def _check_ip_failures(ip_address):
+    # Corta el relleno de credenciales desde una misma IP antes de tocar la BD.
+    rate = _ip_failure_rate()
+    if not rate or not ip_address:
+        return
+    limit, window = rate
+    if not hit(LOGIN_IP_SCOPE, ip_address, limit=limit, window=window, cost=0).allowed:
+        raise AuthServiceError(
+            "RATE_LIMIT_EXCEEDED",
+            "Demasiadas solicitudes, espera un momento",
+            429,
+        )
+
+
+def _register_ip_failure(ip_address):
+    rate = _ip_failure_rate()
+    if not rate or not ip_address:
+        return
+    limit, window = rate
+    hit(LOGIN_IP_SCOPE, ip_address, limit=limit, window=window)
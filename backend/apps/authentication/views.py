@@ -203,7 +203,7 @@ class MeView(APIView):
 
     def get(self, request):
         try:
-            user = authenticate_request(request)
+            user = authenticate_request(request, trust_claims=False)
         except AuthServiceError as exc:
             log_event(
                 request,
@@ -340,7 +340,7 @@ class CompleteOnboardingView(APIView):
 
     def post(self, request):
         try:
-            user = authenticate_request(request)
+            user = authenticate_request(request, trust_claims=False)
         except AuthServiceError as exc:
             return error_response(
                 exc.code,
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:23
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogos', '0003_catcies'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CiesUploadSession',
+            fields=[
+                ('upload_id', models.UUIDField(db_column='id_carga', default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('user_id', models.BigIntegerField(blank=True, db_column='usr_alta', null=True)),
+                ('version', models.CharField(db_column='version', max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('processing', 'Procesando'), ('ready', 'Lista'), ('failed', 'Fallida'), ('confirmed', 'Confirmada')], db_column='estatus', default='pending', max_length=12)),
+                ('progress', models.PositiveSmallIntegerField(db_column='avance', default=0)),
+                ('total_records', models.PositiveIntegerField(db_column='total_registros', default=0)),
+                ('total_errores', models.PositiveIntegerField(db_column='total_errores', default=0)),
+                ('message', models.TextField(blank=True, db_column='mensaje', default='')),
+                ('source', models.BinaryField(blank=True, db_column='archivo', null=True)),
+                ('staged_rows', models.BinaryField(blank=True, db_column='filas_validas', null=True)),
+                ('error_rows', models.BinaryField(blank=True, db_column='filas_error', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_column='fch_alta')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_column='fch_modf')),
+                ('expires_at', models.DateTimeField(db_column='fch_expira', db_index=True)),
+            ],
+            options={
+                'db_table': 'cat_cies_cargas',
+                'managed': True,
+            },
+        ),
+    ]
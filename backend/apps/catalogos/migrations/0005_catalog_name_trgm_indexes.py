@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:40
+
+from django.db import migrations
+
+from infrastructure.search.indexes import trigram_index_operation
+
+# Columna de nombre que filtra ?search= en cada listado de catalogo.
+INDEXES = (
+    ("cat_areas_area_trgm_idx", "cat_areas", "area"),
+    ("cat_autorizadores_autorizador_trgm_idx", "cat_autorizadores", "autorizador"),
+    ("cat_bajas_baja_trgm_idx", "cat_bajas", "baja"),
+    ("cat_calidadlab_calidadlab_trgm_idx", "cat_calidadlab", "calidadlab"),
+    ("cat_centros_atencion_nombre_trgm_idx", "cat_centros_atencion", "nombre"),
+    ("cat_consultorios_consult_trgm_idx", "cat_consultorios", "consult"),
+    ("cat_edocivil_edocivil_trgm_idx", "cat_edocivil", "edocivil"),
+    ("cat_enfermedades_enfermedad_trgm_idx", "cat_enfermedades", "enfermedad"),
+    ("cat_escolaridad_escolaridad_trgm_idx", "cat_escolaridad", "escolaridad"),
+    ("cat_escuelas_escuela_trgm_idx", "cat_escuelas", "escuela"),
+    ("cat_especialidades_especialidad_trgm_idx", "cat_especialidades", "especialidad"),
+    ("cat_estudiosmed_estudiomed_trgm_idx", "cat_estudiosmed", "estudiomed"),
+    ("cat_gpomedic_gpomedic_trgm_idx", "cat_gpomedic", "gpomedic"),
+    ("cat_tplicencia_tplicencia_trgm_idx", "cat_tplicencia", "tplicencia"),
+    ("cat_ocupaciones_ocupacion_trgm_idx", "cat_ocupaciones", "ocupacion"),
+    ("cat_origencons_origencons_trgm_idx", "cat_origencons", "origencons"),
+    ("cat_parentescos_parentesco_trgm_idx", "cat_parentescos", "parentesco"),
+    ("cat_pases_pase_trgm_idx", "cat_pases", "pase"),
+    ("cat_permisos_descripcion_trgm_idx", "cat_permisos", "descripcion"),
+    ("cat_roles_rol_trgm_idx", "cat_roles", "rol"),
+    ("cat_tpcitas_tpcita_trgm_idx", "cat_tpcitas", "tpcita"),
+    ("cat_tpareas_tparea_trgm_idx", "cat_tpareas", "tparea"),
+    ("cat_tpsanguineo_tpsanguineo_trgm_idx", "cat_tpsanguineo", "tpsanguineo"),
+    ("cat_tpautorizacion_tpautorizacion_trgm_idx", "cat_tpautorizacion", "tpautorizacion"),
+    ("cat_turnos_turno_trgm_idx", "cat_turnos", "turno"),
+)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transaccion.
+    atomic = False
+
+    dependencies = [
+        ('catalogos', '0004_cies_upload_session'),
+    ]
+
+    operations = [
+        trigram_index_operation(INDEXES),
+    ]
@@ -6,6 +6,7 @@ from .bajas import Bajas
 from .calidad_laboral import CalidadLaboral
 from .centros_atencion import CatCentroAtencion
 from .cies import CatCies
+from .cies_upload import CiesUploadSession
 from .consultorios import Consultorios
 from .edo_civil import EdoCivil
 from .enfermedades import Enfermedades
@@ -41,6 +42,7 @@ __all__ = [
     "CalidadLaboral",
     "CatCentroAtencion",
     "CatCies",
+    "CiesUploadSession",
     "Consultorios",
     "EdoCivil",
     "Enfermedades",
@@ -0,0 +1,40 @@
+import uuid
+
+from django.db import models
+
+
+class CiesUploadSession(models.Model):
+    """Carga de CIES en preparacion: el Excel validado espera la confirmacion."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pendiente"
+        PROCESSING = "processing", "Procesando"
+        READY = "ready", "Lista"
+        FAILED = "failed", "Fallida"
+        CONFIRMED = "confirmed", "Confirmada"
+
+    upload_id = models.UUIDField(primary_key=True, default=uuid.uuid4, db_column="id_carga")
+    user_id = models.BigIntegerField(db_column="usr_alta", null=True, blank=True)
+    version = models.CharField(max_length=10, db_column="version")
+    status = models.CharField(
+        max_length=12,
+        choices=Status.choices,
+        default=Status.PENDING,
+        db_column="estatus",
+    )
+    progress = models.PositiveSmallIntegerField(default=0, db_column="avance")
+    total_records = models.PositiveIntegerField(default=0, db_column="total_registros")
+    total_errores = models.PositiveIntegerField(default=0, db_column="total_errores")
+    message = models.TextField(blank=True, default="", db_column="mensaje")
+    # Excel original; se descarta al terminar la validacion.
+    source = models.BinaryField(null=True, blank=True, db_column="archivo")
+    # Filas validas y filas con error, en msgpack + zlib.
+    staged_rows = models.BinaryField(null=True, blank=True, db_column="filas_validas")
+    error_rows = models.BinaryField(null=True, blank=True, db_column="filas_error")
+    created_at = models.DateTimeField(auto_now_add=True, db_column="fch_alta")
+    updated_at = models.DateTimeField(auto_now=True, db_column="fch_modf")
+    expires_at = models.DateTimeField(db_index=True, db_column="fch_expira")
+
+    class Meta:
+        db_table = "cat_cies_cargas"
+        managed = True
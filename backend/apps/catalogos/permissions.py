@@ -52,7 +52,7 @@ class HasCatalogPermission(BasePermission):
             )
 
         required_permission = f"{self.catalog}:{self.action}"
-        user_permissions = UserRepository.build_auth_user(user).get("permissions", [])
+        user_permissions = UserRepository.get_authorization(user).get("permissions", [])
 
         if "*" not in user_permissions and required_permission not in user_permissions:
             raise CatalogApiException(
@@ -1,41 +1,112 @@
+from dataclasses import dataclass
+
 from apps.catalogos.models.cies import CatCies
+from django.db.models import Q
 from django.utils import timezone
 
+# Filas por INSERT ... ON CONFLICT; mantiene los parametros por debajo del limite de SQLite.
+UPSERT_CHUNK_SIZE = 2000
+
+
+class CiesMixedVersionsError(ValueError):
+    """Un reemplazo completo (``deactivate_missing``) debe traer una sola version."""
+
+
+@dataclass
+class CiesUpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    deactivated: int = 0
+
+    @property
+    def saved(self) -> int:
+        return self.inserted + self.updated
+
+
+def _normalize(records):
+    # Una fila por clave (la ultima gana), ya en mayusculas.
+    normalized = {}
+    for r in records:
+        code = r["CLAVE"].upper()
+        normalized[code] = (r["DESCRIPCION"].upper(), r["VERSION"].upper())
+    return normalized
+
 
 class CatCiesRepository:
 
     def bulk_upsert(self, records: list[dict], user_id: int) -> int:
+        return self.upsert(records, user_id).saved
+
+    def upsert(self, records: list[dict], user_id: int, *, deactivate_missing: bool = False) -> CiesUpsertResult:
+        """Carga por lotes con INSERT ... ON CONFLICT (clave) DO UPDATE.
+
+        Con ``deactivate_missing`` da de baja, en una sola sentencia, las
+        claves vigentes que no vienen en la carga.
+        """
         now = timezone.now()
-        count = 0
-
-        for r in records:
-            obj, created = CatCies.objects.get_or_create(
-                code=r["CLAVE"].upper(),
-                defaults={
-                    "description": r["DESCRIPCION"].upper(),
-                    "version": r["VERSION"].upper(),
-                    "is_active": True,
-                    "created_by_id": user_id,
-                    "created_at": now,
-                }
-            )
+        rows = _normalize(records)
+        result = CiesUpsertResult()
+        codes = list(rows)
+
+        versions = {version for _, version in rows.values()}
+        if deactivate_missing and len(versions) != 1:
+            raise CiesMixedVersionsError(sorted(versions))
 
-            if not created:
-                obj.description = r["DESCRIPCION"].upper()
-                obj.version = r["VERSION"].upper()
-                obj.is_active = True
-                obj.updated_by_id = user_id
-                obj.updated_at = now
-                obj.save(
-                    update_fields=[
-                        "description",
-                        "version",
-                        "is_active",
-                        "updated_by_id",
-                        "updated_at",
-                    ]
+        for start in range(0, len(codes), UPSERT_CHUNK_SIZE):
+            chunk = codes[start:start + UPSERT_CHUNK_SIZE]
+            existing = set(CatCies.objects.filter(code__in=chunk).values_list("code", flat=True))
+
+            new_objs = [
+                CatCies(
+                    code=code,
+                    description=rows[code][0],
+                    version=rows[code][1],
+                    is_active=True,
+                    created_by_id=user_id,
+                    created_at=now,
+                )
+                for code in chunk
+                if code not in existing
+            ]
+            changed_objs = [
+                CatCies(
+                    code=code,
+                    description=rows[code][0],
+                    version=rows[code][1],
+                    is_active=True,
+                    updated_by_id=user_id,
+                    updated_at=now,
                 )
+                for code in chunk
+                if code in existing
+            ]
 
-            count += 1
+            if new_objs:
+                # Una carga concurrente pudo crear la clave: el conflicto se vuelve update.
+                CatCies.objects.bulk_create(
+                    new_objs,
+                    update_conflicts=True,
+                    unique_fields=["code"],
+                    update_fields=["description", "version", "is_active"],
+                )
+            if changed_objs:
+                CatCies.objects.bulk_create(
+                    changed_objs,
+                    update_conflicts=True,
+                    unique_fields=["code"],
+                    update_fields=["description", "version", "is_active", "updated_by_id", "updated_at"],
+                )
+            result.inserted += len(new_objs)
+            result.updated += len(changed_objs)
+
+        if deactivate_missing:
+            # Por pertenencia a la carga, no por version: una recarga de la misma
+            # version tambien da de baja las claves ausentes. Las insertadas tienen
+            # fch_alta >= now (auto_now_add) y las actualizadas fch_modf = now.
+            result.deactivated = (
+                CatCies.objects.filter(is_active=True)
+                .exclude(Q(created_at__gte=now) | Q(updated_at__gte=now))
+                .update(is_active=False, updated_by_id=user_id, updated_at=now)
+            )
 
-        return count
+        return result
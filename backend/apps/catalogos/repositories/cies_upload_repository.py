@@ -0,0 +1,115 @@
+import zlib
+from datetime import timedelta
+
+import msgpack
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from apps.catalogos.models import CiesUploadSession
+
+
+def _pack(rows) -> bytes:
+    return zlib.compress(msgpack.packb(rows, use_bin_type=True))
+
+
+def _unpack(payload):
+    if not payload:
+        return []
+    return msgpack.unpackb(zlib.decompress(bytes(payload)), raw=False)
+
+
+class CiesUploadRepository:
+
+    def create(self, *, source: bytes, version: str, user_id, ttl_minutes: int) -> CiesUploadSession:
+        return CiesUploadSession.objects.create(
+            source=source,
+            version=version,
+            user_id=user_id,
+            expires_at=timezone.now() + timedelta(minutes=ttl_minutes),
+        )
+
+    def get(self, upload_id, user_id=None):
+        # None si no existe, expiro o pertenece a otro usuario.
+        try:
+            session = (
+                CiesUploadSession.objects.filter(upload_id=upload_id, expires_at__gt=timezone.now())
+                .defer("source", "staged_rows")
+                .first()
+            )
+        except ValidationError:
+            return None
+        if session is None or session.user_id != user_id:
+            return None
+        return session
+
+    def get_for_processing(self, upload_id):
+        return CiesUploadSession.objects.filter(upload_id=upload_id).first()
+
+    def claim_for_processing(self, upload_id) -> bool:
+        # PENDING -> PROCESSING en un UPDATE: solo un proceso valida la carga.
+        return bool(
+            CiesUploadSession.objects.filter(
+                upload_id=upload_id,
+                status=CiesUploadSession.Status.PENDING,
+            ).update(
+                status=CiesUploadSession.Status.PROCESSING,
+                progress=0,
+                updated_at=timezone.now(),
+            )
+        )
+
+    def set_progress(self, upload_id, progress: int, **fields) -> None:
+        CiesUploadSession.objects.filter(upload_id=upload_id).update(
+            progress=progress,
+            updated_at=timezone.now(),
+            **fields,
+        )
+
+    def mark_ready(self, upload_id, *, total_records, valid_rows, error_rows) -> None:
+        self.set_progress(
+            upload_id,
+            100,
+            status=CiesUploadSession.Status.READY,
+            total_records=total_records,
+            total_errores=len(error_rows),
+            staged_rows=_pack(valid_rows),
+            error_rows=_pack(error_rows),
+            source=None,
+        )
+
+    def mark_failed(self, upload_id, message: str) -> None:
+        CiesUploadSession.objects.filter(upload_id=upload_id).update(
+            status=CiesUploadSession.Status.FAILED,
+            message=message[:1000],
+            source=None,
+            updated_at=timezone.now(),
+        )
+
+    def claim_staged_rows(self, upload_id):
+        """Pasa la carga de READY a CONFIRMED y regresa sus filas validas.
+
+        El UPDATE condicionado evita que dos confirmaciones apliquen la misma carga.
+        """
+        claimed = CiesUploadSession.objects.filter(
+            upload_id=upload_id,
+            status=CiesUploadSession.Status.READY,
+            expires_at__gt=timezone.now(),
+        ).update(status=CiesUploadSession.Status.CONFIRMED, updated_at=timezone.now())
+        if not claimed:
+            return None
+        staged = (
+            CiesUploadSession.objects.filter(upload_id=upload_id)
+            .values_list("staged_rows", flat=True)
+            .first()
+        )
+        return _unpack(staged)
+
+    def release_staged_rows(self, upload_id) -> None:
+        CiesUploadSession.objects.filter(upload_id=upload_id).update(staged_rows=None)
+
+    def load_error_rows(self, session: CiesUploadSession) -> list:
+        return _unpack(session.error_rows)
+
+    def purge_expired(self) -> int:
+        deleted, _ = CiesUploadSession.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from apps.authentication.repositories.user_repository import UserRepository
 from datetime import timezone as dt_timezone
+from types import MappingProxyType
 #from apps.catalogos.models import *
 from apps.catalogos.models.cies import CatCies
 
@@ -36,6 +37,77 @@ from .models import (
 )
 
 
+class RefResolver:
+    """Referencias (usuarios y catalogos) de una respuesta, una consulta por tipo.
+
+    Se comparte por ``context["refs"]``; los ids se registran antes de
+    serializar y se cargan juntos en la primera lectura.
+    """
+
+    def __init__(self):
+        self._pending_users = set()
+        self._users = {}
+        self._pending_catalogs = {}
+        self._catalog_names = {}
+
+    def want_users(self, *user_ids):
+        self._pending_users.update(
+            user_id for user_id in user_ids if user_id and user_id not in self._users
+        )
+
+    def want_catalog(self, model, *ref_ids):
+        self._pending_catalogs.setdefault(model, set()).update(
+            ref_id for ref_id in ref_ids if ref_id and (model, ref_id) not in self._catalog_names
+        )
+
+    def user(self, user_id):
+        if user_id not in self._users:
+            self._pending_users.add(user_id)
+            pending, self._pending_users = self._pending_users, set()
+            found = UserRepository.get_by_ids(pending)
+            for pending_id in pending:
+                self._users[pending_id] = found.get(pending_id)
+        return self._users[user_id]
+
+    def catalog_name(self, model, ref_id):
+        key = (model, ref_id)
+        if key not in self._catalog_names:
+            pending = self._pending_catalogs.pop(model, set()) | {ref_id}
+            names = dict(model.objects.filter(pk__in=pending).values_list("pk", "name"))
+            for pending_id in pending:
+                self._catalog_names[(model, pending_id)] = names.get(pending_id, "")
+        return self._catalog_names[key]
+
+
+class RefBatchingListSerializer(serializers.ListSerializer):
+    """Registra las referencias de toda la pagina antes de serializar cada fila."""
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, "all") else data)
+        refs = self._context.setdefault("refs", RefResolver())
+        for item in items:
+            self.child.want_refs(refs, item)
+        return [self.child.to_representation(item) for item in items]
+
+
+class RefResolverMixin:
+    # Atributos con ids de usuario y {atributo: modelo} de catalogos referenciados.
+    ref_user_fields = ("created_by_id", "updated_by_id")
+    ref_catalog_fields = MappingProxyType({})
+
+    def want_refs(self, refs, instance):
+        refs.want_users(*(getattr(instance, field, None) for field in self.ref_user_fields))
+        for field, model in self.ref_catalog_fields.items():
+            refs.want_catalog(model, getattr(instance, field, None))
+
+    def to_representation(self, instance):
+        if self.root is self and "refs" not in self._context:
+            # Detalle de un solo registro: tambien una consulta por tipo.
+            refs = self._context["refs"] = RefResolver()
+            self.want_refs(refs, instance)
+        return super().to_representation(instance)
+
+
 class CatalogListSerializer(serializers.ModelSerializer):
     isActive = serializers.BooleanField(source="is_active")
 
@@ -44,7 +116,7 @@ class CatalogListSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "isActive")
 
 
-class CatalogDetailSerializer(serializers.ModelSerializer):
+class CatalogDetailSerializer(RefResolverMixin, serializers.ModelSerializer):
     isActive = serializers.BooleanField(source="is_active")
     createdAt = serializers.DateTimeField(source="created_at", format="%Y-%m-%dT%H:%M:%SZ")
     createdBy = serializers.SerializerMethodField()
@@ -53,6 +125,7 @@ class CatalogDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         abstract = True
+        list_serializer_class = RefBatchingListSerializer
         fields = (
             "id",
             "name",
@@ -66,7 +139,8 @@ class CatalogDetailSerializer(serializers.ModelSerializer):
     def _build_user_ref(self, user_id):
         if not user_id:
             return None
-        user = UserRepository.get_by_id(user_id)
+        refs = self.context.get("refs")
+        user = refs.user(user_id) if refs is not None else UserRepository.get_by_id(user_id)
         if not user:
             return {"id": user_id, "name": ""}
         # Case 1: repository returns DetUsuarios
@@ -177,9 +251,18 @@ class AutorizadoresDetailSerializer(CatalogDetailSerializer):
     user = serializers.SerializerMethodField()
     fileNumber = serializers.CharField(source="file_number", allow_null=True, required=False, allow_blank=True)
 
+    ref_user_fields = ("created_by_id", "updated_by_id", "user_id")
+    ref_catalog_fields = MappingProxyType({
+        "center_id": CatCentroAtencion,
+        "authorization_type_id": TpAutorizacion,
+    })
+
     def _build_catalog_ref(self, ref_id, queryset):
         if not ref_id:
             return None
+        refs = self.context.get("refs")
+        if refs is not None and hasattr(queryset, "model"):
+            return {"id": ref_id, "name": refs.catalog_name(queryset.model, ref_id)}
         item = queryset.filter(pk=ref_id).only("id", "name").first()
         return {"id": ref_id, "name": item.name if item else ""}
 
@@ -455,7 +538,7 @@ class PermisosListSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "code", "isActive", "isSystem")
 
 
-class PermisosDetailSerializer(serializers.ModelSerializer):
+class PermisosDetailSerializer(RefResolverMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(source="id_permiso")
     name = serializers.CharField(source="descripcion")
     code = serializers.CharField(source="codigo")
@@ -469,6 +552,7 @@ class PermisosDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Permisos
+        list_serializer_class = RefBatchingListSerializer
         fields = (
             "id",
             "name",
@@ -514,7 +598,7 @@ class RolesListSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "description", "isActive", "isSystem", "landingRoute")
 
 
-class RolesDetailSerializer(serializers.ModelSerializer):
+class RolesDetailSerializer(RefResolverMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(source="id_rol")
     name = serializers.CharField(source="rol")
     description = serializers.CharField(source="desc_rol")
@@ -529,6 +613,7 @@ class RolesDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Roles
+        list_serializer_class = RefBatchingListSerializer
         fields = (
             "id",
             "name",
@@ -1,72 +1,240 @@
-import re
+import logging
+from collections import Counter
+from datetime import timedelta
+from io import BytesIO
 
+import openpyxl
 import pandas as pd
+from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 
 #from apps.catalogos.models import CatCies
-from apps.catalogos.repositories.cat_cies_repository import CatCiesRepository
+from apps.catalogos.models import CiesUploadSession
+from apps.catalogos.repositories.cat_cies_repository import CatCiesRepository, CiesUpsertResult
+from apps.catalogos.repositories.cies_upload_repository import CiesUploadRepository
+from apps.catalogos.services.catalog_version_service import bump_catalog_version
+
+logger = logging.getLogger(__name__)
+
+CIES_CATALOG = "cies"
+# Filas por bloque al leer el Excel: acota el DataFrame en memoria.
+PREVIEW_CHUNK_ROWS = 5000
+
+
+def _upload_ttl_minutes() -> int:
+    return int(getattr(settings, "CIES_UPLOAD_TTL_MINUTES", 30))
+
+
+def _estimate_rows(file):
+    # Dimension declarada en el libro; puede faltar o venir inflada.
+    file.seek(0)
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        max_row = workbook.worksheets[0].max_row
+    finally:
+        workbook.close()
+    return max(max_row - 1, 1) if max_row else None
+
+
+def _iter_excel_chunks(file, size=PREVIEW_CHUNK_ROWS):
+    # openpyxl en modo read-only: lee fila por fila sin cargar el libro completo.
+    file.seek(0)
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        chunk = []
+        for row_number, values in enumerate(
+            sheet.iter_rows(min_row=2, max_col=2, values_only=True), start=2
+        ):
+            clave, descripcion = (tuple(values) + (None, None))[:2]
+            if clave is None and descripcion is None:
+                continue
+            chunk.append((row_number, clave, descripcion))
+            if len(chunk) >= size:
+                yield _clean_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield _clean_chunk(chunk)
+    finally:
+        workbook.close()
+
+
+def _clean_text(series):
+    return (
+        series.fillna("")
+        .astype(str)
+        .str.strip()
+        .str.replace(r"\s+", " ", regex=True)
+    )
+
+
+def _clean_chunk(chunk):
+    df = pd.DataFrame(chunk, columns=["FILA", "CLAVE", "DESCRIPCION"])
+    df["CLAVE"] = _clean_text(df["CLAVE"])
+    df["DESCRIPCION"] = _clean_text(df["DESCRIPCION"])
+    return df
 
 
 class CatCiesService:
 
     def __init__(self):
         self.repository = CatCiesRepository()
+        self.uploads = CiesUploadRepository()
 
-    def process_excel(self, file, version: str, ) -> dict:
+    def validate_excel(self, file, version: str, on_progress=None):
         """
-        Lee el Excel, valida las filas y devuelve el resultado
-        con errores por fila. NO guarda nada en base de datos.
+        Valida el Excel por bloques. Regresa ``(total, filas_error, filas_validas)``;
+        las validas como pares ``[clave, descripcion]``.
         """
-        df = pd.read_excel(file, usecols=[0, 1])
-        df.columns = ["CLAVE", "DESCRIPCION"]
-
-        # Limpieza
-        df["CLAVE"] = (
-            df["CLAVE"]
-            .astype(str)
-            .str.strip()
-            .apply(lambda x: re.sub(r"\s+", " ", str(x)))
+        estimated = _estimate_rows(file)
+
+        # Pasada 1: ocurrencias de clave y descripcion para detectar duplicados.
+        clave_counts = Counter()
+        desc_counts = Counter()
+        seen = 0
+        for df in _iter_excel_chunks(file):
+            clave_counts.update(df.loc[df["CLAVE"] != "", "CLAVE"].value_counts().to_dict())
+            desc_counts.update(df.loc[df["DESCRIPCION"] != "", "DESCRIPCION"].value_counts().to_dict())
+            seen += len(df)
+            if on_progress and estimated:
+                on_progress(min(seen * 50 // estimated, 49))
+
+        # Pasada 2: validaciones vectorizadas por bloque.
+        total_records = 0
+        error_rows = []
+        valid_rows = []
+        for df in _iter_excel_chunks(file):
+            total_records += len(df)
+            df["VERSION"] = version
+            df["ERROR"] = ""
+
+            # ── Validaciones ──────────────────────────────────────
+            clave_len = df["CLAVE"].str.len()
+            desc_len = df["DESCRIPCION"].str.len()
+            df.loc[clave_len == 0, "ERROR"] += "Clave vacía. "
+            df.loc[clave_len > 8, "ERROR"] += "Clave demasiado larga. Máximo 8 caracteres. "
+            df.loc[(clave_len > 0) & (df["CLAVE"].map(clave_counts) > 1), "ERROR"] += "Clave duplicada. "
+            df.loc[desc_len == 0, "ERROR"] += "Descripción vacía. "
+            df.loc[desc_len > 400, "ERROR"] += "Descripción demasiado larga. Máximo 400 caracteres. "
+            df.loc[(desc_len > 0) & (df["DESCRIPCION"].map(desc_counts) > 1), "ERROR"] += "Descripción duplicada. "
+            # ──────────────────────────────────────────────────────
+
+            has_error = df["ERROR"] != ""
+            error_rows.extend(df[has_error].to_dict(orient="records"))
+            valid_rows.extend(df.loc[~has_error, ["CLAVE", "DESCRIPCION"]].values.tolist())
+            if on_progress and seen:
+                on_progress(50 + min(total_records * 50 // seen, 49))
+
+        return total_records, error_rows, valid_rows
+
+    # ── Cargas en preparacion ─────────────────────────────────
+
+    def create_upload(self, file, version: str, user_id=None) -> CiesUploadSession:
+        """Guarda el Excel para validarlo despues (en linea o en segundo plano)."""
+        file.seek(0)
+        return self.uploads.create(
+            source=file.read(),
+            version=version,
+            user_id=user_id,
+            ttl_minutes=_upload_ttl_minutes(),
         )
-        df["DESCRIPCION"] = (
-            df["DESCRIPCION"]
-            .astype(str)
-            .str.strip()
-            .apply(lambda x: re.sub(r"\s+", " ", str(x)))
-        )
-
-        df["VERSION"] = version
-        df["ERROR"] = ""
-
-        # ── Validaciones ──────────────────────────────────────
-        df.loc[df["CLAVE"] == "", "ERROR"] += "Clave vacía. "
-        df.loc[df["CLAVE"].str.len() > 8, "ERROR"] += "Clave demasiado larga. Máximo 8 caracteres. "
 
-        dup_clave = df[df["CLAVE"] != ""].duplicated(subset=["CLAVE"], keep=False)
-        df.loc[dup_clave, "ERROR"] += "Clave duplicada. "
-
-        df.loc[df["DESCRIPCION"] == "", "ERROR"] += "Descripción vacía. "
-        df.loc[df["DESCRIPCION"].str.len() > 400, "ERROR"] += "Descripción demasiado larga. Máximo 400 caracteres. "
+    def run_upload(self, upload_id) -> None:
+        if not self.uploads.claim_for_processing(upload_id):
+            return
+        session = self.uploads.get_for_processing(upload_id)
+        if session is None:
+            return
+        try:
+            total_records, error_rows, valid_rows = self.validate_excel(
+                BytesIO(bytes(session.source)),
+                session.version,
+                on_progress=lambda progress: self.uploads.set_progress(upload_id, progress),
+            )
+        except Exception as exc:
+            logger.exception("No se pudo validar la carga de CIES %s", upload_id)
+            self.uploads.mark_failed(upload_id, str(exc) or exc.__class__.__name__)
+            return
+
+        self.uploads.mark_ready(
+            upload_id,
+            total_records=total_records,
+            valid_rows=valid_rows,
+            error_rows=error_rows,
+        )
 
-        dup_desc = df[df["DESCRIPCION"] != ""].duplicated(subset=["DESCRIPCION"], keep=False)
-        df.loc[dup_desc, "ERROR"] += "Descripción duplicada. "
-        # ──────────────────────────────────────────────────────
+    def process_excel(self, file, version: str, user_id=None) -> dict:
+        """
+        Valida el Excel en linea y devuelve solo las filas con error y los
+        totales. Las filas validas quedan en la carga ``uploadId`` para el
+        paso de confirmacion. NO guarda nada en el catalogo.
+        """
+        session = self.create_upload(file, version, user_id)
+        self.run_upload(session.upload_id)
+        return self.upload_status(session.upload_id, user_id)
+
+    def run_stalled_upload(self, upload_id, user_id=None, *, pending_seconds: int) -> None:
+        """Valida en linea una carga que ningun worker tomo en ``pending_seconds``."""
+        session = self.load_upload(upload_id, user_id)
+        if session is None or session.status != CiesUploadSession.Status.PENDING:
+            return
+        if session.created_at > timezone.now() - timedelta(seconds=pending_seconds):
+            return
+        logger.warning("Carga de CIES %s sin procesar tras %ss; se valida en linea", upload_id, pending_seconds)
+        self.run_upload(session.upload_id)
+
+    def load_upload(self, upload_id, user_id=None):
+        # None si la carga expiro o pertenece a otro usuario.
+        return self.uploads.get(upload_id, user_id) if upload_id else None
+
+    def upload_status(self, upload_id, user_id=None):
+        session = self.load_upload(upload_id, user_id)
+        if session is None:
+            return None
+
+        payload = {
+            "uploadId": session.upload_id.hex,
+            "status": session.status,
+            "progress": session.progress,
+            "total_records": session.total_records,
+            "total_errores": session.total_errores,
+            "rows": [],
+        }
+        if session.status == CiesUploadSession.Status.READY:
+            payload["rows"] = self.uploads.load_error_rows(session)
+        elif session.status == CiesUploadSession.Status.FAILED:
+            payload["message"] = session.message
+        return payload
 
-        total_errores = int((df["ERROR"] != "").sum())
+    @transaction.atomic
+    def confirm_upload(self, session: CiesUploadSession, user_id: int, *, deactivate_missing: bool = False):
+        # None si otra confirmacion ya tomo la carga; si el guardado falla, la carga sigue lista.
+        staged = self.uploads.claim_staged_rows(session.upload_id)
+        if staged is None:
+            return None
+        rows = [
+            {"CLAVE": clave, "DESCRIPCION": descripcion, "VERSION": session.version}
+            for clave, descripcion in staged
+        ]
+        result = self.save_valid_rows(rows, user_id, deactivate_missing=deactivate_missing)
+        self.uploads.release_staged_rows(session.upload_id)
+        return result
 
-        return {
-            "total_records": len(df),
-            "total_errores": total_errores,
-            "rows": df.to_dict(orient="records"),
-        }
+    def purge_expired_uploads(self) -> int:
+        return self.uploads.purge_expired()
 
     @transaction.atomic
-    def save_valid_rows(self, rows: list, user_id: int) -> int:
+    def save_valid_rows(self, rows: list, user_id: int, *, deactivate_missing: bool = False) -> CiesUpsertResult:
         valid_rows = [
             r for r in rows
             if r.get("ERROR", "").strip() == ""
         ]
 
         if not valid_rows:
-            return 0
+            return CiesUpsertResult()
 
-        return self.repository.bulk_upsert(valid_rows, user_id)
\ No newline at end of file
+        result = self.repository.upsert(valid_rows, user_id, deactivate_missing=deactivate_missing)
+        # Tras el commit: otro worker no debe recargar el indice antes de ver las filas.
+        transaction.on_commit(lambda: bump_catalog_version(CIES_CATALOG))
+        return result
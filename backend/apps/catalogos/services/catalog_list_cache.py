@@ -0,0 +1,73 @@
+"""Cache de paginas de catalogos ligado a su version.
+
+La llave incluye la version del catalogo: cada alta, edicion o baja la
+incrementa, asi que las paginas viejas dejan de leerse sin borrarlas. La
+misma version da el ETag para responder 304 sin tocar la base de datos.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+
+from infrastructure.cache.redis_manager import get_namespace
+
+from .catalog_version_service import get_catalog_version
+
+CATALOG_PAGES_NAMESPACE = "catalog:pages"
+
+
+def list_cache_enabled() -> bool:
+    return bool(getattr(settings, "CATALOG_LIST_CACHE", False))
+
+
+def _pages():
+    return get_namespace(
+        CATALOG_PAGES_NAMESPACE,
+        ttl=getattr(settings, "CATALOG_LIST_CACHE_TTL", 3600),
+        l1_max_entries=512,
+        l1_ttl=60,
+    )
+
+
+def _params_digest(params) -> str:
+    normalized = json.dumps(sorted(params.items()), separators=(",", ":"))
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+class CatalogPage:
+    """Pagina de un catalogo en una version concreta."""
+
+    def __init__(self, catalog, params):
+        self.catalog = catalog
+        self.version = get_catalog_version(catalog) if list_cache_enabled() else 0
+        self.digest = _params_digest(params)
+
+    @property
+    def cacheable(self) -> bool:
+        # Version 0 = cache apagado o contador ilegible; no se arriesga una pagina vieja.
+        return bool(self.version)
+
+    @property
+    def etag(self) -> str:
+        return f'W/"{self.catalog}-{self.version}-{self.digest}"'
+
+    def not_modified(self, request) -> bool:
+        header = request.headers.get("If-None-Match")
+        if not header or not self.cacheable:
+            return False
+        candidates = {value.strip() for value in header.split(",")}
+        return "*" in candidates or self.etag in candidates or self.etag[2:] in candidates
+
+    def get_or_build(self, builder):
+        if not self.cacheable:
+            return builder()
+        key = f"{self.catalog}:{self.version}:{self.digest}"
+        return _pages().get_or_set(key, builder)
+
+
+def cached_bundle_items(catalog, version, builder):
+    """Registros activos de un catalogo para el bundle, cacheados por version."""
+    if not version or not list_cache_enabled():
+        return builder()
+    return _pages().get_or_set(f"{catalog}:{version}:bundle", builder)
@@ -0,0 +1,64 @@
+import logging
+import time
+
+from django.core.cache import cache
+
+from infrastructure.cache.invalidation import publish_invalidation
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_PREFIX = "catalog:version"
+
+
+def _version_key(catalog: str) -> str:
+    return f"{CATALOG_VERSION_PREFIX}:{catalog}"
+
+
+def _initial_version() -> int:
+    # Semilla basada en tiempo: un flush de cache nunca repite una version vista.
+    return int(time.time() * 1000)
+
+
+def get_catalog_version(catalog: str) -> int:
+    if not catalog:
+        return 0
+    key = _version_key(catalog)
+    try:
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, _initial_version(), None)
+            version = cache.get(key)
+    except Exception:
+        logger.warning("No se pudo leer la version del catalogo %s", catalog, exc_info=True)
+        return 0
+    return int(version or 0)
+
+
+def catalog_namespace(catalog: str) -> str:
+    # Espacio de nombres del bus de invalidacion para copias locales del catalogo.
+    return f"catalog:{catalog}"
+
+
+def bump_catalog_version(catalog: str) -> int:
+    if not catalog:
+        return 0
+    version = _increment_version(catalog)
+    publish_invalidation(catalog_namespace(catalog), version)
+    return version
+
+
+def _increment_version(catalog: str) -> int:
+    key = _version_key(catalog)
+    try:
+        return int(cache.incr(key))
+    except ValueError:
+        # La llave no existe todavia: se inicializa y se incrementa.
+        cache.add(key, _initial_version(), None)
+        try:
+            return int(cache.incr(key))
+        except Exception:
+            logger.warning("No se pudo incrementar la version del catalogo %s", catalog, exc_info=True)
+            return 0
+    except Exception:
+        logger.warning("No se pudo incrementar la version del catalogo %s", catalog, exc_info=True)
+        return 0
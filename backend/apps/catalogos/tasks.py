@@ -0,0 +1,37 @@
+"""
+apps/catalogos/tasks.py
+=======================
+Tareas Celery del módulo de catálogos.
+"""
+
+import logging
+
+from celery import shared_task
+
+from .services.cat_cies_service import CatCiesService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def procesar_carga_cies(upload_id):
+    """
+    Bajo demanda.
+
+    Valida el Excel de una carga de CIES y deja sus filas listas para
+    confirmar; el avance se consulta en cies/upload/<uploadId>/.
+    """
+    CatCiesService().run_upload(upload_id)
+    return {"uploadId": str(upload_id)}
+
+
+@shared_task
+def purgar_cargas_cies():
+    """
+    Cada hora.
+
+    Elimina las cargas de CIES vencidas (confirmadas o no).
+    """
+    deleted = CatCiesService().purge_expired_uploads()
+    logger.info("Cargas de CIES vencidas eliminadas: %s", deleted)
+    return {"deleted": deleted}
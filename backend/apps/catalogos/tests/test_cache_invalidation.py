@@ -0,0 +1,79 @@
+import json
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.authentication.services import permission_index
+from apps.catalogos.services.catalog_version_service import bump_catalog_version
+from infrastructure.cache import invalidation, warmup
+from infrastructure.cache.invalidation import (
+    dispatch_invalidation,
+    handle_message,
+    publish_invalidation,
+    register_invalidation_handler,
+)
+from infrastructure.cache.redis_manager import get_namespace
+from infrastructure.cache.warmup import register_warmup, run_warmups
+
+
+class InvalidationBusTests(TestCase):
+    def test_publish_applies_locally_on_commit(self):
+        handler = Mock()
+        register_invalidation_handler("test:bus", handler)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_invalidation("test:bus", 7)
+            handler.assert_not_called()
+
+        handler.assert_called_once_with(7)
+
+    def test_bump_catalog_version_publishes_namespace(self):
+        handler = Mock()
+        register_invalidation_handler("catalog:test_bus", handler)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            version = bump_catalog_version("test_bus")
+
+        handler.assert_called_once_with(version)
+
+    def test_permission_index_reset_on_permisos_invalidation(self):
+        with patch.object(permission_index, "_index", object()):
+            dispatch_invalidation("catalog:permisos", 1)
+            self.assertIsNone(permission_index._index)
+
+
+class InvalidationMessageTests(SimpleTestCase):
+    def test_remote_message_dispatches_and_clears_l1(self):
+        namespace = get_namespace("test:remote", l1_max_entries=10)
+        namespace.set("k", "v")
+        handler = Mock()
+        register_invalidation_handler("test:remote", handler)
+
+        handle_message(json.dumps({"namespace": "test:remote", "version": 3, "origin": "otro"}))
+
+        handler.assert_called_once_with(3)
+        self.assertEqual(len(namespace.l1), 0)
+
+    def test_own_and_invalid_messages_are_ignored(self):
+        handler = Mock()
+        register_invalidation_handler("test:own", handler)
+
+        handle_message(json.dumps({"namespace": "test:own", "origin": invalidation._origin}))
+        handle_message("no es json")
+
+        handler.assert_not_called()
+
+    def test_failing_warmup_does_not_stop_others(self):
+        # Registro aislado: no deja warmups de prueba ni corre los reales.
+        registry = patch.dict(warmup._warmups, clear=True)
+        registry.start()
+        self.addCleanup(registry.stop)
+        ok = Mock()
+        register_warmup("test:falla", Mock(side_effect=RuntimeError("sin bd")))
+        register_warmup("test:ok", ok)
+
+        results = run_warmups()
+
+        self.assertFalse(results["test:falla"])
+        self.assertTrue(results["test:ok"])
+        ok.assert_called_once_with()
@@ -1,7 +1,7 @@
 from django.test import TestCase
 
 from apps.catalogos.models import CatCies
-from apps.catalogos.repositories.cat_cies_repository import CatCiesRepository
+from apps.catalogos.repositories.cat_cies_repository import CatCiesRepository, CiesMixedVersionsError
 
 
 class CatCiesRepositoryTests(TestCase):
@@ -61,3 +61,53 @@ class CatCiesRepositoryTests(TestCase):
         self.assertEqual(updated.version, "CIE-10")
         self.assertTrue(updated.is_active)
         self.assertEqual(updated.updated_by_id, 99)
+
+    def test_upsert_reports_counts_and_deactivates_missing_codes(self):
+        CatCies.objects.create(code="A001", description="VIEJA", version="CIE-9", created_by_id=5)
+        CatCies.objects.create(code="Z999", description="RETIRADA", version="CIE-9", created_by_id=5)
+
+        result = self.repository.upsert(
+            [
+                {"CLAVE": "a001", "DESCRIPCION": "fiebre viral", "VERSION": "cie-10"},
+                {"CLAVE": "b002", "DESCRIPCION": "gripe estacional", "VERSION": "cie-10"},
+            ],
+            user_id=7,
+            deactivate_missing=True,
+        )
+
+        self.assertEqual((result.inserted, result.updated, result.deactivated), (1, 1, 1))
+        self.assertFalse(CatCies.objects.get(code="Z999").is_active)
+        self.assertEqual(CatCies.objects.get(code="A001").description, "FIEBRE VIRAL")
+        self.assertEqual(CatCies.objects.get(code="B002").created_by_id, 7)
+
+    def test_same_version_reload_deactivates_codes_missing_from_the_load(self):
+        CatCies.objects.create(code="A001", description="FIEBRE VIRAL", version="CIE-10", created_by_id=5)
+        CatCies.objects.create(code="Z999", description="RETIRADA", version="CIE-10", created_by_id=5)
+
+        result = self.repository.upsert(
+            [{"CLAVE": "a001", "DESCRIPCION": "fiebre viral", "VERSION": "cie-10"}],
+            user_id=7,
+            deactivate_missing=True,
+        )
+
+        self.assertEqual((result.inserted, result.updated, result.deactivated), (0, 1, 1))
+        self.assertTrue(CatCies.objects.get(code="A001").is_active)
+        retired = CatCies.objects.get(code="Z999")
+        self.assertFalse(retired.is_active)
+        self.assertEqual(retired.updated_by_id, 7)
+
+    def test_deactivate_missing_rejects_mixed_versions(self):
+        CatCies.objects.create(code="Z999", description="VIGENTE", version="CIE-10", created_by_id=5)
+
+        with self.assertRaises(CiesMixedVersionsError):
+            self.repository.upsert(
+                [
+                    {"CLAVE": "a001", "DESCRIPCION": "fiebre viral", "VERSION": "cie-10"},
+                    {"CLAVE": "b002", "DESCRIPCION": "gripe estacional", "VERSION": "cie-11"},
+                ],
+                user_id=7,
+                deactivate_missing=True,
+            )
+
+        self.assertFalse(CatCies.objects.filter(code__in=["A001", "B002"]).exists())
+        self.assertTrue(CatCies.objects.get(code="Z999").is_active)
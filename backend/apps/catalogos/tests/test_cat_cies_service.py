@@ -0,0 +1,127 @@
+from datetime import timedelta
+from io import BytesIO
+from unittest.mock import patch
+from uuid import UUID
+
+import openpyxl
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.catalogos.models import CatCies, CiesUploadSession
+from apps.catalogos.services.cat_cies_service import CatCiesService
+from apps.catalogos.uses_case.confirm_cies_use_case import (
+    CiesUploadNotFound,
+    CiesUploadNotReady,
+    ConfirmCiesUseCase,
+)
+from apps.catalogos.uses_case.upload_cies_use_case import PreviewCiesUseCase
+
+
+def _xlsx(rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["CLAVE", "DESCRIPCION"])
+    for row in rows:
+        sheet.append(list(row))
+    buffer = BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+class CatCiesServiceExcelTests(TestCase):
+    def setUp(self):
+        self.service = CatCiesService()
+
+    def test_process_excel_returns_only_error_rows(self):
+        file = _xlsx(
+            [
+                ("A001", "Fiebre   viral"),
+                ("A001", "Otra descripcion"),
+                ("", "Sin clave"),
+                ("B0020000X", "Clave larga"),
+                (None, None),
+                ("C003", "Gripe"),
+            ]
+        )
+
+        result = self.service.process_excel(file, "CIE-10", user_id=7)
+
+        self.assertEqual(result["total_records"], 5)
+        self.assertEqual(result["total_errores"], 4)
+        errors = {row["FILA"]: row["ERROR"] for row in result["rows"]}
+        self.assertEqual(errors[2], "Clave duplicada. ")
+        self.assertEqual(errors[3], "Clave duplicada. ")
+        self.assertEqual(errors[4], "Clave vacía. ")
+        self.assertIn("Clave demasiado larga", errors[5])
+
+        self.assertEqual(result["status"], "ready")
+        self.assertEqual(result["progress"], 100)
+        session = CiesUploadSession.objects.get(upload_id=result["uploadId"])
+        self.assertIsNone(session.source)
+        self.assertIsNone(self.service.load_upload(result["uploadId"], 8))
+
+    def test_confirm_by_upload_id_saves_staged_rows_once(self):
+        file = _xlsx([("A001", "Fiebre   viral"), ("B002", "")])
+        preview = self.service.process_excel(file, "cie-10", user_id=7)
+
+        result = ConfirmCiesUseCase().execute(user_id=7, upload_id=preview["uploadId"])
+
+        self.assertEqual(result["inserted"], 1)
+        self.assertEqual(result["total_records"], 2)
+        self.assertEqual(result["total_errores"], 1)
+        self.assertEqual(CatCies.objects.get(code="A001").description, "FIEBRE VIRAL")
+        with self.assertRaises(CiesUploadNotFound):
+            ConfirmCiesUseCase().execute(user_id=7, upload_id=preview["uploadId"])
+
+    @override_settings(CIES_UPLOAD_ASYNC=True, CIES_UPLOAD_ASYNC_MIN_BYTES=0)
+    def test_large_upload_is_queued_and_reports_progress(self):
+        file = SimpleUploadedFile("cies.xlsx", _xlsx([("A001", "Fiebre")]).getvalue())
+
+        with patch("apps.catalogos.tasks.procesar_carga_cies.apply_async") as apply_async:
+            pending = PreviewCiesUseCase().execute(file, "CIE-10", user_id=7)
+
+        apply_async.assert_called_once_with(args=[str(UUID(pending["uploadId"]))], retry=False)
+        self.assertEqual(pending["status"], "pending")
+        with self.assertRaises(CiesUploadNotReady):
+            ConfirmCiesUseCase().execute(user_id=7, upload_id=pending["uploadId"])
+
+        # El worker procesa la carga; el cliente consulta el avance.
+        self.service.run_upload(pending["uploadId"])
+        ready = PreviewCiesUseCase().status(pending["uploadId"], user_id=7)
+
+        self.assertEqual(ready["status"], "ready")
+        self.assertEqual(ready["total_records"], 1)
+        self.assertEqual(ready["rows"], [])
+        result = ConfirmCiesUseCase().execute(user_id=7, upload_id=pending["uploadId"])
+        self.assertEqual(result["inserted"], 1)
+
+    @override_settings(CIES_UPLOAD_ASYNC=True, CIES_UPLOAD_ASYNC_MIN_BYTES=0, CIES_UPLOAD_PENDING_TIMEOUT_SECONDS=60)
+    def test_upload_no_worker_picked_up_is_validated_inline_on_status(self):
+        file = SimpleUploadedFile("cies.xlsx", _xlsx([("A001", "Fiebre")]).getvalue())
+        with patch("apps.catalogos.tasks.procesar_carga_cies.apply_async"):
+            pending = PreviewCiesUseCase().execute(file, "CIE-10", user_id=7)
+
+        self.assertEqual(PreviewCiesUseCase().status(pending["uploadId"], user_id=7)["status"], "pending")
+
+        CiesUploadSession.objects.update(created_at=timezone.now() - timedelta(seconds=61))
+        ready = PreviewCiesUseCase().status(pending["uploadId"], user_id=7)
+
+        self.assertEqual(ready["status"], "ready")
+        self.assertEqual(ready["total_records"], 1)
+
+    def test_new_upload_purges_expired_ones(self):
+        expired = self.service.process_excel(_xlsx([("A001", "Fiebre")]), "CIE-10", user_id=7)
+        CiesUploadSession.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        PreviewCiesUseCase().execute(_xlsx([("B002", "Gripe")]), "CIE-10", user_id=7)
+
+        self.assertFalse(CiesUploadSession.objects.filter(upload_id=UUID(expired["uploadId"])).exists())
+
+    def test_purge_removes_expired_uploads(self):
+        preview = self.service.process_excel(_xlsx([("A001", "Fiebre")]), "CIE-10", user_id=7)
+        CiesUploadSession.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        self.assertEqual(self.service.purge_expired_uploads(), 1)
+        self.assertIsNone(self.service.upload_status(preview["uploadId"], 7))
@@ -1,5 +1,7 @@
 from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
 from django.db import connection
+from django.test import override_settings
 from rest_framework import status
 from rest_framework.test import APITestCase
 
@@ -379,3 +381,70 @@ class CatalogosContractTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
         self.assertEqual(response.data["code"], "AREAS_EXISTS")
+
+    @override_settings(CATALOG_LIST_CACHE=True)
+    def test_care_centers_list_is_cached_per_version_with_etag(self):
+        cache.clear()
+        first = self.client.get("/api/v1/care-centers")
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        etag = first["ETag"]
+
+        not_modified = self.client.get("/api/v1/care-centers", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified["ETag"], etag)
+
+        # Una escritura fuera de la API no cambia la version: se sirve la pagina cacheada.
+        CatCentroAtencion.objects.create(
+            name="Centro Fuera De Api",
+            code="CC-900",
+            is_external=False,
+            address="Calle 9",
+            schedule={},
+            is_active=True,
+        )
+        cached = self.client.get("/api/v1/care-centers")
+        self.assertEqual(cached.data["total"], first.data["total"])
+
+        created = self.client.post(
+            "/api/v1/care-centers",
+            {
+                "name": "Centro Sur",
+                "code": "CC-003",
+                "isExternal": False,
+                "address": "Calle Sur 1",
+                "schedule": {},
+                "isActive": True,
+            },
+            format="json",
+            HTTP_X_CSRF_TOKEN=self.csrf_token,
+        )
+        self.assertEqual(created.status_code, status.HTTP_201_CREATED)
+
+        refreshed = self.client.get("/api/v1/care-centers", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(refreshed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(refreshed["ETag"], etag)
+        self.assertEqual(refreshed.data["total"], first.data["total"] + 2)
+
+    def test_catalog_bundle_returns_only_changed_catalogs(self):
+        response = self.client.get("/api/v1/catalogs/bundle?catalogs=care-centers,areas")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data["catalogs"]), {"care-centers", "areas"})
+        self.assertEqual(response.data["catalogs"]["areas"][0]["name"], "Urgencias")
+        versions = response.data["versions"]
+
+        known = ",".join(f"{name}:{version}" for name, version in versions.items())
+        cached = self.client.get(f"/api/v1/catalogs/bundle?catalogs=care-centers,areas&known={known}")
+        self.assertEqual(cached.data["catalogs"], {})
+        self.assertEqual(sorted(cached.data["unchanged"]), ["areas", "care-centers"])
+
+        self.client.delete(f"/api/v1/care-centers/{self.center.id}", HTTP_X_CSRF_TOKEN=self.csrf_token)
+        changed = self.client.get(f"/api/v1/catalogs/bundle?catalogs=care-centers,areas&known={known}")
+        self.assertEqual(changed.data["catalogs"], {"care-centers": []})
+        self.assertEqual(changed.data["unchanged"], ["areas"])
+
+    def test_catalog_bundle_rejects_unknown_catalog(self):
+        response = self.client.get("/api/v1/catalogs/bundle?catalogs=care-centers,nope")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["code"], "VALIDATION_ERROR")
@@ -1,11 +1,14 @@
 from unittest.mock import patch
 
 from django.contrib.auth.hashers import make_password
+from django.db import connection
 from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 
-from apps.authentication.models import SyUsuario
-from apps.catalogos.models import Permisos, Roles
+from apps.authentication.models import DetUsuario, SyUsuario
+from apps.catalogos.models import CatCentroAtencion, Permisos, Roles
 from apps.catalogos.permissions import CatalogApiException, HasCatalogPermission
+from apps.catalogos.serializers import CatCentroAtencionDetailSerializer
 
 
 class CatalogModelsAndPermissionsUnitTests(TestCase):
@@ -53,3 +56,42 @@ class CatalogModelsAndPermissionsUnitTests(TestCase):
 
         self.assertEqual(ctx.exception.status_code, 403)
         self.assertEqual(ctx.exception.detail["code"], "PERMISSION_DENIED")
+
+
+class CatalogSerializerRefsTests(TestCase):
+    def test_detail_serializer_resolves_user_refs_in_one_query(self):
+        users = []
+        for index in range(3):
+            user = SyUsuario.objects.create(
+                usuario=f"ref_user_{index}",
+                correo=f"ref.user{index}@example.com",
+                clave_hash="x",
+                est_activo=True,
+            )
+            DetUsuario.objects.create(
+                id_usuario=user,
+                nombre="Ref",
+                paterno=str(index),
+                materno="",
+                nombre_completo=f"Ref {index}",
+            )
+            users.append(user)
+        for index, user in enumerate(users):
+            CatCentroAtencion.objects.create(
+                name=f"Centro Ref {index}",
+                code=f"CR-{index}",
+                is_external=False,
+                address="Calle 1",
+                schedule={},
+                is_active=True,
+                created_by_id=user.id_usuario,
+                updated_by_id=users[0].id_usuario,
+            )
+        centers = list(CatCentroAtencion.objects.filter(code__startswith="CR-").order_by("code"))
+
+        with CaptureQueriesContext(connection) as queries:
+            data = CatCentroAtencionDetailSerializer(centers, many=True).data
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(data[2]["createdBy"], {"id": users[2].id_usuario, "name": "Ref 2"})
+        self.assertEqual(data[2]["updatedBy"], {"id": users[0].id_usuario, "name": "Ref 0"})
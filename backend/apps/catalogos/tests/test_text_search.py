@@ -0,0 +1,44 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from apps.catalogos.models import Roles
+from infrastructure.search.text_search import (
+    SearchCapabilities,
+    apply_text_search,
+    fold_search_text,
+    order_by_rank,
+)
+
+
+class TextSearchTests(TestCase):
+    def setUp(self):
+        for name in ("MEDICO GENERAL", "Médico Especialista", "RECEPCION"):
+            Roles.objects.create(rol=name, desc_rol=name)
+
+    def test_fallback_uses_icontains_without_ranking(self):
+        queryset = order_by_rank(apply_text_search(Roles.objects.all(), ["rol"], "medico"), "rol")
+
+        self.assertEqual(list(queryset.values_list("rol", flat=True)), ["MEDICO GENERAL"])
+
+    def test_per_word_requires_every_word(self):
+        queryset = apply_text_search(
+            Roles.objects.all(),
+            ["rol", "desc_rol"],
+            "general medico",
+            per_word=True,
+        )
+
+        self.assertEqual(list(queryset.values_list("rol", flat=True)), ["MEDICO GENERAL"])
+
+    def test_postgres_expression_matches_trigram_index(self):
+        capabilities = SearchCapabilities(trigram=True, unaccent=True)
+        with patch("infrastructure.search.text_search.search_capabilities", return_value=capabilities):
+            queryset = order_by_rank(apply_text_search(Roles.objects.all(), ["rol"], "médico"), "rol")
+
+        sql = str(queryset.query)
+        # Misma expresion que el indice: UPPER(sires_unaccent(col::text)).
+        self.assertIn('UPPER(sires_unaccent(CAST("cat_roles"."rol" AS text)))', sql)
+        self.assertIn("similarity(", sql)
+        self.assertIn("%MEDICO%", sql)
+        self.assertEqual(fold_search_text("Médico"), "MEDICO")
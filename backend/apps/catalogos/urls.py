@@ -33,10 +33,19 @@ for base, list_view, detail_view, pk_type in routes:
     urlpatterns.append(path(base, list_view.as_view(), name=f"{base}-list-create"))
     urlpatterns.append(path(f"{base}/<{pk_type}:pk>", detail_view.as_view(), name=f"{base}-detail"))
 
+urlpatterns.append(
+    path(
+        "catalogs/bundle",
+        CatalogBundleView.as_view(catalogs={base: list_view for base, list_view, _, _ in routes}),
+        name="catalogs-bundle",
+    )
+)
+
 
 # RUTAS ESPECIALES CIES
 urlpatterns += [
     path("cies/upload/",     CatCiesUploadAPIView.as_view(),  name="cies-upload"),   # POST paso 1: preview
+    path("cies/upload/<str:upload_id>/", CatCiesUploadStatusAPIView.as_view(), name="cies-upload-status"),  # GET avance del paso 1
     path("cies/confirm/",    CatCiesConfirmAPIView.as_view(), name="cies-confirm"),  # POST paso 2: guardar
     path("cies/",            CatCiesListCreateView.as_view(), name="cies-list"),
     path("cies/<str:pk>/",   CatCiesDetailView.as_view(),     name="cies-detail"),
@@ -1,20 +1,49 @@
+from apps.catalogos.models import CiesUploadSession
 from apps.catalogos.services.cat_cies_service import CatCiesService
 
 
+class CiesUploadNotFound(Exception):
+    """La carga expiro, ya se confirmo o pertenece a otro usuario."""
+
+
+class CiesUploadNotReady(Exception):
+    """La carga sigue en validacion o fallo."""
+
+
 class ConfirmCiesUseCase:
     """
-    Paso 2: Recibe las filas ya validadas desde el frontend
-    y guarda solo las que no tienen error.
+    Paso 2: Guarda las filas validas de la carga (``uploadId``) o, por
+    compatibilidad, las filas recibidas desde el frontend sin error.
     """
 
-    def execute(self, rows: list, user_id: int) -> dict:
+    def execute(self, rows: list = None, user_id: int = None, deactivate_missing: bool = False, upload_id: str = None) -> dict:
         service = CatCiesService()
-        inserted = service.save_valid_rows(rows, user_id)
 
-        return {
-            "total_records": len(rows),
-            "total_errores": sum(
+        if upload_id:
+            session = service.load_upload(upload_id, user_id)
+            if session is None or session.status == CiesUploadSession.Status.CONFIRMED:
+                raise CiesUploadNotFound(upload_id)
+            if session.status != CiesUploadSession.Status.READY:
+                raise CiesUploadNotReady(session.status)
+            result = service.confirm_upload(session, user_id, deactivate_missing=deactivate_missing)
+            if result is None:
+                raise CiesUploadNotFound(upload_id)
+            total_records = session.total_records
+            total_errores = session.total_errores
+        else:
+            rows = rows or []
+            result = service.save_valid_rows(rows, user_id, deactivate_missing=deactivate_missing)
+            total_records = len(rows)
+            total_errores = sum(
                 1 for r in rows if r.get("ERROR", "").strip() != ""
-            ),
-            "inserted": inserted,
-        }
\ No newline at end of file
+            )
+
+        return {
+            "total_records": total_records,
+            "total_errores": total_errores,
+            # "inserted" conserva el total guardado que ya muestra el frontend.
+            "inserted": result.saved,
+            "created": result.inserted,
+            "updated": result.updated,
+            "deactivated": result.deactivated,
+        }
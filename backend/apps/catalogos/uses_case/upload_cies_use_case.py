@@ -1,14 +1,62 @@
+import logging
+
+from django.conf import settings
+
 from apps.catalogos.services.cat_cies_service import CatCiesService
 
+logger = logging.getLogger(__name__)
+
+# Segundos que una carga puede esperar a un worker antes de validarse en linea.
+DEFAULT_PENDING_TIMEOUT_SECONDS = 60
+
 
 class PreviewCiesUseCase:
     """
     Paso 1: Valida el Excel y devuelve las filas con errores.
-    NO guarda nada en la BD.
+    Las filas validas quedan en la carga ``uploadId``; los archivos grandes
+    se validan en segundo plano y el avance se consulta por ``uploadId``.
+    NO guarda nada en el catalogo.
     """
 
-    def execute(self, file, version: str) -> dict:
+    def execute(self, file, version: str, user_id=None) -> dict:
         service = CatCiesService()
-        result = service.process_excel(file, version)
+        # Sin depender del beat: cada carga nueva limpia las vencidas.
+        service.purge_expired_uploads()
+
+        if self._run_async(file):
+            # Import diferido: las tareas importan el servicio.
+            from apps.catalogos.tasks import procesar_carga_cies
+
+            session = service.create_upload(file, version, user_id)
+            try:
+                # retry=False: sin broker disponible falla enseguida en vez de reintentar.
+                procesar_carga_cies.apply_async(args=[str(session.upload_id)], retry=False)
+            except Exception:
+                logger.warning("No se pudo encolar la carga de CIES; se valida en linea", exc_info=True)
+                service.run_upload(session.upload_id)
+            result = service.upload_status(session.upload_id, user_id)
+        else:
+            result = service.process_excel(file, version, user_id=user_id)
+
         result["inserted"] = 0
-        return result
\ No newline at end of file
+        return result
+
+    def status(self, upload_id, user_id=None):
+        service = CatCiesService()
+        # Si ningun worker tomo la carga, la consulta de avance la valida en linea.
+        service.run_stalled_upload(
+            upload_id,
+            user_id,
+            pending_seconds=getattr(settings, "CIES_UPLOAD_PENDING_TIMEOUT_SECONDS", DEFAULT_PENDING_TIMEOUT_SECONDS),
+        )
+        result = service.upload_status(upload_id, user_id)
+        if result is not None:
+            result["inserted"] = 0
+        return result
+
+    @staticmethod
+    def _run_async(file) -> bool:
+        if not getattr(settings, "CIES_UPLOAD_ASYNC", False):
+            return False
+        size = getattr(file, "size", None) or 0
+        return size >= getattr(settings, "CIES_UPLOAD_ASYNC_MIN_BYTES", 0)
@@ -1,13 +1,21 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.gzip import gzip_page
 from types import MappingProxyType
 
 from .models import *
 from .serializers import *
-from .permissions import CatalogPermissionMixin
+from .permissions import CatalogApiException, CatalogPermissionMixin
+from .services.catalog_list_cache import CatalogPage, cached_bundle_items
+from .services.catalog_version_service import bump_catalog_version, get_catalog_version
+from apps.authentication.repositories.user_repository import UserRepository
+from apps.authentication.services.errors import AuthServiceError
+from apps.authentication.services.session_service import authenticate_request
+from apps.authentication.services.auth_revision import bump_rbac_epoch, bump_role_revisions
+from infrastructure.search.text_search import apply_text_search, order_by_rank
 
 class ErrorMixin:
     def _error(self, request, *, code, message, http_status, details=None):
@@ -103,7 +111,7 @@ class CatalogBaseListCreateView(CatalogPermissionMixin, ErrorMixin, APIView):
             )
 
         if search:
-            qs = qs.filter(Q(**{f"{self.name_field}__icontains": search}))
+            qs = apply_text_search(qs, [self.name_field], search)
 
         if is_active is not None:
             normalized_is_active = is_active.lower()
@@ -122,22 +130,49 @@ class CatalogBaseListCreateView(CatalogPermissionMixin, ErrorMixin, APIView):
         order_field = self.sort_map[sort_by]
         if sort_order == "desc":
             order_field = f"-{order_field}"
-        qs = qs.order_by(order_field)
-        total = qs.count()
-        start = (page - 1) * page_size
-        end = start + page_size
-        serializer = self.list_serializer(qs[start:end], many=True)
-        total_pages = (total + page_size - 1) // page_size
-        return Response(
+        # Busqueda sin sortBy explicito: lo mas parecido primero.
+        ranked = bool(search) and "sortBy" not in request.query_params
+        qs = order_by_rank(qs, order_field) if ranked else qs.order_by(order_field)
+
+        cached_page = CatalogPage(
+            self.catalog,
             {
-                "items": serializer.data,
                 "page": page,
                 "pageSize": page_size,
-                "total": total,
-                "totalPages": total_pages,
+                "search": search or "",
+                "isActive": is_active.lower() if is_active is not None else "",
+                "sortBy": sort_by,
+                "sortOrder": sort_order,
+                "ranked": ranked,
             },
-            status=status.HTTP_200_OK,
         )
+        if cached_page.not_modified(request):
+            return self._with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), cached_page)
+
+        payload = cached_page.get_or_build(lambda: self._build_page(qs, page, page_size))
+        return self._with_etag(Response(payload, status=status.HTTP_200_OK), cached_page)
+
+    def _build_page(self, qs, page, page_size):
+        total = qs.count()
+        start = (page - 1) * page_size
+        end = start + page_size
+        serializer = self.list_serializer(qs[start:end], many=True)
+        total_pages = (total + page_size - 1) // page_size
+        return {
+            "items": [dict(item) for item in serializer.data],
+            "page": page,
+            "pageSize": page_size,
+            "total": total,
+            "totalPages": total_pages,
+        }
+
+    @staticmethod
+    def _with_etag(response, cached_page):
+        if cached_page.cacheable:
+            response["ETag"] = cached_page.etag
+            # El navegador guarda la pagina pero revalida siempre con If-None-Match.
+            response["Cache-Control"] = "private, no-cache"
+        return response
    
     def post(self, request):
         serializer = self.write_serializer(data=request.data)
@@ -167,6 +202,7 @@ class CatalogBaseListCreateView(CatalogPermissionMixin, ErrorMixin, APIView):
             save_kwargs["created_by_id"] = actor_id
 
         item = serializer.save(**save_kwargs)
+        bump_catalog_version(self.catalog)
 
         item_id = getattr(item, "id", None)
         if item_id is None:
@@ -198,6 +234,10 @@ class CatalogBaseDetailView(CatalogPermissionMixin, ErrorMixin, APIView):
         if model_meta is None:
             return set()
         return {field.name for field in model_meta.get_fields()}
+
+    def after_write(self, item):
+        # Gancho para efectos posteriores a put/delete.
+        pass
     
     def get(self, request, pk):
         item = self.get_object(pk)
@@ -249,6 +289,8 @@ class CatalogBaseDetailView(CatalogPermissionMixin, ErrorMixin, APIView):
             save_kwargs["updated_by_id"] = actor_id
 
         item = serializer.save(**save_kwargs)
+        bump_catalog_version(self.catalog)
+        self.after_write(item)
         detail = self.detail_serializer(item)
         return Response({self.wrapper_key: detail.data}, status=status.HTTP_200_OK)
     
@@ -275,9 +317,94 @@ class CatalogBaseDetailView(CatalogPermissionMixin, ErrorMixin, APIView):
             update_fields.append("deleted_by_id")
 
         item.save(update_fields=update_fields)
+        bump_catalog_version(self.catalog)
+        self.after_write(item)
         return Response({"success": True}, status=status.HTTP_200_OK)
 
 
+@method_decorator(gzip_page, name="dispatch")
+class CatalogBundleView(ErrorMixin, APIView):
+    """Registros activos de varios catalogos en una sola respuesta.
+
+    GET ?catalogs=areas,shifts&known=areas:<version>,shifts:<version>
+    Los catalogos cuya version coincide con ``known`` no se reenvian.
+    """
+
+    authentication_classes = []
+    permission_classes = []
+    # Ruta publica -> vista de listado; se asigna desde urls.py.
+    catalogs = MappingProxyType({})
+
+    @staticmethod
+    def _parse_known(raw_value):
+        known = {}
+        for chunk in (raw_value or "").split(","):
+            name, _, version = chunk.strip().partition(":")
+            if name and version.isdigit():
+                known[name] = int(version)
+        return known
+
+    @staticmethod
+    def _active_items(list_view):
+        qs = list_view.model.objects.all()
+        if "is_active" in list_view()._model_field_names():
+            qs = qs.filter(is_active=True)
+        qs = qs.order_by(list_view.sort_map.get("name", "pk"))
+        return [dict(item) for item in list_view.list_serializer(qs, many=True).data]
+
+    def get(self, request):
+        request_id = request.headers.get("X-Request-ID")
+        try:
+            user = authenticate_request(request)
+        except AuthServiceError as exc:
+            raise CatalogApiException(
+                code=exc.code,
+                message=exc.message,
+                http_status=exc.status_code,
+                request_id=request_id,
+                details=exc.details,
+            )
+        request.user = user
+
+        raw_names = request.query_params.get("catalogs")
+        names = [name.strip() for name in raw_names.split(",") if name.strip()] if raw_names else list(self.catalogs)
+        unknown = [name for name in names if name not in self.catalogs]
+        if unknown:
+            return self._error(
+                request,
+                code="VALIDATION_ERROR",
+                message="Parámetro catalogs inválido",
+                http_status=status.HTTP_400_BAD_REQUEST,
+                details={"catalogs": [f"No existen: {', '.join(unknown)}"]},
+            )
+
+        known = self._parse_known(request.query_params.get("known"))
+        permissions = set(UserRepository.get_authorization(user).get("permissions", []))
+        payload = {"versions": {}, "catalogs": {}, "unchanged": [], "denied": []}
+
+        for name in dict.fromkeys(names):
+            list_view = self.catalogs[name]
+            if "*" not in permissions and f"admin:catalogos:{list_view.catalog}:read" not in permissions:
+                payload["denied"].append(name)
+                continue
+
+            version = get_catalog_version(list_view.catalog)
+            payload["versions"][name] = version
+            # Version 0 = contador no disponible: siempre se envia el catalogo.
+            if version and known.get(name) == version:
+                payload["unchanged"].append(name)
+                continue
+            payload["catalogs"][name] = cached_bundle_items(
+                list_view.catalog,
+                version,
+                lambda list_view=list_view: self._active_items(list_view),
+            )
+
+        response = Response(payload, status=status.HTTP_200_OK)
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
 #####Views Areas
 class AreasListCreateView(CatalogBaseListCreateView):
     catalog = "areas"
@@ -587,6 +714,10 @@ class PermisosDetailView(CatalogBaseDetailView):
     wrapper_key = "permission"
     error_codes = {"not_found": "PERMISSIONS_NOT_FOUND", "exists": "PERMISSIONS_EXISTS"}
 
+    def after_write(self, item):
+        # Un permiso desactivado o renombrado afecta a todas las sesiones.
+        bump_rbac_epoch()
+
 
 #####Views Roles
 class RolesListCreateView(CatalogBaseListCreateView):
@@ -608,6 +739,9 @@ class RolesDetailView(CatalogBaseDetailView):
     wrapper_key = "role"
     error_codes = {"not_found": "ROLE_NOT_FOUND", "exists": "ROLE_EXISTS"}
 
+    def after_write(self, item):
+        bump_role_revisions([item.id_rol])
+
 
 #####Views Tipos de Areas
 class TiposAreasListCreateView(CatalogBaseListCreateView):
@@ -728,8 +862,14 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
 from apps.catalogos.models.cies import CatCies
 from apps.catalogos.serializers import CatCiesSerializer
+from apps.catalogos.repositories.cat_cies_repository import CiesMixedVersionsError
+from apps.catalogos.services.cat_cies_service import CIES_CATALOG
 from apps.catalogos.uses_case.upload_cies_use_case import PreviewCiesUseCase
-from apps.catalogos.uses_case.confirm_cies_use_case import ConfirmCiesUseCase
+from apps.catalogos.uses_case.confirm_cies_use_case import (
+    CiesUploadNotFound,
+    CiesUploadNotReady,
+    ConfirmCiesUseCase,
+)
 
 class ErrorMixin:
     def _error(self, request, *, code, message, http_status, details=None):
@@ -770,8 +910,33 @@ class CatCiesUploadAPIView(CatalogPermissionMixin, ErrorMixin, APIView):
             result = PreviewCiesUseCase().execute(
                 file=file,
                 version=version,
+                user_id=request.user.id,
             )
 
+            # Archivo grande: se valida en segundo plano, el avance se consulta por uploadId.
+            http_status = status.HTTP_200_OK if result["status"] == "ready" else status.HTTP_202_ACCEPTED
+            return Response(result, status=http_status)
+
+        except Exception as e:
+            traceback.print_exc()
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# PASO 1b — Avance de una carga en segundo plano
+# GET /api/v1/catalogos/cies/upload/<uploadId>/
+class CatCiesUploadStatusAPIView(CatalogPermissionMixin, ErrorMixin, APIView):
+
+    def get(self, request, upload_id):
+        try:
+            result = PreviewCiesUseCase().status(upload_id, user_id=request.user.id)
+            if result is None:
+                return self._error(
+                    request,
+                    code="CIES_UPLOAD_NOT_FOUND",
+                    message="La carga expiró o no existe; vuelva a subir el archivo",
+                    http_status=status.HTTP_404_NOT_FOUND,
+                )
+
             return Response(result, status=status.HTTP_200_OK)
 
         except Exception as e:
@@ -785,9 +950,10 @@ class CatCiesConfirmAPIView(CatalogPermissionMixin, ErrorMixin, APIView):
 
     def post(self, request):
         try:
+            upload_id = request.data.get("uploadId")
             rows = request.data.get("rows", [])
 
-            if not rows:
+            if not upload_id and not rows:
                 return self._error(
                     request,
                     code="VALIDATION_ERROR",
@@ -796,10 +962,41 @@ class CatCiesConfirmAPIView(CatalogPermissionMixin, ErrorMixin, APIView):
                 )
 
             user_id = request.user.id
-            result = ConfirmCiesUseCase().execute(rows=rows, user_id=user_id)
+            # deactivateMissing=true: reemplazo completo de version, da de baja las claves ausentes.
+            deactivate_missing = str(request.data.get("deactivateMissing", "")).lower() == "true"
+            result = ConfirmCiesUseCase().execute(
+                rows=rows,
+                user_id=user_id,
+                deactivate_missing=deactivate_missing,
+                upload_id=upload_id,
+            )
 
             return Response(result, status=status.HTTP_200_OK)
 
+        except CiesUploadNotFound:
+            return self._error(
+                request,
+                code="CIES_UPLOAD_NOT_FOUND",
+                message="La carga expiró o no existe; vuelva a subir el archivo",
+                http_status=status.HTTP_404_NOT_FOUND,
+            )
+
+        except CiesUploadNotReady:
+            return self._error(
+                request,
+                code="CIES_UPLOAD_NOT_READY",
+                message="La carga sigue en validación o no se pudo procesar",
+                http_status=status.HTTP_409_CONFLICT,
+            )
+
+        except CiesMixedVersionsError:
+            return self._error(
+                request,
+                code="VALIDATION_ERROR",
+                message="Para dar de baja las claves ausentes la carga debe traer una sola versión",
+                http_status=status.HTTP_400_BAD_REQUEST,
+            )
+
         except Exception as e:
             traceback.print_exc()
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -812,6 +1009,8 @@ class CatCiesListCreateView(CatalogPermissionMixin, ErrorMixin, ListCreateAPIVie
 
     def perform_create(self, serializer):
         serializer.save()
+        # Descarta el indice de busqueda de CIES en memoria de los workers.
+        bump_catalog_version(CIES_CATALOG)
 
 
 class CatCiesDetailView(CatalogPermissionMixin, ErrorMixin, RetrieveUpdateDestroyAPIView):
@@ -820,4 +1019,9 @@ class CatCiesDetailView(CatalogPermissionMixin, ErrorMixin, RetrieveUpdateDestro
     lookup_field = "code"
 
     def perform_update(self, serializer):
-        serializer.save()
\ No newline at end of file
+        serializer.save()
+        bump_catalog_version(CIES_CATALOG)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        bump_catalog_version(CIES_CATALOG)
@@ -4,3 +4,24 @@ from django.apps import AppConfig
 class ConsultaMedicaConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.consulta_medica"
+
+    def ready(self):
+        from apps.catalogos.services.catalog_version_service import catalog_namespace
+        from apps.consulta_medica.services.cie_search_index import (
+            CIES_CATALOG,
+            cie_search_index_enabled,
+            get_cie_search_index,
+            reset_cie_search_index,
+        )
+        from infrastructure.cache.invalidation import register_invalidation_handler
+        from infrastructure.cache.warmup import register_warmup
+
+        def _reset_cie_index(version):
+            reset_cie_search_index()
+
+        def _warm_cie_index():
+            if cie_search_index_enabled():
+                get_cie_search_index()
+
+        register_invalidation_handler(catalog_namespace(CIES_CATALOG), _reset_cie_index)
+        register_warmup("cies", _warm_cie_index)
@@ -4,6 +4,10 @@ from django.db.models import Q, Value
 from django.db.models.functions import Replace, Upper
 
 from apps.catalogos.models import CatCies
+from apps.consulta_medica.services.cie_search_index import (
+    cie_search_index_enabled,
+    get_cie_search_index,
+)
 
 
 class CiesRepository:
@@ -11,12 +15,22 @@ class CiesRepository:
     def get_active_by_code(code):
         return CatCies.objects.filter(code=code, is_active=True).first()
 
+    @staticmethod
+    def is_active_code(code):
+        if cie_search_index_enabled() and get_cie_search_index().has_active_code(code):
+            return True
+        # Sin indice, o clave cargada sin publicar version: se confirma en BD.
+        return CatCies.objects.filter(code=code, is_active=True).exists()
+
     @staticmethod
     def search_active(search, *, limit=10):
         normalized_search = (search or "").strip()
         if not normalized_search:
             return []
 
+        if cie_search_index_enabled():
+            return get_cie_search_index().search(normalized_search, limit=limit)
+
         normalized_code_search = re.sub(r"[^A-Za-z0-9]", "", normalized_search)
 
         normalized_code_expression = Upper(
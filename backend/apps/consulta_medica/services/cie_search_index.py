@@ -0,0 +1,183 @@
+"""Indice en memoria de CIES activos para busqueda y validacion en consulta.
+
+Se carga al arrancar el worker y se descarta cuando cambia la version del
+catalogo ``cies``. Combina:
+
+- claves normalizadas ordenadas (busqueda exacta y por prefijo con bisect);
+- trigramas de las descripciones sin acentos (busqueda por texto);
+- un conjunto de claves activas para validar en O(1).
+"""
+
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from django.conf import settings
+
+from apps.catalogos.models import CatCies
+from apps.catalogos.services.catalog_version_service import get_catalog_version
+
+CIES_CATALOG = "cies"
+CODE_MAX_LENGTH = 8
+
+CieEntry = namedtuple("CieEntry", ["code", "description", "version"])
+
+# Orden de relevancia de una coincidencia.
+RANK_EXACT_CODE = 0
+RANK_CODE_PREFIX = 1
+RANK_DESCRIPTION_PREFIX = 2
+RANK_DESCRIPTION_PHRASE = 3
+RANK_DESCRIPTION_TOKENS = 4
+RANK_CODE_INFIX = 5
+
+_NON_CODE_CHARS = re.compile(r"[^A-Z0-9]")
+_NON_WORD_CHARS = re.compile(r"[^A-Z0-9]+")
+
+
+def cie_search_index_enabled() -> bool:
+    return bool(getattr(settings, "CIE_SEARCH_INDEX", False))
+
+
+def normalize_code(value: str) -> str:
+    # "1a33.0" -> "1A330"
+    return _NON_CODE_CHARS.sub("", (value or "").upper())
+
+
+def fold_text(value: str) -> str:
+    # Mayusculas, sin acentos y con un solo espacio entre palabras.
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_WORD_CHARS.sub(" ", stripped.upper()).strip()
+
+
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass(frozen=True)
+class CieSearchIndex:
+    version: int
+    entries: Tuple[CieEntry, ...] = ()
+    active_codes: FrozenSet[str] = frozenset()
+    # (clave normalizada, posicion en entries), ordenado para bisect.
+    normalized_codes: Tuple[Tuple[str, int], ...] = ()
+    folded_descriptions: Tuple[str, ...] = ()
+    trigrams: Dict[str, array] = field(default_factory=dict)
+
+    def search(self, query: str, *, limit: int = 10) -> List[CieEntry]:
+        folded_query = fold_text(query)
+        code_query = normalize_code(query)
+        if not folded_query and not code_query:
+            return []
+
+        ranked = {}
+
+        def _offer(position, rank):
+            if rank < ranked.get(position, RANK_CODE_INFIX + 1):
+                ranked[position] = rank
+
+        if code_query:
+            start = bisect_left(self.normalized_codes, (code_query, -1))
+            for normalized, position in self.normalized_codes[start:]:
+                if not normalized.startswith(code_query):
+                    break
+                _offer(position, RANK_EXACT_CODE if normalized == code_query else RANK_CODE_PREFIX)
+
+        tokens = folded_query.split()
+        for position in self._description_candidates(tokens):
+            description = self.folded_descriptions[position]
+            if description.startswith(folded_query):
+                _offer(position, RANK_DESCRIPTION_PREFIX)
+            elif folded_query in description:
+                _offer(position, RANK_DESCRIPTION_PHRASE)
+            elif all(token in description for token in tokens):
+                _offer(position, RANK_DESCRIPTION_TOKENS)
+
+        if code_query and len(code_query) <= CODE_MAX_LENGTH and len(ranked) < limit:
+            # Clave con el texto en medio ("33" -> 1A33.0): ultimo nivel, solo si faltan resultados.
+            for normalized, position in self.normalized_codes:
+                if code_query in normalized[1:]:
+                    _offer(position, RANK_CODE_INFIX)
+
+        ordered = sorted(ranked.items(), key=lambda item: (item[1], self.entries[item[0]].code))
+        return [self.entries[position] for position, _ in ordered[:limit]]
+
+    def _description_candidates(self, tokens):
+        if not tokens:
+            return ()
+        grams = set()
+        for token in tokens:
+            grams |= _trigrams(token)
+        if any(len(token) < 3 for token in tokens) or not grams:
+            # Palabras de menos de 3 letras no tienen trigramas: se revisan todas.
+            return range(len(self.entries))
+
+        postings = [self.trigrams.get(gram) for gram in grams]
+        if any(posting is None for posting in postings):
+            return ()
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return candidates
+
+    def has_active_code(self, code: str) -> bool:
+        return (code or "").strip().upper() in self.active_codes
+
+
+_index: Optional[CieSearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def _load_index(version: int) -> CieSearchIndex:
+    rows = (
+        CatCies.objects.filter(is_active=True)
+        .order_by("code")
+        .values_list("code", "description", "version")
+    )
+    entries = tuple(CieEntry(*row) for row in rows)
+
+    folded_descriptions = tuple(fold_text(entry.description) for entry in entries)
+    postings = defaultdict(list)
+    for position, description in enumerate(folded_descriptions):
+        for gram in _trigrams(description):
+            postings[gram].append(position)
+
+    return CieSearchIndex(
+        version=version,
+        entries=entries,
+        active_codes=frozenset(entry.code.upper() for entry in entries),
+        normalized_codes=tuple(
+            sorted((normalize_code(entry.code), position) for position, entry in enumerate(entries))
+        ),
+        folded_descriptions=folded_descriptions,
+        trigrams={gram: array("I", positions) for gram, positions in postings.items()},
+    )
+
+
+def get_cie_search_index(*, reload: bool = False) -> CieSearchIndex:
+    global _index
+
+    version = get_catalog_version(CIES_CATALOG)
+    index = _index
+    if not reload and index is not None and index.version == version:
+        return index
+
+    with _index_lock:
+        if reload or _index is None or _index.version != version:
+            _index = _load_index(version)
+        return _index
+
+
+def reset_cie_search_index() -> None:
+    global _index
+
+    with _index_lock:
+        _index = None
@@ -1,7 +1,11 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from apps.catalogos.models import CatCies
 from apps.consulta_medica.models import VisitConsultation
+from apps.consulta_medica.services.cie_search_index import (
+    get_cie_search_index,
+    reset_cie_search_index,
+)
 from apps.consulta_medica.uses_case.consultation_usecase import (
     close_consultation,
     save_diagnosis,
@@ -270,3 +274,38 @@ class ConsultationUseCaseTests(TestCase):
             second_payload["consultation"]["primaryDiagnosis"],
             "Dx estable",
         )
+
+
+@override_settings(CIE_SEARCH_INDEX=True)
+class CieSearchIndexTests(TestCase):
+    def setUp(self):
+        for code, description in (
+            ("A09", "DIARREA Y GASTROENTERITIS DE PRESUNTO ORIGEN INFECCIOSO"),
+            ("A090", "OTRAS GASTROENTERITIS Y COLITIS DE ORIGEN INFECCIOSO"),
+            ("1A33.0", "CISTOISOSPORIASIS DEL INTESTINO DELGADO"),
+            ("K52.9", "Gastroenteritis y colitis no infecciosas, no especificadas"),
+            ("B01", "Varicela con neumonía"),
+        ):
+            CatCies.objects.create(code=code, description=description, version="CIE-10", is_active=True)
+        CatCies.objects.create(code="Z999", description="CLAVE DADA DE BAJA", version="CIE-10", is_active=False)
+        get_cie_search_index(reload=True)
+        self.addCleanup(reset_cie_search_index)
+
+    def _codes(self, search):
+        return [item["code"] for item in search_cies(search, roles=["DOCTOR"])["items"]]
+
+    def test_ranks_exact_code_then_prefix_then_description(self):
+        self.assertEqual(self._codes("a09"), ["A09", "A090"])
+        self.assertEqual(self._codes("1A330"), ["1A33.0"])
+        self.assertEqual(self._codes("gastroenteritis"), ["K52.9", "A09", "A090"])
+
+    def test_description_search_is_accent_folded_and_token_based(self):
+        self.assertEqual(self._codes("neumonia"), ["B01"])
+        self.assertEqual(self._codes("colitis gastro"), ["A090", "K52.9"])
+        self.assertEqual(self._codes("baja"), [])
+
+    def test_diagnosis_code_validation_uses_active_set(self):
+        index = get_cie_search_index()
+
+        self.assertTrue(index.has_active_code("a090"))
+        self.assertFalse(index.has_active_code("Z999"))
@@ -78,8 +78,7 @@ def _resolve_cie_code_or_error(cie_code):
     if not normalized_code:
         return None
 
-    cie_match = CiesRepository.get_active_by_code(normalized_code)
-    if cie_match is None:
+    if not CiesRepository.is_active_code(normalized_code):
         raise VisitDomainError(
             "VALIDATION_ERROR",
             "Hay errores en el formulario",
@@ -73,7 +73,7 @@ def _domain_error_response(request, exc):
 
 
 def _actor_context(user):
-    auth_user = UserRepository.build_auth_user(user)
+    auth_user = UserRepository.get_authorization(user)
     return (
         user.id_usuario,
         auth_user.get("roles", []),
@@ -2,12 +2,17 @@ from http.cookies import SimpleCookie
 from typing import cast
 from urllib.parse import parse_qs, urlparse
 
+from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
 from django.conf import settings
 from django.http.request import validate_host
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.settings import api_settings
 
+from apps.authentication.services.permission_index import (
+    PERMISSION_BITMAP_CLAIM,
+    expand_permission_claims,
+)
 from apps.authentication.services.token_service import ACCESS_COOKIE, decode_access_token
 
 REALTIME_USER_SCOPE_KEY = "realtime_user"
@@ -44,7 +49,11 @@ async def authenticate_websocket_scope(scope):
         return None
 
     roles = payload.get("roles") or []
-    permissions = payload.get("permissions") or []
+    if payload.get(PERMISSION_BITMAP_CLAIM):
+        # El bitmap se expande contra el indice de permisos (puede consultar BD).
+        permissions = await database_sync_to_async(expand_permission_claims)(payload) or []
+    else:
+        permissions = payload.get("permissions") or []
     return {
         "id": str(user_id),
         "roles": roles,
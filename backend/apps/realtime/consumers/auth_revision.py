@@ -0,0 +1,62 @@
+from channels.db import database_sync_to_async
+
+from apps.authentication.services.auth_revision import get_user_role_ids
+from apps.realtime.auth import REALTIME_USER_SCOPE_KEY
+from apps.realtime.consumers.base import BaseRealtimeConsumer
+
+AUTH_REVISION_EPOCH_GROUP = "auth.revision.epoch"
+
+
+def auth_revision_user_group(user_id):
+    return f"auth.revision.user.{user_id}"
+
+
+def auth_revision_role_group(role_id):
+    return f"auth.revision.role.{role_id}"
+
+
+def _load_role_ids(user_id):
+    return get_user_role_ids([user_id]).get(int(user_id), [])
+
+
+class AuthRevisionRealtimeConsumer(BaseRealtimeConsumer):
+    """Stream por usuario con avisos de cambio de revision de sesion."""
+
+    async def connect(self):
+        realtime_user = self.scope.get(REALTIME_USER_SCOPE_KEY)
+        self._role_ids = []
+        if realtime_user is not None:
+            self._role_ids = await database_sync_to_async(_load_role_ids)(realtime_user["id"])
+
+        await super().connect()
+
+    def get_group_names(self):
+        user_id = self.scope[REALTIME_USER_SCOPE_KEY]["id"]
+        return [
+            auth_revision_user_group(user_id),
+            AUTH_REVISION_EPOCH_GROUP,
+            *[auth_revision_role_group(role_id) for role_id in self._role_ids],
+        ]
+
+    async def realtime_event(self, event):
+        await super().realtime_event(event)
+
+        payload = event.get("event", {})
+        if payload.get("entity") == "user":
+            # Los roles del usuario pudieron cambiar: se resincronizan los grupos.
+            await self._sync_role_groups()
+
+    async def _sync_role_groups(self):
+        user_id = self.scope[REALTIME_USER_SCOPE_KEY]["id"]
+        role_ids = await database_sync_to_async(_load_role_ids)(user_id)
+
+        current = {auth_revision_role_group(role_id) for role_id in self._role_ids}
+        target = {auth_revision_role_group(role_id) for role_id in role_ids}
+        for group_name in current - target:
+            await self.channel_layer.group_discard(group_name, self.channel_name)
+            self._joined_groups.remove(group_name)
+        for group_name in target - current:
+            await self.channel_layer.group_add(group_name, self.channel_name)
+            self._joined_groups.append(group_name)
+
+        self._role_ids = role_ids
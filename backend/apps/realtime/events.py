@@ -1,7 +1,14 @@
 from uuid import uuid4
 
+from channels.layers import get_channel_layer
 from django.db import transaction
+from django.utils.dateparse import parse_datetime
 
+from apps.realtime.consumers.auth_revision import (
+    AUTH_REVISION_EPOCH_GROUP,
+    auth_revision_role_group,
+    auth_revision_user_group,
+)
 from apps.realtime.consumers.visits import VISITS_STREAM_GROUP
 from apps.realtime.models import RealtimeSequence
 from apps.realtime.publisher import RealtimePublishMetadata, RealtimePublisher
@@ -16,6 +23,8 @@ VISIT_EVENT_DIAGNOSIS_SAVED = "visit.diagnosis.saved"
 VISIT_EVENT_PRESCRIPTIONS_SAVED = "visit.prescriptions.saved"
 VISIT_EVENT_CLOSED = "visit.closed"
 
+AUTH_EVENT_REVISION_CHANGED = "auth.revision.changed"
+
 
 def _build_metadata(*, request_id, correlation_id):
     normalized_request_id = (request_id or "").strip() or str(uuid4())
@@ -241,3 +250,54 @@ def publish_visit_closed(
         correlation_id=correlation_id,
         publisher=publisher,
     )
+
+
+def _revision_sequence(revision):
+    # La revision es monotona: sus milisegundos sirven como secuencia del stream.
+    parsed = parse_datetime(revision)
+    return max(int(parsed.timestamp() * 1000), 1) if parsed else 1
+
+
+def publish_auth_revision_changed(
+    *,
+    revision,
+    user_ids=(),
+    role_ids=(),
+    epoch=False,
+    request_id=None,
+    publisher=None,
+):
+    if publisher is None:
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            # Sin capa de canales (p. ej. procesos de consola) no hay a quien avisar.
+            return []
+        publisher = RealtimePublisher(channel_layer=channel_layer)
+
+    normalized_request_id = (request_id or "").strip() or str(uuid4())
+    metadata = RealtimePublishMetadata(
+        request_id=normalized_request_id,
+        correlation_id=normalized_request_id,
+        sequence=_revision_sequence(revision),
+    )
+
+    targets = [
+        ("user", user_id, auth_revision_user_group(user_id)) for user_id in user_ids
+    ]
+    targets.extend(
+        ("role", role_id, auth_revision_role_group(role_id)) for role_id in role_ids
+    )
+    if epoch:
+        targets.append(("rbac", "epoch", AUTH_REVISION_EPOCH_GROUP))
+
+    return [
+        publisher.publish(
+            group_names=[group_name],
+            event_type=AUTH_EVENT_REVISION_CHANGED,
+            entity=entity,
+            entity_id=entity_id,
+            metadata=metadata,
+            payload={"revision": revision},
+        )
+        for entity, entity_id, group_name in targets
+    ]
@@ -1,10 +1,14 @@
 from django.urls import path
 
+from apps.realtime.consumers.auth_revision import AuthRevisionRealtimeConsumer
 from apps.realtime.consumers.visits import VisitsRealtimeConsumer
 
 WS_VISITS_STREAM_ROUTE = "ws/v1/visits/stream"
 WS_VISITS_STREAM_PATH = f"/{WS_VISITS_STREAM_ROUTE}"
+WS_AUTH_REVISION_ROUTE = "ws/v1/auth/revision"
+WS_AUTH_REVISION_PATH = f"/{WS_AUTH_REVISION_ROUTE}"
 
 websocket_urlpatterns = [
     path(WS_VISITS_STREAM_ROUTE, VisitsRealtimeConsumer.as_asgi()),
+    path(WS_AUTH_REVISION_ROUTE, AuthRevisionRealtimeConsumer.as_asgi()),
 ]
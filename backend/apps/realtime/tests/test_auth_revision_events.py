@@ -0,0 +1,92 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.authentication.models import SyUsuario
+from apps.authentication.services.auth_revision import (
+    bump_role_revisions,
+    touch_users_auth_revision,
+)
+from apps.realtime.consumers.auth_revision import (
+    AUTH_REVISION_EPOCH_GROUP,
+    auth_revision_role_group,
+    auth_revision_user_group,
+)
+from apps.realtime.events import AUTH_EVENT_REVISION_CHANGED, publish_auth_revision_changed
+from apps.realtime.publisher import RealtimePublisher
+
+
+class _FakeChannelLayer:
+    def __init__(self):
+        self.messages = []
+
+    async def group_send(self, group, message):
+        self.messages.append((group, message))
+
+
+class AuthRevisionEventsTests(SimpleTestCase):
+    def test_publishes_one_event_per_user_role_and_epoch_group(self):
+        channel_layer = _FakeChannelLayer()
+        revision = "2026-01-10T10:00:00-06:00"
+
+        events = publish_auth_revision_changed(
+            revision=revision,
+            user_ids=[7],
+            role_ids=[3],
+            epoch=True,
+            publisher=RealtimePublisher(channel_layer=channel_layer),
+        )
+
+        self.assertEqual(
+            [group for group, _ in channel_layer.messages],
+            [
+                auth_revision_user_group(7),
+                auth_revision_role_group(3),
+                AUTH_REVISION_EPOCH_GROUP,
+            ],
+        )
+        self.assertEqual([event["entity"] for event in events], ["user", "role", "rbac"])
+        self.assertTrue(all(event["eventType"] == AUTH_EVENT_REVISION_CHANGED for event in events))
+        self.assertEqual(events[0]["payload"], {"revision": revision})
+        self.assertGreater(events[0]["sequence"], 0)
+
+    def test_skips_publish_without_channel_layer(self):
+        with patch("apps.realtime.events.get_channel_layer", return_value=None):
+            events = publish_auth_revision_changed(
+                revision="2026-01-10T10:00:00-06:00",
+                user_ids=[7],
+            )
+
+        self.assertEqual(events, [])
+
+
+class AuthRevisionNotificationTests(TestCase):
+    def setUp(self):
+        self.user = SyUsuario.objects.create(
+            usuario="revision_event_user",
+            correo="revision.event@example.com",
+            clave_hash="hash",
+            est_activo=True,
+            cambiar_clave=False,
+            terminos_acept=True,
+        )
+
+    @patch("apps.realtime.events.publish_auth_revision_changed")
+    def test_touch_publishes_after_commit(self, publish_mock):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            touch_users_auth_revision([self.user.id_usuario])
+
+        publish_mock.assert_not_called()
+        for callback in callbacks:
+            callback()
+
+        publish_mock.assert_called_once()
+        self.assertEqual(publish_mock.call_args.kwargs["user_ids"], [self.user.id_usuario])
+
+    @patch("apps.realtime.events.publish_auth_revision_changed")
+    def test_role_revision_publishes_to_role_group(self, publish_mock):
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_role_revisions([11])
+
+        publish_mock.assert_called_once()
+        self.assertEqual(publish_mock.call_args.kwargs["role_ids"], [11])
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:40
+
+from django.db import migrations
+
+from infrastructure.search.indexes import trigram_index_operation
+
+# Busqueda del dashboard de recepcion (listar_citas ?busqueda=).
+INDEXES = (
+    ("citas_medicas_nombre_paciente_trgm_idx", "citas_medicas", "nombre_paciente"),
+)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transaccion.
+    atomic = False
+
+    dependencies = [
+        ('recepcion', '0003_citamedica_horariodisponible_citanotificacion'),
+    ]
+
+    operations = [
+        # El router solo migra citas_medicas en "default".
+        trigram_index_operation(INDEXES, model_name="citamedica"),
+    ]
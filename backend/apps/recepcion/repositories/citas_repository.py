@@ -16,6 +16,8 @@ from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 
+from infrastructure.search.text_search import apply_text_search
+
 from ..models import (
     CitaMedica, CitaNotificacion, HorarioDisponible,
     EstatusCita, CatMedicoClin, CatConsultorio, CatCentroAtencion,
@@ -175,9 +177,12 @@ class CitasRepository:
         if no_exp:
             qs = qs.filter(no_exp=no_exp)
         if busqueda:
-            qs = qs.filter(
-                Q(nombre_paciente__icontains=busqueda)
-                | Q(no_exp__icontains=busqueda)
+            # Orden por fecha del dashboard; la busqueda solo filtra (indice trigram).
+            qs = apply_text_search(
+                qs,
+                ["nombre_paciente"],
+                busqueda,
+                extra=Q(no_exp__icontains=busqueda),
             )
 
         total  = qs.count()
@@ -16,15 +16,22 @@ import logging
 import zlib
 from typing import Optional, TypedDict
 
-from django.core.cache import cache
-from django.db.models import Q
+from infrastructure.cache.redis_manager import get_namespace
+from infrastructure.search.text_search import apply_text_search, order_by_rank
 
 from ..models import CatEmpleado, CatFamiliar, DntFotoCredencial, TipoPaciente
 
 logger = logging.getLogger(__name__)
 
 FOTO_CACHE_TTL = 3600  # 1 hora
-NO_FOTO_SENTINEL = "__NULL__"
+# L1 acotado: las fotos pesan decenas de KB; "sin foto" (None) tambien se cachea.
+FOTO_CACHE = get_namespace(
+    "paciente:foto",
+    ttl=FOTO_CACHE_TTL,
+    l1_max_entries=512,
+    l1_max_bytes=32 * 1024 * 1024,
+    l1_ttl=300,
+)
 
 
 class PacienteDTO(TypedDict):
@@ -118,16 +125,16 @@ class PacienteRepository:
         if query.isdigit():
             qs = qs.filter(no_exp=int(query))
         else:
-            words = query.split()
-            for w in words:
-                qs = qs.filter(
-                    Q(ds_paterno__icontains=w)
-                    | Q(ds_materno__icontains=w)
-                    | Q(ds_nombre__icontains=w)
-                )
+            # Cada palabra en paterno, materno o nombre; con pg_trgm, lo mas parecido primero.
+            qs = apply_text_search(
+                qs,
+                ["ds_paterno", "ds_materno", "ds_nombre"],
+                query,
+                per_word=True,
+            )
 
         resultado: list[PacienteDTO] = []
-        for emp in qs.order_by("ds_paterno", "ds_materno", "ds_nombre")[:limit]:
+        for emp in order_by_rank(qs, "ds_paterno", "ds_materno", "ds_nombre")[:limit]:
             resultado.append(self._build_trabajador_dto(emp, incluir_foto=False))
 
         return resultado
@@ -137,12 +144,12 @@ class PacienteRepository:
     # =========================================================================
 
     def _get_foto(self, id_empleado: str, pk_num: int) -> Optional[str]:
-        cache_key = f"foto:{id_empleado}:{pk_num}"
-        cached = cache.get(cache_key, None)
-
-        if cached is not None:
-            return None if cached == NO_FOTO_SENTINEL else cached
+        return FOTO_CACHE.get_or_set(
+            f"{id_empleado}:{pk_num}",
+            lambda: self._load_foto(id_empleado, pk_num),
+        )
 
+    def _load_foto(self, id_empleado: str, pk_num: int) -> Optional[str]:
         try:
             foto_obj = (
                 DntFotoCredencial.objects.using("expedientes")
@@ -168,14 +175,11 @@ class PacienteRepository:
                 else:
                     mime = "image/jpeg"
 
-                b64 = f"data:{mime};base64," + base64.b64encode(raw).decode("utf-8")
-                cache.set(cache_key, b64, FOTO_CACHE_TTL)
-                return b64
+                return f"data:{mime};base64," + base64.b64encode(raw).decode("utf-8")
 
         except Exception as exc:
             logger.warning("Error obteniendo foto %s/%s: %s", id_empleado, pk_num, exc)
 
-        cache.set(cache_key, NO_FOTO_SENTINEL, FOTO_CACHE_TTL)
         return None
 
     # =========================================================================
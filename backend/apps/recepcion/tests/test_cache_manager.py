@@ -0,0 +1,115 @@
+import threading
+import time
+from datetime import date
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from apps.recepcion.repositories.paciente_repository import FOTO_CACHE, PacienteRepository
+from infrastructure.cache.redis_manager import (
+    CacheNamespace,
+    LocalLRU,
+    decode_value,
+    encode_value,
+)
+
+
+class CacheSerializationTests(SimpleTestCase):
+    def test_roundtrip_msgpack_compressed_and_pickle(self):
+        small = {"code": "123456", "attempts": 0}
+        large = "x" * 5000
+        fallback = {"fecha": date(2026, 1, 31)}
+
+        self.assertEqual(decode_value(encode_value(small)), small)
+        encoded_large = encode_value(large)
+        self.assertLess(len(encoded_large), 200)
+        self.assertEqual(decode_value(encoded_large), large)
+        self.assertEqual(decode_value(encode_value(fallback)), fallback)
+        self.assertIsNone(decode_value(encode_value(None)))
+
+
+class LocalLRUTests(SimpleTestCase):
+    def test_evicts_by_entries_and_bytes(self):
+        lru = LocalLRU(max_entries=2, max_bytes=100)
+        lru.set("a", 1, 10, 60)
+        lru.set("b", 2, 10, 60)
+        lru.get("a")
+        lru.set("c", 3, 10, 60)
+
+        self.assertEqual(lru.get("a"), 1)
+        self.assertEqual(lru.get("c"), 3)
+        self.assertEqual(len(lru), 2)
+
+        lru.set("d", 4, 95, 60)
+        self.assertEqual(len(lru), 1)
+        self.assertEqual(lru.get("d"), 4)
+
+
+class CacheNamespaceTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.namespace = CacheNamespace("test", version=2, ttl=60, l1_max_entries=10)
+
+    def test_keys_are_namespaced_and_versioned(self):
+        self.assertEqual(self.namespace.make_key("k"), "sires:test:v2:k")
+
+    def test_get_or_set_caches_none_and_counts(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return None
+
+        self.assertIsNone(self.namespace.get_or_set("missing", loader))
+        self.assertIsNone(self.namespace.get_or_set("missing", loader))
+        self.namespace.clear_local()
+        self.assertIsNone(self.namespace.get_or_set("missing", loader))
+
+        stats = self.namespace.stats()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["l1_hits"], 1)
+        self.assertEqual(stats["l2_hits"], 1)
+
+    def test_get_or_set_single_flight(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.1)
+            return "valor"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.namespace.get_or_set("k", loader)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["valor"] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_delete_clears_both_tiers(self):
+        self.namespace.set("k", {"a": 1})
+        self.namespace.delete("k")
+        self.assertIsNone(self.namespace.get("k"))
+
+
+class PacienteFotoCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        FOTO_CACHE.clear_local()
+
+    def test_foto_is_loaded_once(self):
+        repo = PacienteRepository()
+        with patch.object(
+            PacienteRepository, "_load_foto", return_value="data:image/png;base64,AAA"
+        ) as load_mock:
+            self.assertEqual(repo._get_foto("123", 0), "data:image/png;base64,AAA")
+            self.assertEqual(repo._get_foto("123", 0), "data:image/png;base64,AAA")
+
+        load_mock.assert_called_once_with("123", 0)
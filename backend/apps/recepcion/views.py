@@ -50,7 +50,7 @@ def _auth_or_error(request):
 
 
 def _require_recepcion_role(user):
-    auth_user = UserRepository.build_auth_user(user)
+    auth_user = UserRepository.get_authorization(user)
     ensure_recepcion_role(
         auth_user.get("roles", []),
         auth_user.get("permissions", []),
@@ -58,7 +58,7 @@ def _require_recepcion_role(user):
 
 
 def _require_visit_queue_access(user):
-    auth_user = UserRepository.build_auth_user(user)
+    auth_user = UserRepository.get_authorization(user)
     ensure_visit_queue_access(
         auth_user.get("roles", []),
         auth_user.get("permissions", []),
@@ -374,6 +374,7 @@ from .serializers import (
     SlotDisponibilidadSerializer,
 )
 from .services.pdf_service import generar_pdf_cita
+from infrastructure.security.throttling import PublicRateThrottle
 
 
 paciente_repo = PacienteRepository()
@@ -388,6 +389,7 @@ citas_uc = CitasMedicaUseCase()
 class NucleoFamiliarView(APIView):
     authentication_classes = []
     permission_classes = [AllowAny]
+    throttle_classes = [PublicRateThrottle]
 
     """
     GET /api/v1/recepcion/citas/nucleo-familiar/{no_exp}/
@@ -409,6 +411,7 @@ class NucleoFamiliarView(APIView):
 class BuscarEmpleadosView(APIView):
     authentication_classes = []
     permission_classes = [AllowAny]
+    throttle_classes = [PublicRateThrottle]
 
     """
     GET /api/v1/recepcion/citas/buscar-empleados/?q=<texto>
@@ -432,6 +435,7 @@ class BuscarEmpleadosView(APIView):
 class DisponibilidadView(APIView):
     authentication_classes = []
     permission_classes = [AllowAny]
+    throttle_classes = [PublicRateThrottle]
 
     """
     GET /api/v1/recepcion/citas/disponibilidad/
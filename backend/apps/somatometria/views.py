@@ -38,7 +38,7 @@ def _auth_or_error(request):
 
 
 def _require_somatometria_role(user):
-    auth_user = UserRepository.build_auth_user(user)
+    auth_user = UserRepository.get_authorization(user)
     ensure_somatometria_role(
         auth_user.get("roles", []),
         auth_user.get("permissions", []),
@@ -46,3 +46,7 @@ def build_application():
 
 
 application = build_application()
+
+from infrastructure.cache.warmup import prepare_worker
+
+prepare_worker()
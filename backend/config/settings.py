@@ -149,6 +149,77 @@ if 'test' in sys.argv:
         }
     }
 
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='')
+
+if CACHE_REDIS_URL and 'test' not in sys.argv:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'KEY_PREFIX': 'sires',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'sires-default',
+        }
+    }
+
+# Cache de dos niveles (infrastructure/cache/redis_manager): L2 en Redis con pool.
+CACHE_L2_REDIS_URL = CACHE_REDIS_URL if 'test' not in sys.argv else ''
+CACHE_REDIS_MAX_CONNECTIONS = config('CACHE_REDIS_MAX_CONNECTIONS', default=50, cast=int)
+CACHE_REDIS_SOCKET_TIMEOUT = config('CACHE_REDIS_SOCKET_TIMEOUT', default=0.5, cast=float)
+# Bus pub/sub de invalidacion del L1 y precarga al arrancar cada worker.
+CACHE_INVALIDATION_CHANNEL = config('CACHE_INVALIDATION_CHANNEL', default='sires:cache:invalidate')
+CACHE_WARMUP_ON_BOOT = config('CACHE_WARMUP_ON_BOOT', default=True, cast=bool) and 'test' not in sys.argv
+# Paginas de catalogos por (catalogo, version, parametros) con ETag; apagado en pruebas.
+CATALOG_LIST_CACHE = config('CATALOG_LIST_CACHE', default=True, cast=bool) and 'test' not in sys.argv
+CATALOG_LIST_CACHE_TTL = config('CATALOG_LIST_CACHE_TTL', default=3600, cast=int)
+# Cargas de CIES: archivos desde N bytes se validan en Celery (requiere worker desplegado);
+# la carga vence a los N minutos y, si sigue pendiente tras N segundos, se valida en linea.
+CIES_UPLOAD_ASYNC = config('CIES_UPLOAD_ASYNC', default=False, cast=bool) and 'test' not in sys.argv
+CIES_UPLOAD_ASYNC_MIN_BYTES = config('CIES_UPLOAD_ASYNC_MIN_BYTES', default=1_000_000, cast=int)
+CIES_UPLOAD_TTL_MINUTES = config('CIES_UPLOAD_TTL_MINUTES', default=30, cast=int)
+CIES_UPLOAD_PENDING_TIMEOUT_SECONDS = config('CIES_UPLOAD_PENDING_TIMEOUT_SECONDS', default=60, cast=int)
+# Indice en memoria de CIES activos (busqueda y validacion en consulta); apagado en pruebas.
+CIE_SEARCH_INDEX = config('CIE_SEARCH_INDEX', default=True, cast=bool) and 'test' not in sys.argv
+
+# Principal resuelto (roles, permisos, capacidades) por usuario y revision.
+AUTH_PRINCIPAL_CACHE_TTL = config('AUTH_PRINCIPAL_CACHE_TTL', default=300, cast=int)
+
+# Fast path sin BD: confia en roles/permisos del token si su revision sigue vigente.
+AUTH_STATELESS_FAST_PATH = config('AUTH_STATELESS_FAST_PATH', default=False, cast=bool)
+AUTH_REVISION_CACHE_TTL = config('AUTH_REVISION_CACHE_TTL', default=3600, cast=int)
+
+# Permisos del token como bitmap comprimido sobre el indice versionado de cat_permisos.
+AUTH_COMPACT_PERMISSION_CLAIMS = config('AUTH_COMPACT_PERMISSION_CLAIMS', default=True, cast=bool)
+
+# Permisos efectivos materializados en rel_usuario_permisos_efectivos.
+RBAC_MATERIALIZED_PERMISSIONS = config('RBAC_MATERIALIZED_PERMISSIONS', default=False, cast=bool)
+
+# Auditoria en buffer acotado con bulk_create desde un hilo; sincrona en pruebas.
+AUDIT_ASYNC_WRITES = config('AUDIT_ASYNC_WRITES', default=True, cast=bool) and 'test' not in sys.argv
+AUDIT_BUFFER_MAX_EVENTS = config('AUDIT_BUFFER_MAX_EVENTS', default=10000, cast=int)
+AUDIT_FLUSH_BATCH_SIZE = config('AUDIT_FLUSH_BATCH_SIZE', default=500, cast=int)
+AUDIT_FLUSH_INTERVAL_SECONDS = config('AUDIT_FLUSH_INTERVAL_SECONDS', default=1.0, cast=float)
+
+# Lecturas exitosas de listados como contadores por actor/accion, resumidos cada N minutos.
+AUDIT_READ_AGGREGATION = config('AUDIT_READ_AGGREGATION', default=True, cast=bool) and 'test' not in sys.argv
+AUDIT_READ_FLUSH_MINUTES = config('AUDIT_READ_FLUSH_MINUTES', default=5, cast=int)
+
+# Particiones mensuales de auditoria_eventos (PostgreSQL); retencion 0 = sin separar.
+AUDIT_PARTITION_MONTHS_AHEAD = config('AUDIT_PARTITION_MONTHS_AHEAD', default=3, cast=int)
+AUDIT_RETENTION_MONTHS = config('AUDIT_RETENTION_MONTHS', default=0, cast=int)
+
+# Limitador de tasa compartido (ventana deslizante en Redis; cache local sin Redis).
+RATE_LIMIT_REDIS_URL = config('RATE_LIMIT_REDIS_URL', default=CACHE_REDIS_URL) if 'test' not in sys.argv else ''
+RATE_LIMITS = {
+    'public': config('RATE_LIMIT_PUBLIC', default='60/min'),
+    'login_ip': config('RATE_LIMIT_LOGIN_IP', default='50/hour'),
+}
+
 DATABASE_ROUTERS = ['routers.ExpedientesRouter',
                     'apps.recepcion.routers.RecepcionCitasRouter' 
 ]
@@ -173,6 +244,20 @@ CELERY_BEAT_SCHEDULE = {
         "task": "apps.recepcion.tasks.marcar_no_asistio",
         "schedule": crontab(minute=0),   # cada hora
     },
+    # ── auditoría ─────────────────────────────────────────────────────────────
+    "auditoria-particiones": {
+        "task": "apps.administracion.tasks.mantener_particiones_auditoria",
+        "schedule": crontab(hour=2, minute=30),
+    },
+    "auditoria-lecturas-agregadas": {
+        "task": "apps.administracion.tasks.vaciar_contadores_lectura",
+        "schedule": timedelta(minutes=AUDIT_READ_FLUSH_MINUTES),
+    },
+    # ── catálogos ─────────────────────────────────────────────────────────────
+    "catalogos-purgar-cargas-cies": {
+        "task": "apps.catalogos.tasks.purgar_cargas_cies",
+        "schedule": crontab(minute=15),   # cada hora
+    },
 }
 
 
@@ -0,0 +1,155 @@
+"""Bus de invalidacion de caches en proceso (L1) entre workers y nodos.
+
+Quien escribe publica ``{namespace, version}`` al confirmar la transaccion;
+cada worker escucha el canal de Redis y ejecuta los manejadores registrados
+para ese espacio de nombres (tirar o recargar su copia local).
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from infrastructure.cache.redis_manager import (
+    clear_local_namespace,
+    get_redis_client,
+    local_namespace_names,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INVALIDATION_CHANNEL = "sires:cache:invalidate"
+
+# Identifica a este proceso para ignorar sus propios mensajes.
+_origin = uuid.uuid4().hex
+_handlers = defaultdict(list)
+_handlers_lock = threading.Lock()
+_listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+_stop = threading.Event()
+
+
+def _channel():
+    return getattr(settings, "CACHE_INVALIDATION_CHANNEL", DEFAULT_INVALIDATION_CHANNEL)
+
+
+def register_invalidation_handler(namespace, handler):
+    """Registra ``handler(version)`` para un espacio de nombres (idempotente)."""
+    with _handlers_lock:
+        if handler not in _handlers[namespace]:
+            _handlers[namespace].append(handler)
+
+
+def dispatch_invalidation(namespace, version=None):
+    # Aplica la invalidacion en este proceso.
+    clear_local_namespace(namespace)
+    with _handlers_lock:
+        handlers = list(_handlers.get(namespace, ()))
+    for handler in handlers:
+        try:
+            handler(version)
+        except Exception:
+            logger.exception("Fallo el manejador de invalidacion de %s", namespace)
+
+
+def _dispatch_all():
+    # Tras una reconexion pudimos perder mensajes: se invalida todo lo local.
+    with _handlers_lock:
+        namespaces = set(_handlers)
+    for namespace in namespaces | set(local_namespace_names()):
+        dispatch_invalidation(namespace)
+
+
+def _publish(namespace, version):
+    dispatch_invalidation(namespace, version)
+
+    client = get_redis_client()
+    if client is None:
+        return
+    message = json.dumps({"namespace": namespace, "version": version, "origin": _origin})
+    try:
+        client.publish(_channel(), message)
+    except Exception:
+        logger.warning("No se pudo publicar la invalidacion de %s", namespace, exc_info=True)
+
+
+def publish_invalidation(namespace, version=None):
+    """Invalida ``namespace`` en todos los workers cuando confirme la transaccion."""
+    transaction.on_commit(lambda: _publish(namespace, version))
+
+
+def handle_message(data):
+    try:
+        message = json.loads(data)
+    except (TypeError, ValueError):
+        logger.warning("Mensaje de invalidacion invalido: %r", data)
+        return
+    if not isinstance(message, dict) or not message.get("namespace"):
+        return
+    if message.get("origin") == _origin:
+        return
+    dispatch_invalidation(message["namespace"], message.get("version"))
+
+
+def _listen(url):
+    import redis
+
+    backoff = 1
+    reconnecting = False
+    while not _stop.is_set():
+        client = redis.Redis.from_url(url, health_check_interval=30)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(_channel())
+            if reconnecting:
+                _dispatch_all()
+            backoff = 1
+            while not _stop.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    handle_message(message["data"])
+        except Exception:
+            logger.warning("Bus de invalidacion desconectado; reintentando", exc_info=True)
+            reconnecting = True
+            _stop.wait(backoff)
+            backoff = min(backoff * 2, 30)
+        finally:
+            try:
+                pubsub.close()
+                client.close()
+            except Exception:
+                pass
+
+
+def start_invalidation_listener():
+    """Arranca el hilo suscriptor de este proceso; False si no hay Redis."""
+    global _listener, _listener_pid
+
+    url = getattr(settings, "CACHE_L2_REDIS_URL", "")
+    if not url:
+        return False
+
+    with _listener_lock:
+        # Tras un fork el hilo del padre no existe en el hijo.
+        if _listener is not None and _listener.is_alive() and _listener_pid == os.getpid():
+            return True
+        _stop.clear()
+        _listener = threading.Thread(
+            target=_listen,
+            args=(url,),
+            name="cache-invalidation",
+            daemon=True,
+        )
+        _listener_pid = os.getpid()
+        _listener.start()
+    return True
+
+
+def stop_invalidation_listener():
+    _stop.set()
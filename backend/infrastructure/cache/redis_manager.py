@@ -0,0 +1,382 @@
+"""Cache de dos niveles: L1 en proceso (LRU acotado) y L2 compartido en Redis.
+
+Las llaves van con espacio de nombres y version (``sires:<ns>:v<n>:<llave>``);
+los valores se serializan con msgpack y se comprimen con zlib si son grandes.
+Sin Redis configurado el L2 es el cache de Django.
+"""
+
+import logging
+import pickle
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+
+import msgpack
+from django.conf import settings
+from django.core.cache import cache as django_cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "sires"
+COMPRESS_THRESHOLD = 1024
+
+# Cabecera de un byte con el formato del valor serializado.
+_FMT_MSGPACK = b"m"
+_FMT_MSGPACK_ZLIB = b"z"
+_FMT_PICKLE = b"p"
+_FMT_PICKLE_ZLIB = b"q"
+
+_MISS = object()
+
+# Libera el candado solo si sigue siendo nuestro.
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_pools = {}
+_pools_lock = threading.Lock()
+_namespaces = {}
+_namespaces_lock = threading.Lock()
+
+
+def get_redis_client(url=None):
+    """Cliente Redis sobre un pool compartido por URL; None si no hay URL."""
+    url = url if url is not None else getattr(settings, "CACHE_L2_REDIS_URL", "")
+    if not url:
+        return None
+
+    pool = _pools.get(url)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(url)
+            if pool is None:
+                import redis
+
+                pool = redis.ConnectionPool.from_url(
+                    url,
+                    max_connections=getattr(settings, "CACHE_REDIS_MAX_CONNECTIONS", 50),
+                    socket_timeout=getattr(settings, "CACHE_REDIS_SOCKET_TIMEOUT", 0.5),
+                    socket_connect_timeout=getattr(settings, "CACHE_REDIS_SOCKET_TIMEOUT", 0.5),
+                    health_check_interval=30,
+                )
+                _pools[url] = pool
+
+    import redis
+
+    return redis.Redis(connection_pool=pool)
+
+
+def encode_value(value, compress_threshold=COMPRESS_THRESHOLD):
+    try:
+        payload, fmt, zfmt = msgpack.packb(value, use_bin_type=True), _FMT_MSGPACK, _FMT_MSGPACK_ZLIB
+    except (TypeError, ValueError, OverflowError):
+        # Tipos fuera de msgpack (datetime, Decimal, modelos...).
+        payload, fmt, zfmt = pickle.dumps(value, pickle.HIGHEST_PROTOCOL), _FMT_PICKLE, _FMT_PICKLE_ZLIB
+
+    if compress_threshold is not None and len(payload) >= compress_threshold:
+        return zfmt + zlib.compress(payload, 6)
+    return fmt + payload
+
+
+def decode_value(data):
+    fmt, payload = data[:1], data[1:]
+    if fmt in (_FMT_MSGPACK_ZLIB, _FMT_PICKLE_ZLIB):
+        payload = zlib.decompress(payload)
+    if fmt in (_FMT_MSGPACK, _FMT_MSGPACK_ZLIB):
+        return msgpack.unpackb(payload, raw=False)
+    if fmt in (_FMT_PICKLE, _FMT_PICKLE_ZLIB):
+        return pickle.loads(payload)
+    raise ValueError(f"Formato de cache desconocido: {fmt!r}")
+
+
+class LocalLRU:
+    """LRU en proceso acotado por entradas y bytes, con expiracion por entrada."""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISS
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._pop(key)
+                return _MISS
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, size, ttl):
+        if ttl <= 0 or size > self.max_bytes:
+            self.delete(key)
+            return
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (value, size, time.monotonic() + ttl)
+            self._bytes += size
+            while self._data and (
+                len(self._data) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._pop(next(iter(self._data)))
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CacheNamespace:
+    """Cache de un dominio (fotos, otp...) con L1 opcional y carga single-flight."""
+
+    def __init__(
+        self,
+        name,
+        *,
+        version=1,
+        ttl=300,
+        l1_max_entries=0,
+        l1_max_bytes=8 * 1024 * 1024,
+        l1_ttl=30,
+        compress_threshold=COMPRESS_THRESHOLD,
+        lock_timeout=10,
+    ):
+        self.name = name
+        self.version = version
+        self.ttl = ttl
+        self.l1_ttl = l1_ttl
+        self.compress_threshold = compress_threshold
+        self.lock_timeout = lock_timeout
+        self.l1 = LocalLRU(l1_max_entries, l1_max_bytes) if l1_max_entries > 0 else None
+        self._stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "loads": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+    # -- llaves y contadores -------------------------------------------------
+
+    def make_key(self, key):
+        return f"{CACHE_KEY_PREFIX}:{self.name}:v{self.version}:{key}"
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+        stats["hit_ratio"] = (
+            round((stats["l1_hits"] + stats["l2_hits"]) / lookups, 4) if lookups else 0.0
+        )
+        stats["l1_entries"] = len(self.l1) if self.l1 is not None else 0
+        return stats
+
+    def reset_stats(self):
+        with self._stats_lock:
+            for stat in self._stats:
+                self._stats[stat] = 0
+
+    # -- L2 ------------------------------------------------------------------
+
+    def _l2_get(self, full_key):
+        client = get_redis_client()
+        try:
+            data = client.get(full_key) if client is not None else django_cache.get(full_key)
+        except Exception:
+            self._count("errors")
+            logger.warning("No se pudo leer %s del cache", full_key, exc_info=True)
+            return _MISS, 0
+        if data is None:
+            return _MISS, 0
+        try:
+            return decode_value(data), len(data)
+        except Exception:
+            self._count("errors")
+            logger.warning("Valor de cache ilegible en %s", full_key, exc_info=True)
+            return _MISS, 0
+
+    def _l2_set(self, full_key, data, ttl):
+        client = get_redis_client()
+        try:
+            if client is not None:
+                client.set(full_key, data, ex=max(int(ttl), 1))
+            else:
+                django_cache.set(full_key, data, ttl)
+        except Exception:
+            self._count("errors")
+            logger.warning("No se pudo guardar %s en cache", full_key, exc_info=True)
+
+    def _l1_set(self, full_key, value, size, ttl):
+        if self.l1 is not None:
+            self.l1.set(full_key, value, size, min(ttl, self.l1_ttl))
+
+    # -- API -----------------------------------------------------------------
+
+    def _lookup(self, full_key):
+        if self.l1 is not None:
+            value = self.l1.get(full_key)
+            if value is not _MISS:
+                self._count("l1_hits")
+                return value
+
+        value, size = self._l2_get(full_key)
+        if value is _MISS:
+            self._count("misses")
+            return _MISS
+
+        self._count("l2_hits")
+        self._l1_set(full_key, value, size, self.ttl)
+        return value
+
+    def get(self, key, default=None):
+        value = self._lookup(self.make_key(key))
+        return default if value is _MISS else value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        full_key = self.make_key(key)
+        data = encode_value(value, self.compress_threshold)
+        self._l2_set(full_key, data, ttl)
+        self._l1_set(full_key, value, len(data), ttl)
+
+    def delete(self, *keys):
+        full_keys = [self.make_key(key) for key in keys]
+        if not full_keys:
+            return
+        if self.l1 is not None:
+            for full_key in full_keys:
+                self.l1.delete(full_key)
+        client = get_redis_client()
+        try:
+            if client is not None:
+                client.delete(*full_keys)
+            else:
+                django_cache.delete_many(full_keys)
+        except Exception:
+            self._count("errors")
+            logger.warning("No se pudo invalidar llaves de %s", self.name, exc_info=True)
+
+    def clear_local(self):
+        if self.l1 is not None:
+            self.l1.clear()
+
+    def get_or_set(self, key, loader, ttl=None):
+        """Lee la llave o la calcula una sola vez aunque haya lectores concurrentes.
+
+        ``loader`` puede regresar None; ese valor tambien se cachea.
+        """
+        full_key = self.make_key(key)
+        value = self._lookup(full_key)
+        if value is not _MISS:
+            return value
+
+        # Single-flight en proceso: un hilo carga, el resto espera su resultado.
+        with self._flights_lock:
+            flight = self._flights.get(full_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[full_key] = threading.Lock()
+                flight.acquire()
+
+        if not leader:
+            with flight:
+                pass
+            value = self._lookup(full_key)
+            if value is not _MISS:
+                return value
+
+        try:
+            return self._load(key, full_key, loader, ttl)
+        finally:
+            if leader:
+                with self._flights_lock:
+                    self._flights.pop(full_key, None)
+                flight.release()
+
+    def _load(self, key, full_key, loader, ttl):
+        client = get_redis_client()
+        if client is None:
+            return self._run_loader(key, loader, ttl)
+
+        # Single-flight entre procesos con un candado NX en Redis.
+        lock_key = f"{full_key}:lock"
+        token = uuid.uuid4().hex
+        try:
+            acquired = client.set(lock_key, token, nx=True, px=int(self.lock_timeout * 1000))
+        except Exception:
+            self._count("errors")
+            logger.warning("No se pudo tomar el candado %s", lock_key, exc_info=True)
+            return self._run_loader(key, loader, ttl)
+
+        if not acquired:
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                value, size = self._l2_get(full_key)
+                if value is not _MISS:
+                    self._l1_set(full_key, value, size, self.ttl)
+                    return value
+            # El dueño del candado no termino a tiempo: se calcula aqui.
+            return self._run_loader(key, loader, ttl)
+
+        try:
+            return self._run_loader(key, loader, ttl)
+        finally:
+            try:
+                client.eval(_RELEASE_LOCK_LUA, 1, lock_key, token)
+            except Exception:
+                logger.warning("No se pudo liberar el candado %s", lock_key, exc_info=True)
+
+    def _run_loader(self, key, loader, ttl):
+        self._count("loads")
+        value = loader()
+        self.set(key, value, ttl)
+        return value
+
+
+def get_namespace(name, **options):
+    """Regresa (y registra) el cache del espacio de nombres indicado."""
+    namespace = _namespaces.get(name)
+    if namespace is None:
+        with _namespaces_lock:
+            namespace = _namespaces.get(name)
+            if namespace is None:
+                namespace = _namespaces[name] = CacheNamespace(name, **options)
+    return namespace
+
+
+def clear_local_namespace(name):
+    # Tira el L1 del espacio de nombres, si existe en este proceso.
+    namespace = _namespaces.get(name)
+    if namespace is not None:
+        namespace.clear_local()
+
+
+def local_namespace_names():
+    return list(_namespaces)
+
+
+def cache_stats():
+    return {name: namespace.stats() for name, namespace in sorted(_namespaces.items())}
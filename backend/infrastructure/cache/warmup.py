@@ -0,0 +1,42 @@
+"""Precarga de estructuras en memoria antes de que el worker reciba trafico.
+
+Las apps registran sus funciones en ``AppConfig.ready``; asgi/wsgi llaman
+``prepare_worker`` despues de construir la aplicacion.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+
+from infrastructure.cache.invalidation import start_invalidation_listener
+
+logger = logging.getLogger(__name__)
+
+_warmups = {}
+
+
+def register_warmup(name, func):
+    _warmups[name] = func
+
+
+def run_warmups():
+    # Una precarga fallida no impide arrancar: la estructura se carga en la primera lectura.
+    results = {}
+    for name, func in list(_warmups.items()):
+        started = time.monotonic()
+        try:
+            func()
+        except Exception:
+            logger.exception("Fallo la precarga %s", name)
+            results[name] = False
+            continue
+        results[name] = True
+        logger.info("Precarga %s lista en %.0f ms", name, (time.monotonic() - started) * 1000)
+    return results
+
+
+def prepare_worker():
+    start_invalidation_listener()
+    if getattr(settings, "CACHE_WARMUP_ON_BOOT", False):
+        run_warmups()
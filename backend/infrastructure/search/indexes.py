@@ -0,0 +1,58 @@
+"""Indices GIN trigram para ``apply_text_search``, creados desde migraciones.
+
+Uso en una migracion (``atomic = False`` por ``CREATE INDEX CONCURRENTLY``)::
+
+    operations = [trigram_index_operation((("nombre_idx", "tabla", "columna"),))]
+"""
+
+from django.db import migrations
+
+from infrastructure.search.text_search import UNACCENT_FUNCTION, reset_search_capabilities
+
+
+def _create_search_functions(cursor):
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # Envoltura IMMUTABLE con diccionario explicito: utilizable en indices.
+    cursor.execute(
+        f"CREATE OR REPLACE FUNCTION {UNACCENT_FUNCTION}(text) RETURNS text AS "
+        "$$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$ "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT"
+    )
+
+
+def trigram_index_operation(indexes, **hints):
+    """RunPython que crea ``(nombre, tabla, columna)`` como GIN sobre
+    ``UPPER(sires_unaccent(columna::text))``; no hace nada fuera de PostgreSQL.
+
+    Varias tablas de catalogo son ``managed = False``: las que no existen en la
+    base se omiten en lugar de romper la migracion.
+    """
+
+    def create_indexes(apps, schema_editor):
+        connection = schema_editor.connection
+        if connection.vendor != "postgresql":
+            return
+
+        with connection.cursor() as cursor:
+            _create_search_functions(cursor)
+            for name, table, column in indexes:
+                cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [f'"{table}"'])
+                if not cursor.fetchone()[0]:
+                    continue
+                cursor.execute(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" '
+                    f'USING gin ((UPPER({UNACCENT_FUNCTION}("{column}"::text))) gin_trgm_ops)'
+                )
+        reset_search_capabilities()
+
+    def drop_indexes(apps, schema_editor):
+        connection = schema_editor.connection
+        if connection.vendor != "postgresql":
+            return
+
+        with connection.cursor() as cursor:
+            for name, _, _ in indexes:
+                cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+    return migrations.RunPython(create_indexes, drop_indexes, hints=hints)
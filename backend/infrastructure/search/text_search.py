@@ -0,0 +1,140 @@
+"""Busqueda por texto sobre columnas de nombre.
+
+En PostgreSQL con ``pg_trgm`` filtra sobre ``UPPER(sires_unaccent(col::text))``,
+la misma expresion de los indices GIN trigram creados en migraciones, y deja
+disponible el orden por similitud. En otros motores (SQLite en pruebas) o sin
+las extensiones se usa ``icontains`` como antes.
+"""
+
+import logging
+import threading
+import unicodedata
+from dataclasses import dataclass
+
+from django.db import connections
+from django.db.models import F, FloatField, Func, Q, TextField, Value
+from django.db.models.functions import Cast, Greatest, Upper
+
+logger = logging.getLogger(__name__)
+
+# unaccent() es STABLE; los indices requieren una funcion IMMUTABLE.
+UNACCENT_FUNCTION = "sires_unaccent"
+SEARCH_RANK = "search_rank"
+_SEARCH_ALIAS_PREFIX = "_search_"
+
+
+class Unaccent(Func):
+    function = UNACCENT_FUNCTION
+    output_field = TextField()
+
+
+class TrigramSimilarity(Func):
+    function = "similarity"
+    output_field = FloatField()
+
+
+@dataclass(frozen=True)
+class SearchCapabilities:
+    trigram: bool = False
+    unaccent: bool = False
+
+
+_capabilities = {}
+_capabilities_lock = threading.Lock()
+
+
+def fold_search_text(value) -> str:
+    # Mayusculas y sin acentos, igual que UPPER(sires_unaccent(...)).
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).upper()
+
+
+def search_capabilities(alias) -> SearchCapabilities:
+    """Extensiones disponibles en la BD ``alias`` (se consulta una vez por proceso)."""
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return SearchCapabilities()
+
+    cached = _capabilities.get(alias)
+    if cached is not None:
+        return cached
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'), "
+                "to_regprocedure(%s) IS NOT NULL",
+                [f"{UNACCENT_FUNCTION}(text)"],
+            )
+            trigram, unaccent = cursor.fetchone()
+    except Exception:
+        # Sin cachear: se reintenta en la siguiente busqueda.
+        logger.warning("No se pudieron consultar las extensiones de busqueda en %s", alias, exc_info=True)
+        return SearchCapabilities()
+
+    capabilities = SearchCapabilities(trigram=bool(trigram), unaccent=bool(unaccent))
+    with _capabilities_lock:
+        _capabilities[alias] = capabilities
+    return capabilities
+
+
+def reset_search_capabilities() -> None:
+    with _capabilities_lock:
+        _capabilities.clear()
+
+
+def _search_expression(field, capabilities):
+    expression = Cast(F(field), TextField())
+    if capabilities.unaccent:
+        expression = Unaccent(expression)
+    return Upper(expression)
+
+
+def apply_text_search(queryset, fields, term, *, per_word=False, extra=None):
+    """Filtra ``queryset`` a las filas cuyo texto en ``fields`` contiene ``term``.
+
+    Con ``per_word`` cada palabra debe aparecer en alguno de los campos.
+    ``extra`` es un ``Q`` adicional que tambien cuenta como coincidencia.
+    """
+    term = (term or "").strip()
+    if not term:
+        return queryset
+
+    words = term.split() if per_word else [term]
+    capabilities = search_capabilities(queryset.db)
+
+    if not capabilities.trigram:
+        match = Q()
+        for word in words:
+            match &= _any_field(fields, word, "icontains")
+        return queryset.filter(match | extra if extra is not None else match)
+
+    needle = fold_search_text(term) if capabilities.unaccent else term.upper()
+    aliases = {
+        f"{_SEARCH_ALIAS_PREFIX}{field.replace('__', '_')}": _search_expression(field, capabilities)
+        for field in fields
+    }
+    similarities = [TrigramSimilarity(F(name), Value(needle)) for name in aliases]
+    queryset = queryset.alias(
+        **aliases,
+        **{SEARCH_RANK: similarities[0] if len(similarities) == 1 else Greatest(*similarities)},
+    )
+
+    match = Q()
+    for word in needle.split() if per_word else [needle]:
+        match &= _any_field(aliases, word, "contains")
+    return queryset.filter(match | extra if extra is not None else match)
+
+
+def _any_field(fields, word, lookup):
+    match = Q()
+    for field in fields:
+        match |= Q(**{f"{field}__{lookup}": word})
+    return match
+
+
+def order_by_rank(queryset, *fallback):
+    """Ordena por similitud con la busqueda (si la hubo) y luego por ``fallback``."""
+    if SEARCH_RANK in queryset.query.annotations:
+        return queryset.order_by(f"-{SEARCH_RANK}", *fallback)
+    return queryset.order_by(*fallback)
@@ -0,0 +1,161 @@
+"""Limitador de tasa compartido entre procesos.
+
+Con Redis usa una ventana deslizante (ZSET) evaluada en un solo script Lua.
+Sin Redis recurre al cache de Django con INCR sobre una ventana anclada al
+primer intento. En ambos casos los intentos rechazados no se cuentan.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+from infrastructure.cache.redis_manager import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_PREFIX = "ratelimit"
+_PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 60 * 60 * 24}
+
+# KEYS[1]=llave, ARGV: ahora_ms, ventana_ms, limite, costo, miembro.
+_SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+local count = redis.call('ZCARD', key)
+local allowed
+if cost == 0 then
+    allowed = count < limit
+else
+    allowed = count + cost <= limit
+end
+if not allowed then
+    local retry = window
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    if oldest[2] then
+        retry = tonumber(oldest[2]) + window - now
+    end
+    return {0, count, retry}
+end
+for i = 1, cost do
+    redis.call('ZADD', key, now, ARGV[5] .. ':' .. i)
+end
+if cost > 0 then
+    redis.call('PEXPIRE', key, window)
+end
+return {1, count + cost, 0}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    count: int
+    limit: int
+    retry_after: int
+
+
+_client = None
+_script = None
+_client_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    # "30/min" -> (30, 60); mismo formato que los throttles de DRF.
+    count, period = str(rate).split("/", 1)
+    return int(count), _PERIODS[period.strip()[0].lower()]
+
+
+def _redis_script():
+    global _client, _script
+
+    url = getattr(settings, "RATE_LIMIT_REDIS_URL", "")
+    if not url:
+        return None
+    if _script is None:
+        with _client_lock:
+            if _script is None:
+                # Comparte el pool de conexiones del cache.
+                _client = get_redis_client(url)
+                _script = _client.register_script(_SLIDING_WINDOW_LUA)
+    return _script
+
+
+def _key(scope, identifier):
+    return f"{RATE_LIMIT_PREFIX}:{scope}:{str(identifier).strip().lower()}"
+
+
+def _hit_redis(script, key, limit, window, cost):
+    now_ms = int(time.time() * 1000)
+    allowed, count, retry_ms = script(
+        keys=[key],
+        args=[now_ms, window * 1000, limit, cost, uuid.uuid4().hex],
+    )
+    return RateLimitResult(
+        allowed=bool(allowed),
+        count=int(count),
+        limit=limit,
+        retry_after=max(-(-int(retry_ms) // 1000), 1) if not allowed else 0,
+    )
+
+
+def _hit_cache(key, limit, window, cost):
+    if cost == 0:
+        count = int(cache.get(key, 0))
+        return RateLimitResult(count < limit, count, limit, 0 if count < limit else window)
+
+    # add + incr son atomicos en los backends de cache de Django.
+    cache.add(key, 0, window)
+    try:
+        count = int(cache.incr(key, cost))
+    except ValueError:
+        # Expiro entre add e incr.
+        cache.set(key, cost, window)
+        count = cost
+    if count <= limit:
+        return RateLimitResult(True, count, limit, 0)
+
+    # Igual que el script Lua: el intento rechazado no se cuenta.
+    try:
+        count = int(cache.decr(key, cost))
+    except ValueError:
+        count = 0
+    return RateLimitResult(False, count, limit, window)
+
+
+def hit(scope, identifier, *, limit, window, cost=1):
+    """Registra `cost` intentos y regresa si siguen dentro del limite.
+
+    Con ``cost=0`` solo consulta el estado actual sin registrar nada.
+    """
+    key = _key(scope, identifier)
+    try:
+        script = _redis_script()
+        if script is not None:
+            return _hit_redis(script, key, limit, window, cost)
+    except Exception:
+        logger.warning("Limitador Redis no disponible; se usa el cache local", exc_info=True)
+    return _hit_cache(key, limit, window, cost)
+
+
+def reset(scope, identifier):
+    key = _key(scope, identifier)
+    try:
+        script = _redis_script()
+        if script is not None:
+            _client.delete(key)
+            return
+    except Exception:
+        logger.warning("Limitador Redis no disponible; se usa el cache local", exc_info=True)
+    cache.delete(key)
+
+
+def get_client_ip(request):
+    return request.META.get("REMOTE_ADDR") or "unknown"
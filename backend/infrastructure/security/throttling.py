@@ -0,0 +1,48 @@
+from django.conf import settings
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.throttling import BaseThrottle
+
+from infrastructure.security.rate_limiter import get_client_ip, hit, parse_rate
+
+
+class RateLimitExceeded(Throttled):
+    # Throttled con el payload {code, message} del resto de la API.
+    def __init__(self, wait):
+        APIException.__init__(
+            self,
+            detail={
+                "code": "RATE_LIMIT_EXCEEDED",
+                "message": "Demasiadas solicitudes, espera un momento",
+            },
+        )
+        self.wait = wait
+
+
+class SharedRateThrottle(BaseThrottle):
+    """Throttle DRF sobre el limitador compartido, por IP (y usuario si existe)."""
+
+    scope = "public"
+
+    def get_rate(self):
+        return getattr(settings, "RATE_LIMITS", {}).get(self.scope)
+
+    def get_ident(self, request):
+        user = getattr(request, "user", None)
+        user_id = getattr(user, "id_usuario", None) if getattr(user, "is_authenticated", False) else None
+        ip = get_client_ip(request)
+        return f"user:{user_id}" if user_id else f"ip:{ip}"
+
+    def allow_request(self, request, view):
+        rate = self.get_rate()
+        if not rate:
+            return True
+
+        limit, window = parse_rate(rate)
+        result = hit(f"throttle:{self.scope}", self.get_ident(request), limit=limit, window=window)
+        if not result.allowed:
+            raise RateLimitExceeded(result.retry_after)
+        return True
+
+
+class PublicRateThrottle(SharedRateThrottle):
+    scope = "public"
@@ -1,5 +1,7 @@
 from apps.authentication.services.auth_revision import (
     AUTH_REVISION_HEADER,
+    get_published_auth_revision,
+    publish_auth_revision,
     serialize_auth_revision,
 )
 from apps.authentication.models import SyUsuario
@@ -19,11 +21,22 @@ class JWTAuthenticationMiddleware:
 
         user = getattr(request, "user", None)
         if user and getattr(user, "is_authenticated", False):
-            if request.method in MUTATING_METHODS:
-                fresh_user = SyUsuario.objects.filter(id_usuario=user.id_usuario).first()
-                if fresh_user:
-                    user = fresh_user
-
-            response[AUTH_REVISION_HEADER] = serialize_auth_revision(user)
+            response[AUTH_REVISION_HEADER] = self._resolve_revision(request, user)
 
         return response
+
+    @staticmethod
+    def _resolve_revision(request, user):
+        # Los cambios de RBAC y estado escriben en cache; no se relee el usuario.
+        revision, _ = get_published_auth_revision(user.id_usuario)
+        if revision:
+            return revision
+
+        if request.method in MUTATING_METHODS:
+            # Sin entrada publicada (cache fria): se lee una vez y se publica.
+            fresh_user = SyUsuario.objects.filter(id_usuario=user.id_usuario).first()
+            if fresh_user:
+                publish_auth_revision(fresh_user)
+                user = fresh_user
+
+        return serialize_auth_revision(user)
@@ -48,6 +48,7 @@ PERMISSIONS = [
     ("admin:gestion:roles:create", "Admin - Crear roles"),
     ("admin:gestion:roles:update", "Admin - Editar roles"),
     ("admin:gestion:roles:delete", "Admin - Eliminar roles"),
+    ("admin:auditoria:read", "Admin - Consultar auditoria"),
     ("admin:gestion:permisos:read", "Admin - Ver catalogo de permisos"),
     (
         "admin:catalogos:centros_atencion:read",
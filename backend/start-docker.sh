@@ -34,5 +34,7 @@ else:
 PY
 
 python manage.py migrate
+# Particiones de auditoria del mes en curso y siguientes (no hay beat desplegado).
+python manage.py audit_partitions || echo "No se pudieron mantener las particiones de auditoria"
 
 exec env DJANGO_SETTINGS_MODULE=config.settings daphne -b 0.0.0.0 -p 5000 config.asgi:application
@@ -30,14 +30,28 @@ export interface CiesListResponse {
 }
 
 export interface CiesUploadRow {
+  FILA?: number;
   CLAVE: string;
   DESCRIPCION: string;
   VERSION: string;
   ERROR: string;
 }
 
-/** Respuesta del paso 1 — preview: NO guarda nada, inserted siempre 0 */
+export type CiesUploadStatus =
+  | "pending"
+  | "processing"
+  | "ready"
+  | "failed"
+  | "confirmed";
+
+/** Respuesta del paso 1 — preview: NO guarda nada, inserted siempre 0.
+ *  rows trae solo las filas con error; las validas quedan en el servidor bajo uploadId. */
 export interface CiesPreviewResponse {
+  uploadId: string;
+  /** Archivos grandes se validan en segundo plano: pending/processing hasta ready. */
+  status: CiesUploadStatus;
+  progress: number;
+  message?: string;
   total_records: number;
   total_errores: number;
   inserted: 0;
@@ -65,6 +79,28 @@ const waitForTokenRefresh = (): Promise<void> =>
 const hasStatus = (error: unknown): error is ApiErrorWithStatus =>
   typeof error === "object" && error !== null && "status" in error;
 
+const UPLOAD_POLL_INTERVAL_MS = 1500;
+
+const wait = (ms: number): Promise<void> =>
+  new Promise((resolve) => setTimeout(resolve, ms));
+
+/** Consulta el avance de la carga hasta que termine la validacion. */
+const waitForUpload = async (
+  preview: CiesPreviewResponse,
+  onProgress?: (progress: number) => void,
+): Promise<CiesPreviewResponse> => {
+  let current = preview;
+  while (current.status === "pending" || current.status === "processing") {
+    onProgress?.(current.progress);
+    await wait(UPLOAD_POLL_INTERVAL_MS);
+    current = await ciesAPI.uploadStatus(current.uploadId);
+  }
+  if (current.status === "failed") {
+    throw new Error(current.message || "No se pudo validar el archivo");
+  }
+  return current;
+};
+
 /* =======================
    API
 ======================= */
@@ -81,13 +117,15 @@ export const ciesAPI = {
 
   /**
    * PASO 1 — Preview: valida el Excel y devuelve filas con errores.
-   * NO guarda nada en la BD.
+   * NO guarda nada en la BD. Si el servidor responde 202, espera a que
+   * termine la validacion en segundo plano.
    * @endpoint POST /api/v1/catalogos/cies/upload/
    */
   preview: async (
     file: File,
     version: string = "CIE-10",
     _retry = false,
+    onProgress?: (progress: number) => void,
   ): Promise<CiesPreviewResponse> => {
     const buildFormData = () => {
       const formData = new FormData();
@@ -108,25 +146,36 @@ export const ciesAPI = {
           },
         },
       );
-      return response.data;
+      return waitForUpload(response.data, onProgress);
     } catch (err: unknown) {
       if (!_retry && hasStatus(err) && err.status === 401) {
         await waitForTokenRefresh();
-        return ciesAPI.preview(file, version, true);
+        return ciesAPI.preview(file, version, true, onProgress);
       }
       throw err;
     }
   },
 
+  /**
+   * PASO 1b — Avance de una carga validada en segundo plano.
+   * @endpoint GET /api/v1/catalogos/cies/upload/:uploadId/
+   */
+  uploadStatus: async (uploadId: string): Promise<CiesPreviewResponse> => {
+    const response = await apiClient.get<CiesPreviewResponse>(
+      `/cies/upload/${uploadId}/`,
+    );
+    return response.data;
+  },
+
   /**
    * PASO 2 — Confirm: guarda las filas válidas en la BD.
-   * Recibe las rows que el frontend ya tiene en memoria del paso 1.
+   * Recibe el uploadId devuelto por el paso 1.
    * @endpoint POST /api/v1/catalogos/cies/confirm/
    */
-  confirm: async (rows: CiesUploadRow[]): Promise<CiesConfirmResponse> => {
+  confirm: async (uploadId: string): Promise<CiesConfirmResponse> => {
     const response = await apiClient.post<CiesConfirmResponse>(
       "/cies/confirm/",
-      { rows },
+      { uploadId },
     );
     return response.data;
   },
@@ -184,7 +184,7 @@ export function CiesPage() {
     setIsConfirmPending(true);
 
     try {
-      const response = await ciesAPI.confirm(previewResult.rows);
+      const response = await ciesAPI.confirm(previewResult.uploadId);
       setIsConfirmed(true);
       toast.success("Importacion completada", {
         description: